@@ -1,8 +1,7 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import time
-from threading import Thread
+from capture import ThreadedCapture
 
 # --- CONFIGURATION & AESTHETICS ---
 WIDTH, HEIGHT = 1280, 720
@@ -18,34 +17,6 @@ COLOR_TEXT = (100, 255, 100)    # HUD Text
 EXPANSION_RATIO = 1.20          # Expand the void 20% beyond the face to prevent leaks
 VERTICAL_OFFSET = -20           # Shift mask up to cover forehead
 
-# --- HIGH PERFORMANCE CAMERA THREAD ---
-class FastWebcam:
-    def __init__(self, src=0):
-        self.stream = cv2.VideoCapture(src)
-        self.stream.set(cv2.CAP_PROP_FRAME_WIDTH, WIDTH)
-        self.stream.set(cv2.CAP_PROP_FRAME_HEIGHT, HEIGHT)
-        self.stream.set(cv2.CAP_PROP_BUFFERSIZE, 1) # Minimizes internal buffer lag
-        (self.grabbed, self.frame) = self.stream.read()
-        self.stopped = False
-        self.thread = Thread(target=self.update, args=())
-        self.thread.daemon = True
-        self.thread.start()
-
-    def update(self):
-        while not self.stopped:
-            grabbed, frame = self.stream.read()
-            if grabbed:
-                self.frame = frame
-            else:
-                self.stopped = True
-
-    def read(self):
-        return self.frame.copy() if self.frame is not None else None
-
-    def release(self):
-        self.stopped = True
-        self.stream.release()
-
 # --- MATH UTILITIES ---
 def get_scaled_hull(face_landmarks, w, h, scale=1.1, offset_y=0):
     """
@@ -73,8 +44,8 @@ def get_scaled_hull(face_landmarks, w, h, scale=1.1, offset_y=0):
 
 def main():
     # Initialize Systems
-    cam = FastWebcam(0)
-    time.sleep(0.5) # Warmup
+    # Threaded reader with a drop-to-latest frame ring (see capture.py)
+    cam = ThreadedCapture(0, width=WIDTH, height=HEIGHT)
 
     mp_face_mesh = mp.solutions.face_mesh
     mp_drawing = mp.solutions.drawing_utils
@@ -97,8 +68,8 @@ def main():
     print("--- SYSTEM ARMED: BIOMETRIC SCRAMBLER ACTIVE ---")
 
     while True:
-        frame = cam.read()
-        if frame is None: continue
+        success, frame = cam.read()
+        if not success: break
 
         # 1. Prepare Image
         frame = cv2.flip(frame, 1)
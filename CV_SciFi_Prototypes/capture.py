@@ -0,0 +1,288 @@
+import os
+import time
+import threading
+
+import cv2
+import numpy as np
+
+# --- CONFIGURATION ---
+SOURCE_ENV = "CV_SOURCE"            # Overrides every script's camera: index, video file or stream URL
+STATS_ENV = "CV_CAPTURE_STATS"      # Print a capture summary on release()
+REPLAY_ENV = "CV_REPLAY_REPORT"     # Headless replay: write frame timings to this JSON file (see replay_bench.py)
+DEFAULT_RING = 4                    # Frame slots; 3 is the minimum (latest, held, being written)
+RECONNECT_DELAY = 1.0               # Seconds between reopen attempts on a dropped stream
+EMA = 0.1                           # Smoothing for the FPS / age figures
+
+# Set by replay_bench.install(); receives per-frame timings during headless replays
+recorder = None
+
+
+def parse_source(source):
+    """'0' -> 0 (webcam index); anything else is a file path or URL."""
+    if isinstance(source, str) and source.strip().isdigit():
+        return int(source)
+    return source
+
+
+def is_live(source):
+    """Webcams and network streams (the MJPEG 'http://.../video' feeds) can't be paused."""
+    return isinstance(source, int) or "://" in str(source)
+
+
+class ThreadedCapture:
+    """
+    Drop-in replacement for cv2.VideoCapture that grabs frames on a background thread.
+
+    Frames are decoded straight into a small ring of preallocated buffers and read()
+    hands out the newest one without copying. The returned array stays valid until
+    the next read(): the reader thread never writes into the slot the caller holds.
+    Live sources drop frames the caller was too slow to take; video files are read
+    losslessly (the reader waits for the caller) unless pace=True, which plays them
+    at their native FPS and drops like a camera would.
+    """
+    def __init__(self, source=0, width=None, height=None, ring_size=DEFAULT_RING, drop=None, pace=False,
+                 reconnect=3):
+        if ring_size < 3:
+            raise ValueError("ring_size must be at least 3")
+        self.source = parse_source(os.environ.get(SOURCE_ENV) or source)
+        self.live = is_live(self.source)
+        self.drop = (self.live or pace) if drop is None else drop
+        self.pace = pace and not self.live
+        self.width, self.height = width, height
+        self.reconnect = reconnect if isinstance(self.source, str) and self.live else 0
+
+        self.cond = threading.Condition()
+        self.slots = []
+        self.timestamps = [0.0] * ring_size
+        self.ring_size = ring_size
+        self.latest = -1            # Slot of the newest published frame
+        self.held = -1              # Slot the caller is using (never overwritten)
+        self.seq = 0                # Frames published
+        self.delivered_seq = 0      # Sequence number of the last frame handed out
+        self.ended = False
+        self.stopped = False
+
+        # Stats
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.capture_fps = 0.0
+        self.age_ms = 0.0           # Capture -> handed to the caller
+        self.e2e_ms = 0.0           # Capture -> caller asks for the next frame (after drawing/showing it)
+        self.last_timestamp = None
+
+        self.cap = self._open()
+        if self.cap is not None:
+            self._prime()
+        self.thread = threading.Thread(target=self._reader, daemon=True)
+        if self.cap is not None:
+            self.thread.start()
+        else:
+            self.ended = True
+
+    # --- Reader thread ---
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        if self.width:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.live:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)     # Don't let the driver queue stale frames either
+        self.fps_hint = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        return cap
+
+    def _prime(self):
+        """Reads the first frame synchronously to size the ring, so get()/read() work at once."""
+        ok, frame = self.cap.read()
+        if not ok:
+            self.cap.release()
+            self.cap = None
+            return
+        self.slots = [np.empty_like(frame) for _ in range(self.ring_size)]
+        self.slots[0][...] = frame
+        self._publish(0, time.perf_counter())
+
+    def _free_slot(self):
+        for offset in range(1, self.ring_size + 1):
+            slot = (self.latest + offset) % self.ring_size
+            if slot != self.latest and slot != self.held:
+                return slot
+
+    def _grab_into(self, slot):
+        """Grabs, timestamps and decodes one frame into 'slot'. Returns the timestamp or None."""
+        if not self.cap.grab():
+            return None
+        stamp = time.perf_counter()
+        ok, frame = self.cap.retrieve(self.slots[slot])
+        if not ok:
+            return None
+        if frame.ctypes.data != self.slots[slot].ctypes.data:
+            # The stream changed resolution (or the backend ignored our buffer): resize the slot
+            with self.cond:
+                if frame.shape != self.slots[slot].shape:
+                    self.slots[slot] = frame
+                else:
+                    self.slots[slot][...] = frame
+        return stamp
+
+    def _publish(self, slot, stamp):
+        if self.captured:
+            interval = stamp - self.timestamps[self.latest]
+            if interval > 0:
+                fps = 1.0 / interval
+                self.capture_fps = fps if not self.capture_fps else self.capture_fps + EMA * (fps - self.capture_fps)
+        self.timestamps[slot] = stamp
+        self.latest = slot
+        self.seq += 1
+        self.captured += 1
+
+    def _reader(self):
+        started, frames = time.perf_counter(), 0
+        while not self.stopped:
+            with self.cond:
+                slot = self._free_slot()
+            stamp = self._grab_into(slot)
+            if stamp is None:
+                if self._reopen():
+                    continue
+                break
+            with self.cond:
+                if not self.drop:
+                    # Lossless: the next frame is decoded ahead, but only published once the caller took this one
+                    self.cond.wait_for(lambda: self.delivered_seq == self.seq or self.stopped)
+                    stamp = time.perf_counter()     # Replays: latency counts from when the frame became available
+                self._publish(slot, stamp)
+                self.cond.notify_all()
+            if self.pace:
+                frames += 1
+                delay = started + frames / self.fps_hint - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        with self.cond:
+            self.ended = True
+            self.cond.notify_all()
+
+    def _reopen(self):
+        for _ in range(self.reconnect):
+            if self.stopped:
+                return False
+            time.sleep(RECONNECT_DELAY)
+            self.cap.release()
+            cap = self._open()
+            if cap is not None:
+                self.cap = cap
+                return True
+        return False
+
+    # --- cv2.VideoCapture interface ---
+
+    def read(self, timeout=None):
+        """
+        (True, newest frame) or (False, None) once the source has ended. Blocks until
+        a frame newer than the last one returned is available, so a frame is never
+        processed twice. The array is only valid until the next read(); copy it to keep it.
+        """
+        now = time.perf_counter()
+        on_main = threading.current_thread() is threading.main_thread()
+        with self.cond:
+            if self.last_timestamp is not None:
+                self._update_age("e2e_ms", now - self.last_timestamp)
+            if not self.cond.wait_for(lambda: self.seq > self.delivered_seq or self.ended or self.stopped, timeout):
+                return False, None
+            if self.seq == self.delivered_seq:
+                return False, None
+            self.dropped += self.seq - self.delivered_seq - 1
+            self.delivered_seq = self.seq
+            self.delivered += 1
+            self.held = self.latest
+            self.last_timestamp = self.timestamps[self.held]
+            frame = self.slots[self.held]
+            self.cond.notify_all()
+        handed = time.perf_counter()
+        self._update_age("age_ms", handed - self.last_timestamp)
+        if recorder is not None and on_main:
+            # A Pipeline reads on its own thread and reports the frames it hands out itself
+            recorder.stage("capture_wait", handed - now)
+            recorder.frame_out(self.last_timestamp)
+        return True, frame
+
+    def _update_age(self, name, seconds):
+        value = getattr(self, name)
+        setattr(self, name, seconds * 1000 if not value else value + EMA * (seconds * 1000 - value))
+
+    def isOpened(self):
+        return not self.stopped and not (self.ended and self.seq == self.delivered_seq)
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH and self.slots:
+            return float(self.slots[0].shape[1])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT and self.slots:
+            return float(self.slots[0].shape[0])
+        return self.cap.get(prop) if self.cap is not None else 0.0
+
+    def release(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        if self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        if self.cap is not None:
+            self.cap.release()
+        if os.environ.get(STATS_ENV):
+            print(self.stats_text())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    # --- Stats ---
+
+    def frame_age(self):
+        """Seconds since the frame last returned by read() was grabbed (call right before showing it)."""
+        return time.perf_counter() - self.last_timestamp if self.last_timestamp is not None else 0.0
+
+    def stats(self):
+        return {"capture_fps": self.capture_fps, "captured": self.captured, "delivered": self.delivered,
+                "dropped": self.dropped, "age_ms": self.age_ms, "e2e_ms": self.e2e_ms}
+
+    def stats_text(self):
+        s = self.stats()
+        return (f"CAP {s['capture_fps']:.1f} fps | read {s['delivered']}/{s['captured']} "
+                f"(dropped {s['dropped']}) | age {s['age_ms']:.0f} ms | e2e {s['e2e_ms']:.0f} ms")
+
+    def draw_stats(self, img, origin=(10, 20), color=(0, 255, 0)):
+        cv2.putText(img, self.stats_text(), origin, cv2.FONT_HERSHEY_PLAIN, 1, color, 1, cv2.LINE_AA)
+        return img
+
+
+if os.environ.get(REPLAY_ENV):
+    import replay_bench
+    replay_bench.install()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Measure a capture source through ThreadedCapture.")
+    parser.add_argument("source", nargs="?", default="0", help="Webcam index, video file or stream URL.")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--work-ms", type=float, default=0.0, help="Simulated per-frame processing time.")
+    parser.add_argument("--pace", action="store_true", help="Play video files at their native FPS.")
+    args = parser.parse_args()
+
+    with ThreadedCapture(args.source, pace=args.pace) as cap:
+        if not cap.isOpened():
+            raise SystemExit(f"Cannot open {args.source}")
+        deadline = time.perf_counter() + args.seconds
+        while time.perf_counter() < deadline:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            time.sleep(args.work_ms / 1000)
+        print(cap.stats_text())
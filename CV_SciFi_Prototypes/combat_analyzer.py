@@ -1,57 +1,33 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import pandas as pd
 import pickle
-from sklearn.model_selection import train_test_split
+import argparse
+from sklearn.model_selection import GroupKFold, StratifiedKFold, cross_val_score
 from sklearn.ensemble import RandomForestClassifier
+from capture import ThreadedCapture
+from forest_inference import export_forest
+from pose_features import FEATURE_COUNT, DEFAULT_WINDOW, PoseFeatureStream, extract_features
+from session_recorder import SessionRecorder, load_dataset
 
 # --- CONFIG ---
 CLASS_MAP = {1: "PASSIVE", 2: "PUNCH", 3: "WAVE/NOISE"}
-DATA_FILE = "combat_data.csv"
+DATA_DIR = "combat_data"             # One sub-folder of .npy chunks + manifest per recording session
 MODEL_FILE = "combat_model.pkl"
+FOREST_FILE = "combat_model.forest"  # Packed copy for run_combat_ml.py
+MIN_SAMPLES = 50
 
-def extract_features(landmarks):
-    """
-    Extracts purely relative coordinates (invariant to camera distance).
-    We use the center of shoulders as the (0,0) reference point.
-    """
-    # 11=Left Shoulder, 12=Right Shoulder
-    # 13=Left Elbow, 14=Right Elbow
-    # 15=Left Wrist, 16=Right Wrist
-    
-    lms = landmarks.landmark
-    
-    # Calculate Center Point (Midpoint of Shoulders)
-    center_x = (lms[11].x + lms[12].x) / 2
-    center_y = (lms[11].y + lms[12].y) / 2
-    
-    features = []
-    # We only care about upper body for punching: 11 to 16
-    relevant_indices = [11, 12, 13, 14, 15, 16]
-    
-    for i in relevant_indices:
-        # Relative Position (X, Y, Z, Visibility)
-        features.append(lms[i].x - center_x)
-        features.append(lms[i].y - center_y)
-        features.append(lms[i].z) 
-        features.append(lms[i].visibility)
-        
-    # Also add Distance between Wrist and Shoulder (Extension factor)
-    # Left Arm Ext
-    features.append(np.linalg.norm([lms[15].x - lms[11].x, lms[15].y - lms[11].y]))
-    # Right Arm Ext
-    features.append(np.linalg.norm([lms[16].x - lms[12].x, lms[16].y - lms[12].y]))
-        
-    return features
-
-def main():
+def record(data_dir=DATA_DIR, train_after=True):
     mp_pose = mp.solutions.pose
     pose = mp_pose.Pose(min_detection_confidence=0.5, model_complexity=1)
-    cap = cv2.VideoCapture(0)
+    cap = ThreadedCapture(0)
+    # Velocity / acceleration over the last few frames, so a strike differs from a raised guard
+    stream = PoseFeatureStream()
     
-    data = []
+    # Every labelled sample is streamed to disk as it is recorded
+    recorder = SessionRecorder(data_dir, FEATURE_COUNT, meta={"classes": CLASS_MAP, "window": DEFAULT_WINDOW})
     print("--- TRAINING MODE ---")
+    print(f"Recording to {recorder.path}")
     print("HOLD '1' for PASSIVE (Stance)")
     print("HOLD '2' for PUNCH (Action)")
     print("HOLD '3' for WAVE (False Positive)")
@@ -74,7 +50,7 @@ def main():
             # Draw Skeleton
             mp.solutions.drawing_utils.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
             
-            features = extract_features(results.pose_landmarks)
+            features = stream.update(extract_features(results.pose_landmarks), cap.last_timestamp)
             
             # Record Data based on Key Press
             class_id = None
@@ -92,11 +68,12 @@ def main():
                 color = (0, 255, 255)
                 
             if class_id:
-                row = features + [class_id]
-                data.append(row)
+                recorder.append(features, class_id)
+        else:
+            stream.reset()
         
         # UI
-        cv2.putText(frame, f"SAMPLES: {len(data)}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255,255,255), 2)
+        cv2.putText(frame, f"SAMPLES: {recorder.rows}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255,255,255), 2)
         cv2.putText(frame, status_text, (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
         
         cv2.imshow("Trainer", frame)
@@ -105,29 +82,60 @@ def main():
             
     cap.release()
     cv2.destroyAllWindows()
+    recorder.close()
+    print(f"Session saved: {recorder.rows} samples in {recorder.path}")
     
     # --- TRAINING PHASE ---
-    if len(data) > 50:
-        print("Training Model...")
-        df = pd.DataFrame(data)
-        
-        # Split Features (X) and Target (y)
-        X = df.iloc[:, :-1]
-        y = df.iloc[:, -1]
-        
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        model = RandomForestClassifier(n_estimators=100)
-        model.fit(X_train, y_train)
-        
-        score = model.score(X_test, y_test)
-        print(f"Model Accuracy: {score*100:.2f}%")
-        
-        with open(MODEL_FILE, 'wb') as f:
-            pickle.dump(model, f)
-            print(f"Model Saved to {MODEL_FILE}")
-    else:
+    if train_after:
+        train(data_dir)
+
+def train(data_dir=DATA_DIR, n_jobs=-1, folds=5, trees=100):
+    """Trains on every recorded session, cross-validated, with all cores."""
+    X, y, groups = load_dataset(data_dir, FEATURE_COUNT)
+    if len(X) <= MIN_SAMPLES:
         print("Not enough data collected.")
+        return None
+    n_sessions = len(np.unique(groups))
+    print(f"Training Model on {len(X)} samples from {n_sessions} session(s)...")
+
+    # Neighbouring frames are near-duplicates, so with enough sessions each fold holds
+    # out whole sessions; otherwise folds are stratified by class
+    smallest_class = np.unique(y, return_counts=True)[1].min()
+    if n_sessions >= folds:
+        cv, cv_groups = GroupKFold(n_splits=folds), groups
+    else:
+        cv, cv_groups = StratifiedKFold(n_splits=max(2, min(folds, smallest_class)), shuffle=True, random_state=42), None
+    model = RandomForestClassifier(n_estimators=trees)
+    if n_sessions >= folds or smallest_class >= 2:
+        scores = cross_val_score(model, X, y, groups=cv_groups, cv=cv, n_jobs=n_jobs)
+        print(f"Model Accuracy: {scores.mean()*100:.2f}% (+/- {scores.std()*100:.2f}) over {len(scores)} folds")
+
+    model.set_params(n_jobs=n_jobs).fit(X, y)
+    model.set_params(n_jobs=None)   # Single-sample predictions are slower with a thread pool
+    with open(MODEL_FILE, 'wb') as f:
+        pickle.dump(model, f)
+        print(f"Model Saved to {MODEL_FILE}")
+    export_forest(model, FOREST_FILE)
+    print(f"Packed forest for live inference saved to {FOREST_FILE}")
+    return model
+
+def main():
+    parser = argparse.ArgumentParser(description="Record labelled combat poses and train the classifier.")
+    commands = parser.add_subparsers(dest="command")
+    rec = commands.add_parser("record", help="Record a session from the webcam (default), then train.")
+    rec.add_argument("--no-train", action="store_true", help="Only record.")
+    trn = commands.add_parser("train", help="Train offline on every recorded session.")
+    trn.add_argument("--jobs", type=int, default=-1, help="Parallel workers (-1 = all cores).")
+    trn.add_argument("--folds", type=int, default=5)
+    trn.add_argument("--trees", type=int, default=100)
+    for sub in (rec, trn):
+        sub.add_argument("--data", default=DATA_DIR, help="Sessions folder.")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        train(args.data, args.jobs, args.folds, args.trees)
+    else:
+        record(getattr(args, "data", DATA_DIR), not getattr(args, "no_train", False))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,6 +3,8 @@ import mediapipe as mp
 import numpy as np
 import math
 import random
+from capture import ThreadedCapture
+from pipeline import Pipeline, Stage
 
 # --- CONFIGURATION ---
 WIDTH, HEIGHT = 1280, 720
@@ -166,98 +168,99 @@ class CyberHUD:
             cv2.line(img, tuple(lip_pts[0]), (50, y_start + 150), primary_color, 1)
             cv2.line(img, tuple(lip_pts[10]), (w - 50, y_start + 150), primary_color, 1)
 
+    def track(self, frame):
+        """Pipeline stage (worker thread): face mesh for frame N+1 while frame N is rendered."""
+        frame.results["mesh"] = self.face_mesh.process(cv2.cvtColor(frame.image, cv2.COLOR_BGR2RGB))
+
     def process(self):
-        cap = cv2.VideoCapture(0)
-        cap.set(3, WIDTH)
-        cap.set(4, HEIGHT)
+        cap = ThreadedCapture(0, width=WIDTH, height=HEIGHT)
+        pipeline = Pipeline(cap, [Stage("track", self.track)], prepare=lambda img: cv2.flip(img, 1)).start()
         
         print("SYSTEM START... SQUINT TO TOGGLE COMBAT MODE")
         
-        while True:
-            success, img = cap.read()
-            if not success: break
-            
-            self.frame_count += 1
-            img = cv2.flip(img, 1)
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            results = self.face_mesh.process(img_rgb)
+        # Stopped even if rendering raises: joins the track thread and releases the camera
+        try:
+            for frame in pipeline:
+                self.frame_count += 1
+                img = frame.image
+                results = frame.results["mesh"]
             
-            # --- 1. BOOT SEQUENCE EFFECT ---
-            if self.boot_sequence < 50:
-                self.boot_sequence += 1
-                cv2.putText(img, "INITIALIZING NEURAL LINK...", (50, HEIGHT//2), cv2.FONT_HERSHEY_SIMPLEX, 1, C_NEON_GREEN, 2)
-                # Add random static noise
-                noise = np.random.randint(0, 50, (HEIGHT, WIDTH, 3), dtype='uint8')
-                img = cv2.add(img, noise)
-                cv2.imshow("CYBER_HUD_V2", img)
-                cv2.waitKey(1)
-                continue
+                # --- 1. BOOT SEQUENCE EFFECT ---
+                if self.boot_sequence < 50:
+                    self.boot_sequence += 1
+                    cv2.putText(img, "INITIALIZING NEURAL LINK...", (50, HEIGHT//2), cv2.FONT_HERSHEY_SIMPLEX, 1, C_NEON_GREEN, 2)
+                    # Add random static noise
+                    noise = np.random.randint(0, 50, (HEIGHT, WIDTH, 3), dtype='uint8')
+                    img = cv2.add(img, noise)
+                    cv2.imshow("CYBER_HUD_V2", img)
+                    cv2.waitKey(1)
+                    continue
 
-            # --- 2. LOGIC UPDATE ---
-            is_face_detected = False
+                # --- 2. LOGIC UPDATE ---
+                is_face_detected = False
             
-            if results.multi_face_landmarks:
-                is_face_detected = True
-                face_lms = results.multi_face_landmarks[0]
-                lms = face_lms.landmark
+                if results.multi_face_landmarks:
+                    is_face_detected = True
+                    face_lms = results.multi_face_landmarks[0]
+                    lms = face_lms.landmark
                 
-                # SQUINT DETECTION LOGIC
-                # Eye 1
-                l_h = abs(lms[159].y - lms[145].y)
-                # Eye 2
-                r_h = abs(lms[386].y - lms[374].y)
-                avg_eye = (l_h + r_h) * 1000 # Scaling up
+                    # SQUINT DETECTION LOGIC
+                    # Eye 1
+                    l_h = abs(lms[159].y - lms[145].y)
+                    # Eye 2
+                    r_h = abs(lms[386].y - lms[374].y)
+                    avg_eye = (l_h + r_h) * 1000 # Scaling up
                 
-                # Logic: If eyes are narrow (< 15) count up. Else count down.
-                # Threshold depends on distance, 15 is a generic 'close-ish' value
-                if avg_eye < 16: 
-                    self.squint_frame_counter += 1
-                else:
-                    self.squint_frame_counter = max(0, self.squint_frame_counter - 1)
+                    # Logic: If eyes are narrow (< 15) count up. Else count down.
+                    # Threshold depends on distance, 15 is a generic 'close-ish' value
+                    if avg_eye < 16: 
+                        self.squint_frame_counter += 1
+                    else:
+                        self.squint_frame_counter = max(0, self.squint_frame_counter - 1)
                 
-                # Trigger switch
-                if self.squint_frame_counter > self.squint_threshold_frames:
-                    self.combat_mode = not self.combat_mode
-                    self.squint_frame_counter = 0 # Reset
-                    self.glitch_intensity = 20 # Spike glitch on switch
+                    # Trigger switch
+                    if self.squint_frame_counter > self.squint_threshold_frames:
+                        self.combat_mode = not self.combat_mode
+                        self.squint_frame_counter = 0 # Reset
+                        self.glitch_intensity = 20 # Spike glitch on switch
             
-            # --- 3. RENDER BASE LAYER ---
-            if self.combat_mode:
-                img = self.render_hunter_vision(img)
-                overlay_color = C_ALERT_RED
-                status_msg = "COMBAT PROTOCOL: ENGAGED"
-            else:
-                # Slight blue tint for normal mode
-                overlay_color = C_HOLO_CYAN
-                status_msg = "SYSTEM: ONLINE"
+                # --- 3. RENDER BASE LAYER ---
+                if self.combat_mode:
+                    img = self.render_hunter_vision(img)
+                    overlay_color = C_ALERT_RED
+                    status_msg = "COMBAT PROTOCOL: ENGAGED"
+                else:
+                    # Slight blue tint for normal mode
+                    overlay_color = C_HOLO_CYAN
+                    status_msg = "SYSTEM: ONLINE"
             
-            # --- 4. RENDER HUD ELEMENTS ---
-            if is_face_detected:
-                self.render_hud_overlay(img, face_lms)
+                # --- 4. RENDER HUD ELEMENTS ---
+                if is_face_detected:
+                    self.render_hud_overlay(img, face_lms)
             
-            # --- 5. POST-PROCESSING (Glitches & UI) ---
-            # Glitch decay
-            if self.glitch_intensity > 0:
-                img = self.apply_chromatic_aberration(img, self.glitch_intensity)
-                self.glitch_intensity -= 2
+                # --- 5. POST-PROCESSING (Glitches & UI) ---
+                # Glitch decay
+                if self.glitch_intensity > 0:
+                    img = self.apply_chromatic_aberration(img, self.glitch_intensity)
+                    self.glitch_intensity -= 2
             
-            # Top Bar UI
-            cv2.rectangle(img, (0,0), (WIDTH, 40), C_DEEP_VOID, -1)
-            cv2.putText(img, status_msg, (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, overlay_color, 2)
-            cv2.putText(img, f"FPS: {int(cv2.getTickFrequency() / (cv2.getTickCount() - self.last_tick) * 10) if hasattr(self, 'last_tick') else 0}", 
-                        (WIDTH-150, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, C_WHITE, 1)
+                # Top Bar UI
+                cv2.rectangle(img, (0,0), (WIDTH, 40), C_DEEP_VOID, -1)
+                cv2.putText(img, status_msg, (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, overlay_color, 2)
+                cv2.putText(img, f"FPS: {int(cv2.getTickFrequency() / (cv2.getTickCount() - self.last_tick) * 10) if hasattr(self, 'last_tick') else 0}", 
+                            (WIDTH-150, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, C_WHITE, 1)
             
-            # Bottom Scanline Bar
-            cv2.line(img, (0, HEIGHT-10), (WIDTH, HEIGHT-10), overlay_color, 2)
+                # Bottom Scanline Bar
+                cv2.line(img, (0, HEIGHT-10), (WIDTH, HEIGHT-10), overlay_color, 2)
             
-            self.last_tick = cv2.getTickCount()
-            cv2.imshow("CYBER_HUD_V2", img)
+                self.last_tick = cv2.getTickCount()
+                cv2.imshow("CYBER_HUD_V2", img)
             
-            key = cv2.waitKey(1)
-            if key == ord('q'):
-                break
-                
-        cap.release()
+                key = cv2.waitKey(1)
+                if key == ord('q'):
+                    break
+        finally:
+            pipeline.stop()
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
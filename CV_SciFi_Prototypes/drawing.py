@@ -4,6 +4,7 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import math
+from capture import ThreadedCapture
 
 # Initialize MediaPipe solutions
 mp_drawing = mp.solutions.drawing_utils
@@ -14,7 +15,7 @@ drawing_spec = mp_drawing.DrawingSpec(thickness=1, circle_radius=1)
 
 # Initialize the webcam
 url = "https://192.0.0.4:8080/video"
-cap = cv2.VideoCapture(0)
+cap = ThreadedCapture(0)
 
 # Check if the webcam is opened correctly
 if not cap.isOpened():
@@ -1,27 +1,15 @@
 import cv2
 import mediapipe as mp # type: ignore
 import numpy as np
-from collections import deque
+import time
+from capture import ThreadedCapture
+from landmark_filters import LandmarkStabilizer
+from mesh_fusion import MeshFusion, triangles_from_edges
 
-# The get_face_triangulation function is no longer needed.
-
-# --- A Class to Stabilize Landmarks over Time ---
-class LandmarkStabilizer:
-    """A class to smooth landmarks over a time window to reduce jitter."""
-    def __init__(self, num_landmarks, window_size=3):
-        self.window_size = window_size
-        self.landmark_history = [deque(maxlen=window_size) for _ in range(num_landmarks)]
-
-    def update(self, landmarks):
-        for i, lm in enumerate(landmarks):
-            self.landmark_history[i].append([lm.x, lm.y, lm.z])
-
-    def get_stable_landmarks(self):
-        stable_landmarks = np.zeros((len(self.landmark_history), 3))
-        for i in range(len(self.landmark_history)):
-            if self.landmark_history[i]:
-                stable_landmarks[i] = np.mean(self.landmark_history[i], axis=0)
-        return stable_landmarks
+# --- Scan Settings ---
+MODEL_NAME = "lidar_scan_model"     # Written as .ply, .glb and .obj
+COVERAGE_TARGET = 3.0               # Fused view weight at which a landmark counts as fully scanned
+LIVE_EXPORT_INTERVAL = 2.0          # Seconds between live re-exports of the .glb while scanning
 
 # --- Main Application ---
 def main():
@@ -33,7 +21,7 @@ def main():
         return
 
     # --- Initialization ---
-    cap = cv2.VideoCapture(0)
+    cap = ThreadedCapture(0)
     if not cap.isOpened():
         print("Error: Could not open webcam.")
         return
@@ -42,10 +30,12 @@ def main():
     h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
     num_landmarks = 478
-    stabilizer = LandmarkStabilizer(num_landmarks, window_size=5)
+    fusion = MeshFusion(num_landmarks, triangles_from_edges(face_triangulation))
+    last_export = time.perf_counter()
+    # One-Euro: steadier than a 5-frame mean while holding still, with less lag on head turns
+    stabilizer = LandmarkStabilizer(num_landmarks, method="one_euro", min_cutoff=1.0, beta=20.0)
 
     coverage_map = np.zeros(num_landmarks)
-    captured_landmarks = []
     visited_angles = set()
 
     mp_face_mesh = mp.solutions.face_mesh
@@ -67,7 +57,7 @@ def main():
 
             if results.multi_face_landmarks:
                 landmarks_mp = results.multi_face_landmarks[0].landmark
-                stabilizer.update(landmarks_mp)
+                stabilizer.update(landmarks_mp, cap.last_timestamp)
                 stable_landmarks = stabilizer.get_stable_landmarks()
 
                 nose_tip = stable_landmarks[1]
@@ -82,10 +72,15 @@ def main():
 
                 if angle_bin not in visited_angles:
                     visited_angles.add(angle_bin)
-                    coverage_map += 0.1
-                    np.clip(coverage_map, 0, 1.0, out=coverage_map)
-                    captured_landmarks.append(stable_landmarks.copy())
-                    print(f"Captured new angle: Yaw={yaw:.2f}, Pitch={pitch:.2f}. Total captures: {len(captured_landmarks)}")
+                    # Same unit on every axis: y is normalized by height, x and z by width
+                    fusion.add(stable_landmarks * (1.0, h / w, 1.0))
+                    coverage_map = np.clip(fusion.weight / COVERAGE_TARGET, 0, 1.0)
+                    print(f"Captured new angle: Yaw={yaw:.2f}, Pitch={pitch:.2f}. Total captures: {fusion.captures}")
+
+                    # Keep a live preview on disk that a 3D viewer can reload
+                    if time.perf_counter() - last_export > LIVE_EXPORT_INTERVAL:
+                        fusion.export(MODEL_NAME, ("glb",))
+                        last_export = time.perf_counter()
 
                 for i in range(num_landmarks):
                     pt = stable_landmarks[i]
@@ -115,30 +110,15 @@ def main():
     cap.release()
     cv2.destroyAllWindows()
 
-    if captured_landmarks:
-        print(f"\nScan finished. Captured {len(captured_landmarks)} unique keyframes.")
-        print("Fusing point cloud into final high-accuracy model...")
-
-        final_landmarks = np.mean(captured_landmarks, axis=0)
-        final_landmarks[:, 1] = -final_landmarks[:, 1] # Negate Y for correct 3D orientation
-
-        save_as_obj(final_landmarks, face_triangulation)
+    if fusion.captures:
+        print(f"\nScan finished. Fused {fusion.captures} unique keyframes.")
+        print(f"Mean landmark spread across views: {np.mean(fusion.spread()) * w:.1f} px")
+        print(f"\n--- Writing final model to {MODEL_NAME}.* ---")
+        for path in fusion.export(MODEL_NAME):
+            print(f"Saved {path}")
     else:
         print("\nScan was cancelled. No data captured.")
 
-def save_as_obj(landmarks, edges, filename="lidar_scan_model.obj"):
-    """Saves the 3D landmarks and tesselation edges as OBJ."""
-    print(f"\n--- Writing final model to {filename} ---")
-
-    with open(filename, 'w') as f:
-        f.write("# 3D Face Scan (Wireframe)\n\n")
-        for v in landmarks:
-            f.write(f"v {v[0]} {v[1]} {v[2]}\n")
-        f.write("\n")
-        for e in edges:
-            f.write(f"l {e[0]+1} {e[1]+1}\n")   # 'l' = line in OBJ
-    print("Successfully saved model.")
-
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,199 @@
+import json
+import time
+
+import numpy as np
+
+# --- FOREST FILE FORMAT ---
+# MAGIC, a little-endian uint32 header length, a JSON header, then the arrays listed in
+# the header, each at a 64-byte aligned offset so they can be used straight from a memmap.
+MAGIC = b"FOREST1\0"
+ALIGN = 64
+ARRAYS = ("roots", "feature", "threshold", "left", "right", "proba")
+
+
+class PackedForest:
+    """
+    A trained sklearn forest flattened into a few packed arrays: every tree's nodes
+    back to back, child indices made global, leaves turned into self-loops (feature 0,
+    threshold +inf, both children pointing at themselves) and their class distributions
+    pre-normalized. Prediction then follows all trees at once, one NumPy gather per
+    level, with no per-call validation or thread pool.
+
+    Mirrors the parts of the sklearn API the prototypes use: classes_, predict_proba()
+    and predict().
+    """
+    def __init__(self, roots, feature, threshold, left, right, proba, classes, max_depth, n_features):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.proba = proba          # (nodes, classes); only leaf rows are ever read
+        self.classes_ = np.asarray(classes)
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Packs a fitted RandomForestClassifier / ExtraTreesClassifier (single output)."""
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        sizes = np.array([tree.node_count for tree in trees])
+        # Node indices are stored as intp: NumPy converts any other index type on every gather
+        roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+        feature, threshold, left, right, proba = [], [], [], [], []
+        for root, tree in zip(roots, trees):
+            own = np.arange(root, root + tree.node_count, dtype=np.intp)
+            leaf = tree.children_left < 0
+            feature.append(np.where(leaf, 0, tree.feature).astype(np.intp))
+            threshold.append(np.where(leaf, np.inf, tree.threshold))
+            left.append(np.where(leaf, own, tree.children_left + root).astype(np.intp))
+            right.append(np.where(leaf, own, tree.children_right + root).astype(np.intp))
+            values = tree.value[:, 0, :]
+            proba.append(values / np.maximum(values.sum(axis=1, keepdims=True), 1e-300))
+
+        # sklearn tests float32 features against float64 thresholds. Rounding each threshold
+        # down to the nearest float32 gives the same x <= t answer for every float32 x.
+        threshold = np.concatenate(threshold)
+        threshold32 = threshold.astype(np.float32)
+        threshold32 = np.where(threshold32 > threshold, np.nextafter(threshold32, np.float32(-np.inf)), threshold32)
+        return cls(roots, np.concatenate(feature), threshold32, np.concatenate(left),
+                   np.concatenate(right), np.concatenate(proba), model.classes_,
+                   max(tree.max_depth for tree in trees), model.n_features_in_)
+
+    def leaves(self, X):
+        """(samples, trees) leaf node index reached by each sample in each tree."""
+        X = np.asarray(X, np.float32)
+        if len(X) == 1:
+            # One sample (the per-frame case): decide every node's branch in one pass,
+            # then each level is a single gather
+            step = np.where(X[0].take(self.feature) <= self.threshold, self.left, self.right)
+            nodes = self.roots
+            for _ in range(self.max_depth):
+                nodes = step.take(nodes)
+            return nodes[None]
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature.take(nodes)] <= self.threshold.take(nodes)
+            nodes = np.where(go_left, self.left.take(nodes), self.right.take(nodes))
+        return nodes
+
+    def predict_proba(self, X):
+        X = np.atleast_2d(X)
+        return self.proba.take(self.leaves(X), axis=0).mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path):
+        arrays = {name: np.ascontiguousarray(getattr(self, name)) for name in ARRAYS}
+        header = {"classes": self.classes_.tolist(), "max_depth": int(self.max_depth),
+                  "n_features": int(self.n_features_in_), "arrays": {}}
+        offset = 0
+        for name, array in arrays.items():
+            header["arrays"][name] = {"dtype": array.dtype.str, "shape": array.shape, "offset": offset}
+            offset += -(-array.nbytes // ALIGN) * ALIGN
+        document = json.dumps(header).encode("utf-8")
+        start = -(-(len(MAGIC) + 4 + len(document)) // ALIGN) * ALIGN
+        with open(path, "wb") as f:
+            f.write(MAGIC + np.uint32(len(document)).tobytes() + document)
+            for name, array in arrays.items():
+                f.seek(start + header["arrays"][name]["offset"])
+                f.write(array.tobytes())
+            f.truncate(start + offset)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps a file written by save(); the arrays are read-only views of it."""
+        # Plain ndarray views: np.memmap's subclass hooks would run on every gather
+        raw = np.memmap(path, np.uint8, mode="r").view(np.ndarray)
+        if bytes(raw[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a packed forest file")
+        length = int(raw[len(MAGIC):len(MAGIC) + 4].view("<u4")[0])
+        header = json.loads(bytes(raw[len(MAGIC) + 4:len(MAGIC) + 4 + length]))
+        start = -(-(len(MAGIC) + 4 + length) // ALIGN) * ALIGN
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"]))
+            begin = start + spec["offset"]
+            arrays[name] = raw[begin:begin + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+        return cls(classes=header["classes"], max_depth=header["max_depth"],
+                   n_features=header["n_features"], **arrays)
+
+
+def export_forest(model, path):
+    """Packs a fitted sklearn forest and writes it for PackedForest.load()."""
+    packed = PackedForest.from_sklearn(model)
+    packed.save(path)
+    return packed
+
+
+# --- Parity check & benchmark ---
+
+def check_parity(model, packed, X):
+    """Raises AssertionError unless the packed forest reproduces sklearn on X."""
+    expected = model.predict_proba(X)
+    got = packed.predict_proba(X)
+    assert np.allclose(got, expected, rtol=0, atol=1e-9), f"max |proba diff| {np.abs(got - expected).max():.3g}"
+    assert (packed.predict(X) == model.predict(X)).all(), "class predictions differ"
+    # The single-sample fast path used per frame
+    singles = np.concatenate([packed.predict_proba(row[None]) for row in X[:200]])
+    assert np.allclose(singles, expected[:200], rtol=0, atol=1e-9), "single-sample path differs"
+
+
+def latency_us(fn, sample, repeats):
+    fn(sample)      # Warm-up
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        started = time.perf_counter()
+        fn(sample)
+        timings[i] = time.perf_counter() - started
+    return np.median(timings) * 1e6, np.percentile(timings, 99) * 1e6
+
+
+def synthetic_pose_data(samples=3000, features=26, seed=0):
+    """Three loosely separated classes with the shape of the combat feature vectors."""
+    rng = np.random.default_rng(seed)
+    y = rng.integers(1, 4, samples)
+    centres = rng.normal(0, 0.3, (4, features))
+    return centres[y] + rng.normal(0, 0.25, (samples, features)), y
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import pickle
+    import tempfile
+    parser = argparse.ArgumentParser(description="Check a packed forest against sklearn and compare per-frame latency.")
+    parser.add_argument("model", nargs="?", help="Pickled sklearn forest (default: train one on synthetic data).")
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--export", metavar="PATH", help="Also keep the packed forest here (e.g. combat_model.forest).")
+    args = parser.parse_args()
+
+    if args.model:
+        with open(args.model, "rb") as f:
+            model = pickle.load(f)
+        X, y = synthetic_pose_data(features=model.n_features_in_)
+    else:
+        from sklearn.ensemble import RandomForestClassifier
+        from pose_features import FEATURE_COUNT, FRAME_FEATURES
+        # Single-frame models from before the motion features must still pack correctly
+        X, y = synthetic_pose_data(features=FRAME_FEATURES)
+        legacy = RandomForestClassifier(n_estimators=20, random_state=0).fit(X[:2000], y[:2000])
+        check_parity(legacy, PackedForest.from_sklearn(legacy), X)
+        X, y = synthetic_pose_data(features=FEATURE_COUNT)
+        model = RandomForestClassifier(n_estimators=100, random_state=0).fit(X[:2000], y[:2000])
+
+    path = args.export or os.path.join(tempfile.mkdtemp(), "model.forest")
+    export_forest(model, path)
+    packed = PackedForest.load(path)
+    check_parity(model, packed, X)
+    print(f"{len(model.estimators_)} trees, {len(packed.feature)} nodes, depth {packed.max_depth}, "
+          f"{model.n_features_in_} features, {os.path.getsize(path) / 1024:.0f} KiB: "
+          f"predictions match sklearn on {len(X)} samples")
+
+    sample = X[:1]
+    for name, fn in (("sklearn predict_proba", model.predict_proba), ("packed predict_proba", packed.predict_proba)):
+        median, p99 = latency_us(fn, sample, args.repeats)
+        print(f"{name:<22} {median:9.1f} us median {p99:9.1f} us p99")
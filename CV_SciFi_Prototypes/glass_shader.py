@@ -0,0 +1,160 @@
+import time
+
+import cv2
+import numpy as np
+
+# --- SHADER CONFIG ---
+DISTORTION_STRENGTH = 15        # How much the light "bends"
+MASK_THRESHOLD = 0.8            # Only pixels this sure to be the user are refracted
+NOISE_SIGMA = 2.0               # Shimmer, in pixels of displacement
+NOISE_TILE = 256                # Noise tiles are NOISE_TILE x NOISE_TILE ...
+NOISE_BANK = 8                  # ... and this many are generated once, then cycled
+
+
+class GlassShader:
+    """
+    The Predator refraction effect, restricted to the user.
+
+    Outside the mask's > MASK_THRESHOLD region the displacement is zero, so the
+    remapped background equals the background there and the blend leaves it
+    unchanged. Only that region's bounding box is therefore processed: gradients,
+    noise, remap and blend. Identity grids are cached per resolution and the
+    shimmer comes from a bank of noise tiles generated once.
+    """
+    def __init__(self, strength=DISTORTION_STRENGTH, seed=None):
+        self.strength = strength
+        rng = np.random.default_rng(seed)
+        self.noise_bank = rng.normal(0, NOISE_SIGMA, (NOISE_BANK, NOISE_TILE, NOISE_TILE)).astype(np.float32)
+        self.rng = rng
+        self.grids = {}         # (h, w) -> (grid_x, grid_y) float32 identity maps
+
+    def identity_grid(self, h, w):
+        grid = self.grids.get((h, w))
+        if grid is None:
+            grid_x, grid_y = np.meshgrid(np.arange(w, dtype=np.float32), np.arange(h, dtype=np.float32))
+            grid = self.grids[(h, w)] = (grid_x, grid_y)
+        return grid
+
+    def noise(self, h, w):
+        """An h x w shimmer field cut from a randomly shifted tile of the bank."""
+        tile = self.noise_bank[self.rng.integers(NOISE_BANK)]
+        tile = np.roll(tile, tuple(self.rng.integers(NOISE_TILE, size=2)), axis=(0, 1))
+        reps = (-(-h // NOISE_TILE), -(-w // NOISE_TILE))
+        return np.tile(tile, reps)[:h, :w]
+
+    @staticmethod
+    def mask_roi(mask):
+        """(x, y, w, h) around the mask's refracted region, or None if it is empty."""
+        binary = (mask > MASK_THRESHOLD).astype(np.uint8)
+        x, y, w, h = cv2.boundingRect(binary)
+        return (x, y, w, h) if w and h else None
+
+    def render(self, background, user_frame, mask):
+        """
+        The composited output frame (uint8): the refracted background blended over
+        the stored background by 'mask', exactly where the full-frame shader would
+        differ from the background.
+        """
+        output = background.copy()
+        roi = self.mask_roi(mask)
+        if roi is None:
+            return output
+        x, y, w, h = roi
+        frame_h, frame_w = background.shape[:2]
+
+        # Gradients need one pixel of real context around the ROI
+        x0, y0 = max(x - 1, 0), max(y - 1, 0)
+        x1, y1 = min(x + w + 1, frame_w), min(y + h + 1, frame_h)
+        gray = cv2.cvtColor(user_frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+        inner = (slice(y - y0, y - y0 + h), slice(x - x0, x - x0 + w))
+        flow_x = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)[inner]
+        flow_y = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)[inner]
+
+        # Displace the identity grid inside the mask only (/255 normalizes the Sobel output)
+        grid_x, grid_y = self.identity_grid(frame_h, frame_w)
+        roi_mask = mask[y:y + h, x:x + w]
+        refract = roi_mask > MASK_THRESHOLD
+        noise = self.noise(h, w)
+        scale = self.strength / 255.0
+        map_x = grid_x[y:y + h, x:x + w].copy()
+        map_y = grid_y[y:y + h, x:x + w].copy()
+        np.add(map_x, flow_x * scale + noise, out=map_x, where=refract)
+        np.add(map_y, flow_y * scale + noise, out=map_y, where=refract)
+
+        # Remap reads from the whole background, so edge pixels can still pull from outside the ROI
+        distorted = cv2.remap(background, map_x, map_y, interpolation=cv2.INTER_LINEAR,
+                              borderMode=cv2.BORDER_REFLECT)
+
+        # Blend: distorted * mask + background * (1 - mask), only where they differ
+        bg_roi = background[y:y + h, x:x + w].astype(np.float32)
+        weight = roi_mask[..., None].astype(np.float32)
+        output[y:y + h, x:x + w] = bg_roi + (distorted.astype(np.float32) - bg_roi) * weight
+        return output
+
+
+def full_frame_glass_shader(background, user_frame, mask, strength=DISTORTION_STRENGTH):
+    """The original whole-frame shader and blend, kept as the benchmark baseline."""
+    h, w = background.shape[:2]
+    gray_user = cv2.cvtColor(user_frame, cv2.COLOR_BGR2GRAY)
+    flow_x = cv2.Sobel(gray_user, cv2.CV_32F, 1, 0, ksize=3)
+    flow_y = cv2.Sobel(gray_user, cv2.CV_32F, 0, 1, ksize=3)
+    noise = np.random.normal(0, NOISE_SIGMA, (h, w)).astype(np.float32)
+    grid_x, grid_y = np.meshgrid(np.arange(w), np.arange(h))
+    map_x = grid_x.astype(np.float32)
+    map_y = grid_y.astype(np.float32)
+    offset_x = (flow_x / 255.0) * strength + noise
+    offset_y = (flow_y / 255.0) * strength + noise
+    binary_mask = mask > MASK_THRESHOLD
+    map_x[binary_mask] += offset_x[binary_mask]
+    map_y[binary_mask] += offset_y[binary_mask]
+    distorted_bg = cv2.remap(background, map_x, map_y, interpolation=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT)
+    mask_3d = np.stack((mask,) * 3, axis=-1)
+    return ((distorted_bg * mask_3d) + (background * (1.0 - mask_3d))).astype(np.uint8)
+
+
+# --- Benchmark ---
+
+def person_mask(frame):
+    """
+    A stand-in for the selfie-segmentation mask on the bench clips (which have no
+    real people): the warm-toned silhouette, blurred like PredatorCloak blurs its mask.
+    """
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    silhouette = cv2.inRange(hsv, (0, 40, 60), (30, 255, 255)).astype(np.float32) / 255.0
+    silhouette = cv2.dilate(silhouette, np.ones((25, 25), np.uint8))
+    return cv2.GaussianBlur(silhouette, (13, 13), 0)
+
+
+def bench_clip(path, shader_fn, frames=None):
+    """Replays a clip through shader_fn(background, frame, mask); returns (frames, seconds in the shader)."""
+    cap = cv2.VideoCapture(path)
+    ok, background = cap.read()
+    count, spent = 0, 0.0
+    while ok and (frames is None or count < frames):
+        ok, frame = cap.read()
+        if not ok:
+            break
+        mask = person_mask(frame)
+        started = time.perf_counter()
+        shader_fn(background, frame, mask)
+        spent += time.perf_counter() - started
+        count += 1
+    cap.release()
+    return count, spent
+
+
+if __name__ == "__main__":
+    import argparse
+    from replay_bench import generate_clips, DEFAULT_CLIP_DIR
+    parser = argparse.ArgumentParser(description="Replay the bench clips through the full-frame and ROI glass shaders.")
+    parser.add_argument("--clips", default=DEFAULT_CLIP_DIR)
+    parser.add_argument("--frames", type=int, default=90, help="Frames per clip.")
+    args = parser.parse_args()
+
+    clips = generate_clips(args.clips)
+    shader = GlassShader(seed=0)
+    print(f"{'Clip':<16} {'Full frame':>12} {'ROI shader':>12} {'Speed-up':>9}")
+    for name in ("motion_720p", "motion_1080p"):
+        frames, old = bench_clip(clips[name], full_frame_glass_shader, args.frames)
+        _, new = bench_clip(clips[name], shader.render, args.frames)
+        print(f"{name:<16} {frames / old:8.1f} fps {frames / new:8.1f} fps {old / new:8.1f}x")
@@ -3,6 +3,7 @@ import mediapipe as mp
 import numpy as np
 import math
 import time
+from capture import ThreadedCapture
 
 # --- CONSTANTS ---
 WIDTH, HEIGHT = 1280, 720
@@ -97,9 +98,7 @@ active_l_pinch = False
 def main():
     global shapes, curr_tool_idx, curr_color_idx, selection_timer, switch_lock, drawing_anchor, held_shape_idx, active_r_pinch, active_l_pinch
     address = "http://192.0.0.4:8080/video"
-    cap = cv2.VideoCapture(address)
-    cap.set(3, WIDTH)
-    cap.set(4, HEIGHT)
+    cap = ThreadedCapture(address, width=WIDTH, height=HEIGHT)
 
     print("--- JARVIS MODE ACTIVATED ---")
     print("RIGHT HAND PINCH: Draw")
@@ -0,0 +1,276 @@
+import math
+
+import numpy as np
+
+# --- FILTER CONFIG ---
+DEFAULT_RATE = 30.0             # Assumed frames per second when no timestamps are given
+RESUM_EVERY = 1024              # Pushes between exact recomputations of the running sum (float drift)
+METHODS = ("mean", "one_euro", "kalman")
+
+
+def landmarks_to_array(landmarks, dims=3):
+    """MediaPipe landmarks (or any objects with .x/.y/.z) -> (N, dims) float64 array."""
+    fields = ("x", "y", "z")[:dims]
+    flat = np.fromiter((getattr(lm, f) for lm in landmarks for f in fields), np.float64)
+    return flat.reshape(-1, dims)
+
+
+class RingBuffer:
+    """
+    The last 'window' arrays of a fixed shape, stored in one (window, *shape) array.
+
+    push() overwrites the oldest slot and keeps a running sum, so mean() is O(1) in the
+    window length. Indexing follows a deque's order: [0] is the oldest, [-1] the newest.
+    """
+    def __init__(self, window, shape, dtype=np.float64):
+        self.window = window
+        self.data = np.zeros((window,) + tuple(np.atleast_1d(shape)), dtype)
+        self.sum = np.zeros(self.data.shape[1:], np.float64)
+        self.count = 0
+        self.head = 0           # Slot the next push() writes
+        self.pushes = 0
+
+    def push(self, values):
+        slot = self.data[self.head]
+        if self.count == self.window:
+            self.sum -= slot
+        else:
+            self.count += 1
+        slot[...] = values
+        self.sum += slot
+        self.head = (self.head + 1) % self.window
+        self.pushes += 1
+        if self.pushes % RESUM_EVERY == 0:
+            self.sum = self.data[:self.count].sum(axis=0, dtype=np.float64)
+        return self
+
+    # deque compatibility
+    append = push
+
+    def mean(self):
+        return self.sum / self.count if self.count else np.zeros_like(self.sum)
+
+    def ordered(self):
+        """A copy of the contents, oldest first."""
+        if self.count < self.window:
+            return self.data[:self.count].copy()
+        return np.roll(self.data, -self.head, axis=0)
+
+    def clear(self):
+        self.count = self.head = 0
+        self.sum[...] = 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError("ring buffer index out of range")
+        if index < 0:
+            index += self.count
+        return self.data[(self.head - self.count + index) % self.window]
+
+
+class OneEuroFilter:
+    """
+    The 1€ filter (Casiez et al., 2012) over a whole array at once: an exponential
+    smoother whose cutoff rises with speed, so slow movement is de-jittered heavily
+    and fast movement follows with little lag. Every element is filtered independently.
+
+    min_cutoff (Hz) sets the smoothing at rest; beta how quickly it opens up with speed
+    (in units of the input per second, so pixel inputs need a smaller beta than
+    normalized ones).
+    """
+    def __init__(self, min_cutoff=1.0, beta=0.007, d_cutoff=1.0, rate=DEFAULT_RATE):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.rate = rate
+        self.value = None
+        self.speed = None
+        self.last_time = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, values, timestamp=None):
+        """Filters one sample; 'timestamp' in seconds (defaults to 1/rate after the last)."""
+        values = np.asarray(values, np.float64)
+        if self.value is None:
+            self.value = values.copy()
+            self.speed = np.zeros_like(values)
+            self.last_time = timestamp
+            return self.value.copy()
+
+        dt = 1.0 / self.rate
+        if timestamp is not None and self.last_time is not None and timestamp > self.last_time:
+            dt = timestamp - self.last_time
+        self.last_time = timestamp
+
+        raw_speed = (values - self.value) / dt
+        self.speed += self._alpha(self.d_cutoff, dt) * (raw_speed - self.speed)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.speed)
+        tau = 1.0 / (2 * math.pi * cutoff)
+        self.value += (values - self.value) / (1.0 + tau / dt)
+        return self.value.copy()
+
+    def reset(self):
+        self.value = self.speed = self.last_time = None
+
+
+class KalmanFilter:
+    """
+    A constant-velocity Kalman filter run independently on every element of an array.
+    The 2x2 covariance of each element is kept as three arrays (p00, p01, p11), so a
+    predict/update step is a handful of whole-array operations.
+
+    process_noise is the variance of the acceleration (input units / s^2);
+    measurement_noise the variance of a single observation (input units^2).
+    """
+    def __init__(self, process_noise=1e-2, measurement_noise=1e-5, rate=DEFAULT_RATE):
+        self.q = process_noise
+        self.r = measurement_noise
+        self.rate = rate
+        self.value = None
+        self.last_time = None
+
+    def __call__(self, values, timestamp=None):
+        values = np.asarray(values, np.float64)
+        if self.value is None:
+            self.value = values.copy()
+            self.velocity = np.zeros_like(values)
+            self.p00 = np.full_like(values, self.r)
+            self.p01 = np.zeros_like(values)
+            self.p11 = np.full_like(values, self.q)
+            self.last_time = timestamp
+            return self.value.copy()
+
+        dt = 1.0 / self.rate
+        if timestamp is not None and self.last_time is not None and timestamp > self.last_time:
+            dt = timestamp - self.last_time
+        self.last_time = timestamp
+
+        # Predict: x += v * dt, P = F P F^T + Q (white-noise acceleration)
+        self.value += self.velocity * dt
+        p00 = self.p00 + dt * (2 * self.p01 + dt * self.p11) + self.q * dt ** 3 / 3
+        p01 = self.p01 + dt * self.p11 + self.q * dt ** 2 / 2
+        p11 = self.p11 + self.q * dt
+
+        # Update with the measured position
+        innovation = values - self.value
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        self.value += k0 * innovation
+        self.velocity += k1 * innovation
+        self.p00 = (1 - k0) * p00
+        self.p01 = (1 - k0) * p01
+        self.p11 = p11 - k1 * p01
+        return self.value.copy()
+
+    def reset(self):
+        self.value = self.last_time = None
+
+
+class LandmarkStabilizer:
+    """
+    Smooths a set of landmarks over time to reduce jitter, all landmarks at once.
+
+    method="mean" averages the last window_size frames (the original behaviour, now a
+    running sum over a RingBuffer); "one_euro" and "kalman" run the corresponding filter,
+    with 'filter_params' passed to its constructor. The raw history is kept in
+    self.history either way.
+    """
+    def __init__(self, num_landmarks, window_size=3, method="mean", dims=3, **filter_params):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}")
+        self.window_size = window_size
+        self.method = method
+        self.dims = dims
+        self.history = RingBuffer(window_size, (num_landmarks, dims))
+        self.filter = {"one_euro": OneEuroFilter, "kalman": KalmanFilter}.get(method)
+        self.filter = self.filter(**filter_params) if self.filter else None
+        self.filtered = None
+
+    def update(self, landmarks, timestamp=None):
+        """'landmarks': an (N, dims) array or MediaPipe landmarks; 'timestamp' in seconds."""
+        points = landmarks if isinstance(landmarks, np.ndarray) else landmarks_to_array(landmarks, self.dims)
+        self.history.push(points)
+        if self.filter is not None:
+            self.filtered = self.filter(points, timestamp)
+
+    def get_stable_landmarks(self):
+        if self.filter is not None and self.filtered is not None:
+            return self.filtered.copy()
+        return self.history.mean()
+
+    def reset(self):
+        self.history.clear()
+        self.filtered = None
+        if self.filter is not None:
+            self.filter.reset()
+
+
+# --- Benchmark ---
+
+class DequeStabilizer:
+    """The original per-landmark deque stabilizer, kept as the benchmark baseline."""
+    def __init__(self, num_landmarks, window_size=3):
+        from collections import deque
+        self.landmark_history = [deque(maxlen=window_size) for _ in range(num_landmarks)]
+
+    def update(self, points):
+        for i, p in enumerate(points):
+            self.landmark_history[i].append(p)
+
+    def get_stable_landmarks(self):
+        stable = np.zeros((len(self.landmark_history), 3))
+        for i, history in enumerate(self.landmark_history):
+            if history:
+                stable[i] = np.mean(history, axis=0)
+        return stable
+
+
+def synthetic_track(frames, num_landmarks, noise, seed=0):
+    """A face-sized landmark cloud swaying and occasionally darting, plus per-frame jitter."""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.35, 0.65, (num_landmarks, 3))
+    t = np.arange(frames) / DEFAULT_RATE
+    sway = np.stack([0.05 * np.sin(t * 1.5), 0.03 * np.sin(t * 0.9), 0.01 * np.cos(t)], axis=1)
+    sway[:, 0] += 0.08 * np.sin(t * 0.4) ** 15           # Quick head turns
+    truth = base[None] + sway[:, None]
+    return truth, truth + rng.normal(0, noise, truth.shape)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Compare landmark stabilizers on a synthetic jittery face track.")
+    parser.add_argument("--landmarks", type=int, default=478)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=0.002, help="Jitter std, in normalized image units.")
+    args = parser.parse_args()
+
+    truth, noisy = synthetic_track(args.frames, args.landmarks, args.noise)
+    candidates = {
+        "deque mean": DequeStabilizer(args.landmarks, args.window),
+        "ring mean": LandmarkStabilizer(args.landmarks, args.window),
+        "one_euro": LandmarkStabilizer(args.landmarks, method="one_euro", min_cutoff=1.0, beta=20.0),
+        "kalman": LandmarkStabilizer(args.landmarks, method="kalman", process_noise=0.01, measurement_noise=args.noise ** 2),
+    }
+    print(f"{args.landmarks} landmarks, {args.frames} frames, jitter {args.noise}: raw RMS error "
+          f"{np.sqrt(np.mean((noisy - truth) ** 2)):.5f}")
+    print(f"{'Stabilizer':<12} {'ms/frame':>9} {'RMS error':>10}")
+    for name, stabilizer in candidates.items():
+        output = np.empty_like(noisy)
+        started = time.perf_counter()
+        for i, points in enumerate(noisy):
+            if isinstance(stabilizer, LandmarkStabilizer):
+                stabilizer.update(points, i / DEFAULT_RATE)
+            else:
+                stabilizer.update(points)
+            output[i] = stabilizer.get_stable_landmarks()
+        spent = (time.perf_counter() - started) * 1000 / args.frames
+        print(f"{name:<12} {spent:9.3f} {np.sqrt(np.mean((output - truth) ** 2)):10.5f}")
@@ -0,0 +1,365 @@
+import os
+import json
+import struct
+
+import numpy as np
+
+# --- FUSION CONFIG ---
+VIEW_POWER = 2.0            # Weight = cos(angle to camera) ** VIEW_POWER; favours landmarks seen head-on
+MIN_WEIGHT = 0.02           # Even grazing views count a little, so no landmark stays unseen
+EXPORT_FORMATS = ("ply", "glb", "obj")
+
+
+# --- Mesh helpers ---
+
+def triangles_from_edges(edges):
+    """
+    Triangles (M, 3) from an edge list such as FACEMESH_TESSELATION, which only
+    lists the edges of its triangles: every 3-cycle of the edge graph is a face,
+    except the rare "separating" 3-cycles that enclose other vertices. A surface edge
+    borders at most two faces, so triangles with two or more over-shared edges are
+    dropped (worst first) until none are left.
+    """
+    edges = sorted({tuple(sorted(map(int, e))) for e in edges})
+    neighbours = {}
+    for a, b in edges:
+        neighbours.setdefault(a, set()).add(b)
+        neighbours.setdefault(b, set()).add(a)
+    triangles = []
+    for a, b in edges:      # a < b; take c > b so each triangle is found once
+        for c in neighbours[a] & neighbours[b]:
+            if c > b:
+                triangles.append((a, b, c))
+    triangles = np.array(triangles, np.int64).reshape(-1, 3)
+
+    # Edge ids are a * n + b with a < b
+    n = max(neighbours) + 1
+    tri_edges = np.stack([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [0, 2]]], axis=1)
+    tri_edges = tri_edges[..., 0] * n + tri_edges[..., 1]
+    while len(triangles):
+        ids, counts = np.unique(tri_edges, return_counts=True)
+        over = (counts[np.searchsorted(ids, tri_edges)] > 2).sum(axis=1)
+        if over.max() < 2:
+            break
+        keep = over < over.max()
+        triangles, tri_edges = triangles[keep], tri_edges[keep]
+    return triangles
+
+
+def face_normals(vertices, triangles):
+    a, b, c = (vertices[triangles[:, i]] for i in range(3))
+    return np.cross(b - a, c - a)
+
+
+def vertex_normals(vertices, triangles):
+    """Unit normals per vertex: the area-weighted sum of the adjacent face normals."""
+    normals = np.zeros_like(vertices, dtype=np.float64)
+    faces = face_normals(vertices, triangles)
+    for i in range(3):
+        np.add.at(normals, triangles[:, i], faces)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return normals / np.maximum(length, 1e-12)
+
+
+def orient_towards(vertices, triangles, direction):
+    """
+    The triangles wound consistently (neighbours traverse their shared edge in opposite
+    directions), with the mesh as a whole facing 'direction'. Walking the surface from
+    one face keeps noisy, edge-on triangles from being flipped on their own.
+    """
+    triangles = triangles.copy()
+    by_edge = {}
+    for t, tri in enumerate(triangles.tolist()):
+        for i in range(3):
+            by_edge.setdefault(frozenset((tri[i], tri[(i + 1) % 3])), []).append(t)
+    done = np.zeros(len(triangles), bool)
+    for seed in range(len(triangles)):          # One walk per connected piece
+        if done[seed]:
+            continue
+        done[seed] = True
+        stack, piece = [seed], [seed]
+        while stack:
+            tri = triangles[stack.pop()].tolist()
+            for i in range(3):
+                a, b = tri[i], tri[(i + 1) % 3]
+                for t in by_edge[frozenset((a, b))]:
+                    if done[t]:
+                        continue
+                    other = triangles[t].tolist()
+                    # Consistent neighbours run the shared edge as b -> a
+                    if any(other[j] == a and other[(j + 1) % 3] == b for j in range(3)):
+                        triangles[t] = other[::-1]
+                    done[t] = True
+                    stack.append(t)
+                    piece.append(t)
+        if face_normals(vertices, triangles[piece]).sum(axis=0) @ np.asarray(direction, np.float64) < 0:
+            triangles[piece] = triangles[piece][:, ::-1]
+    return triangles
+
+
+def similarity_transform(points, reference, weights):
+    """
+    The weighted least-squares rotation, uniform scale and translation (Umeyama) that
+    moves 'points' onto 'reference': (scale, rotation, points_centroid, reference_centroid).
+    """
+    w = weights / weights.sum()
+    p_mean, r_mean = w @ points, w @ reference
+    p, r = points - p_mean, reference - r_mean
+    covariance = (r * w[:, None]).T @ p
+    u, s, vt = np.linalg.svd(covariance)
+    d = np.ones(3)
+    d[2] = np.sign(np.linalg.det(u @ vt)) or 1.0
+    rotation = u @ np.diag(d) @ vt
+    scale = (s * d).sum() / max(w @ (p ** 2).sum(axis=1), 1e-12)
+    return scale, rotation, p_mean, r_mean
+
+
+def similarity_align(points, reference, weights):
+    """'points' moved onto 'reference', i.e. with the head pose and distance removed."""
+    scale, rotation, p_mean, r_mean = similarity_transform(points, reference, weights)
+    return scale * (points - p_mean) @ rotation.T + r_mean
+
+
+# --- Fusion ---
+
+class MeshFusion:
+    """
+    Fuses face-mesh captures into one surface with running, per-landmark weighted
+    statistics (mean and variance, West's algorithm), so memory stays O(landmarks)
+    however many keyframes are added.
+
+    Each capture is first aligned onto the current estimate (rotation, scale and
+    translation), then each landmark is weighted by how squarely it faced the camera
+    in that capture (back-facing landmarks were occluded and barely count) times the
+    optional per-landmark visibility. Points are in camera space: x right, y down,
+    z away from the camera, all in the same unit (scale y by height / width for
+    normalized MediaPipe landmarks).
+    """
+    def __init__(self, num_landmarks, triangles):
+        self.triangles = np.asarray(triangles, np.int64)
+        self.oriented = None        # Triangles wound to face the camera, fixed by the first capture
+        self.mean = np.zeros((num_landmarks, 3))
+        self.weight = np.zeros(num_landmarks)
+        self.m2 = np.zeros(num_landmarks)     # Weighted sum of squared deviations (summed over x, y, z)
+        self.captures = 0
+
+    def view_weights(self, normals):
+        """cos(angle between the landmark normal and the camera) ** VIEW_POWER, floored at MIN_WEIGHT."""
+        facing = np.clip(-normals[:, 2], 0.0, 1.0)
+        return np.maximum(facing ** VIEW_POWER, MIN_WEIGHT)
+
+    def add(self, points, visibility=None):
+        """Fuses one (N, 3) capture; 'visibility' is an optional (N,) factor in [0, 1]."""
+        points = np.asarray(points, np.float64)
+        if not self.captures:
+            self.oriented = orient_towards(points, self.triangles, (0.0, 0.0, -1.0))
+            normals = vertex_normals(points, self.oriented)
+        else:
+            # Pose the capture onto the estimate, and judge the view angles from the
+            # estimate's (much less noisy) normals turned back into the capture's pose
+            scale, rotation, p_mean, r_mean = similarity_transform(points, self.mean, np.minimum(self.weight, 1.0))
+            points = scale * (points - p_mean) @ rotation.T + r_mean
+            normals = vertex_normals(self.mean, self.oriented) @ rotation
+        weights = self.view_weights(normals)
+        if visibility is not None:
+            weights = weights * np.clip(visibility, 0.0, 1.0)
+
+        # West's weighted incremental mean / variance
+        total = self.weight + weights
+        delta = points - self.mean
+        self.mean += delta * (weights / np.maximum(total, 1e-12))[:, None]
+        self.m2 += weights * (delta * (points - self.mean)).sum(axis=1)
+        self.weight = total
+        self.captures += 1
+        return weights
+
+    def spread(self):
+        """Per-landmark weighted standard deviation of the fused captures (same unit as the points)."""
+        return np.sqrt(self.m2 / np.maximum(self.weight, 1e-12))
+
+    def model(self):
+        """
+        (vertices, normals, triangles) for export: centred, rotated 180 degrees about x
+        so y is up and the face looks down +z (the glTF convention), as float32.
+        """
+        vertices = (self.mean - self.mean.mean(axis=0)) * (1.0, -1.0, -1.0)
+        triangles = self.oriented if self.oriented is not None else self.triangles
+        normals = vertex_normals(vertices, triangles)
+        return vertices.astype(np.float32), normals.astype(np.float32), triangles
+
+    def export(self, basename, formats=EXPORT_FORMATS):
+        """Writes basename.<fmt> for each format; safe to call repeatedly while scanning."""
+        vertices, normals, triangles = self.model()
+        confidence = np.minimum(self.weight, 1.0).astype(np.float32)
+        writers = {"ply": lambda p: save_ply(p, vertices, triangles, normals, confidence),
+                   "glb": lambda p: save_glb(p, vertices, triangles, normals),
+                   "obj": lambda p: save_obj(p, vertices, triangles, normals)}
+        paths = []
+        for fmt in formats:
+            path = f"{basename}.{fmt}"
+            atomic_write(path, writers[fmt])
+            paths.append(path)
+        return paths
+
+
+# --- Export ---
+
+def atomic_write(path, writer):
+    """Runs writer(tmp_path) and renames over 'path', so a viewer never loads a half-written file."""
+    tmp = f"{path}.tmp"
+    writer(tmp)
+    os.replace(tmp, path)
+
+
+def save_ply(path, vertices, triangles, normals=None, confidence=None):
+    """Binary little-endian PLY: one bulk write for the vertex table and one for the faces."""
+    fields = [("x", "<f4"), ("y", "<f4"), ("z", "<f4")]
+    if normals is not None:
+        fields += [("nx", "<f4"), ("ny", "<f4"), ("nz", "<f4")]
+    if confidence is not None:
+        fields += [("confidence", "<f4")]
+    table = np.empty(len(vertices), fields)
+    table["x"], table["y"], table["z"] = vertices.T
+    if normals is not None:
+        table["nx"], table["ny"], table["nz"] = normals.T
+    if confidence is not None:
+        table["confidence"] = confidence
+
+    faces = np.empty(len(triangles), [("n", "u1"), ("v", "<i4", 3)])
+    faces["n"] = 3
+    faces["v"] = triangles
+
+    header = ["ply", "format binary_little_endian 1.0", "comment 3D Face Scan",
+              f"element vertex {len(vertices)}"]
+    header += [f"property float {name}" for name, _ in fields]
+    header += [f"element face {len(triangles)}", "property list uchar int vertex_indices", "end_header"]
+    with open(path, "wb") as f:
+        f.write(("\n".join(header) + "\n").encode("ascii"))
+        f.write(table.tobytes())
+        f.write(faces.tobytes())
+
+
+def save_glb(path, vertices, triangles, normals=None):
+    """Binary glTF 2.0: one mesh with POSITION (+NORMAL) and indexed triangles in one buffer."""
+    index_type, index_component = (np.uint16, 5123) if len(vertices) < 65535 else (np.uint32, 5125)
+    blobs = [vertices.astype("<f4").tobytes()]
+    attributes = {"POSITION": 0}
+    accessors = [{"bufferView": 0, "componentType": 5126, "count": len(vertices), "type": "VEC3",
+                  "min": vertices.min(axis=0).tolist(), "max": vertices.max(axis=0).tolist()}]
+    if normals is not None:
+        blobs.append(normals.astype("<f4").tobytes())
+        attributes["NORMAL"] = 1
+        accessors.append({"bufferView": 1, "componentType": 5126, "count": len(normals), "type": "VEC3"})
+    blobs.append(triangles.astype(index_type).tobytes())
+    accessors.append({"bufferView": len(blobs) - 1, "componentType": index_component,
+                      "count": triangles.size, "type": "SCALAR"})
+
+    views, offset, binary = [], 0, b""
+    for i, blob in enumerate(blobs):
+        blob += b"\0" * (-len(blob) % 4)
+        target = 34963 if i == len(blobs) - 1 else 34962     # ELEMENT_ARRAY_BUFFER / ARRAY_BUFFER
+        views.append({"buffer": 0, "byteOffset": offset, "byteLength": len(blob), "target": target})
+        offset += len(blob)
+        binary += blob
+
+    gltf = {
+        "asset": {"version": "2.0", "generator": "face_scanner"},
+        "scene": 0, "scenes": [{"nodes": [0]}], "nodes": [{"mesh": 0, "name": "face_scan"}],
+        "meshes": [{"primitives": [{"attributes": attributes, "indices": len(accessors) - 1, "mode": 4}]}],
+        "buffers": [{"byteLength": len(binary)}], "bufferViews": views, "accessors": accessors,
+    }
+    document = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    document += b" " * (-len(document) % 4)
+    with open(path, "wb") as f:
+        f.write(struct.pack("<4sII", b"glTF", 2, 12 + 8 + len(document) + 8 + len(binary)))
+        f.write(struct.pack("<I4s", len(document), b"JSON") + document)
+        f.write(struct.pack("<I4s", len(binary), b"BIN\0") + binary)
+
+
+def save_obj(path, vertices, triangles, normals=None):
+    """Text OBJ with triangular faces, formatted with np.savetxt rather than a write per line."""
+    with open(path, "w") as f:
+        f.write("# 3D Face Scan\n")
+        np.savetxt(f, vertices, fmt="v %.6f %.6f %.6f")
+        if normals is not None:
+            np.savetxt(f, normals, fmt="vn %.6f %.6f %.6f")
+            one_based = np.repeat(triangles + 1, 2, axis=1)
+            np.savetxt(f, one_based, fmt="f %d//%d %d//%d %d//%d")
+        else:
+            np.savetxt(f, triangles + 1, fmt="f %d %d %d")
+
+
+# --- Benchmark ---
+
+def synthetic_face(num_landmarks=478, seed=0):
+    """A face-like cap of points (x right, y down, z away) and its Delaunay triangle edges."""
+    import cv2
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(-1, 1, (num_landmarks * 2, 2))
+    xy = xy[(xy ** 2).sum(axis=1) < 1][:num_landmarks] * (0.08, 0.11)
+    z = -0.06 * np.sqrt(np.clip(1 - ((xy / (0.08, 0.11)) ** 2).sum(axis=1), 0, 1))
+    # Subdiv2D works in float32 pixel-like units; map its triangles back to point indices
+    pixels = ((xy + 1) * 1000).astype(np.float32)
+    subdiv = cv2.Subdiv2D((0, 0, 2000, 2000))
+    subdiv.insert(pixels.tolist())
+    lookup = {tuple(p): i for i, p in enumerate(pixels.tolist())}
+    edges = set()
+    for t in subdiv.getTriangleList().astype(np.float32).tolist():
+        a, b, c = (lookup.get((t[i], t[i + 1])) for i in (0, 2, 4))
+        if None not in (a, b, c):
+            edges |= {(a, b), (b, c), (a, c)}
+    return np.column_stack([xy, z]), edges
+
+
+def random_capture(points, triangles, rng, noise, max_angle=0.5):
+    """
+    The face turned by a random yaw/pitch, moved and scaled like a head in front of a
+    webcam, with landmark noise that grows as the surface turns away from the camera
+    (as MediaPipe's does).
+    """
+    yaw, pitch = rng.uniform(-max_angle, max_angle, 2)
+    ry = np.array([[np.cos(yaw), 0, np.sin(yaw)], [0, 1, 0], [-np.sin(yaw), 0, np.cos(yaw)]])
+    rx = np.array([[1, 0, 0], [0, np.cos(pitch), -np.sin(pitch)], [0, np.sin(pitch), np.cos(pitch)]])
+    posed = rng.uniform(0.9, 1.1) * points @ (rx @ ry).T + rng.uniform(-0.1, 0.1, 3) + (0.5, 0.5, 0)
+    facing = np.clip(-vertex_normals(posed, triangles)[:, 2], 0.0, 1.0)
+    return posed + rng.normal(0, 1, posed.shape) * (noise / (0.25 + facing))[:, None]
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    import time
+    parser = argparse.ArgumentParser(description="Fuse synthetic face captures and time the mesh export.")
+    parser.add_argument("--captures", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.002)
+    parser.add_argument("--out", default=None, help="Basename for the exported mesh (default: a temp dir).")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    truth, edges = synthetic_face()
+    triangles = triangles_from_edges(edges)
+    fusion = MeshFusion(len(truth), triangles)
+    oriented = orient_towards(truth, triangles, (0.0, 0.0, -1.0))
+    captures = [random_capture(truth, oriented, rng, args.noise) for _ in range(args.captures)]
+
+    started = time.perf_counter()
+    for points in captures:
+        fusion.add(points)
+    fuse_ms = (time.perf_counter() - started) * 1000 / args.captures
+
+    def shape_error(estimate):
+        aligned = similarity_align(estimate, truth, np.ones(len(truth)))
+        return np.sqrt(np.mean(((aligned - truth) ** 2).sum(axis=1)))
+
+    print(f"{len(truth)} landmarks, {len(triangles)} triangles, {args.captures} captures")
+    print(f"plain mean of keyframes: shape error {shape_error(np.mean(captures, axis=0)):.5f}, "
+          f"{np.asarray(captures).nbytes / 1024:.0f} KiB held")
+    state = fusion.mean.nbytes + fusion.weight.nbytes + fusion.m2.nbytes
+    print(f"weighted fusion:         shape error {shape_error(fusion.mean):.5f}, "
+          f"{state / 1024:.0f} KiB held, {fuse_ms:.2f} ms per capture")
+
+    basename = args.out or os.path.join(tempfile.mkdtemp(), "face_scan")
+    for fmt in EXPORT_FORMATS:
+        started = time.perf_counter()
+        path, = fusion.export(basename, (fmt,))
+        print(f"{fmt}: {(time.perf_counter() - started) * 1000:.2f} ms, {os.path.getsize(path)} bytes -> {path}")
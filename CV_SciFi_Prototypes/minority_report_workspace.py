@@ -3,6 +3,7 @@ import mediapipe as mp
 import numpy as np
 import math
 import random
+from capture import ThreadedCapture
 
 # --- CONFIG ---
 WIDTH, HEIGHT = 1280, 720
@@ -147,9 +148,7 @@ def main():
     segmenter = mp_selfie.SelfieSegmentation(model_selection=1) # 1 = landscape mode (more robust)
 
     address = "http://192.0.0.4:8080/video"
-    cap = cv2.VideoCapture(address)
-    cap.set(3, WIDTH)
-    cap.set(4, HEIGHT)
+    cap = ThreadedCapture(address, width=WIDTH, height=HEIGHT)
 
     # Windows Store
     windows = [
@@ -0,0 +1,235 @@
+import time
+import threading
+from collections import deque
+
+import capture
+
+# --- PIPELINE CONFIG ---
+DEFAULT_MAX_AGE = 0.5       # Seconds; older frames are dropped instead of processed
+EMA = 0.1                   # Smoothing for the timing figures
+
+
+class Frame:
+    """A captured image travelling through the pipeline, plus whatever the stages attach."""
+    __slots__ = ("seq", "timestamp", "image", "results")
+
+    def __init__(self, seq, timestamp, image):
+        self.seq = seq
+        self.timestamp = timestamp      # perf_counter() time the camera delivered it
+        self.image = image
+        self.results = {}
+
+    def age(self):
+        return time.perf_counter() - self.timestamp
+
+
+class LatestQueue:
+    """Bounded queue whose put() evicts the oldest item when full, so consumers always see fresh work."""
+    def __init__(self, maxsize=1):
+        self.items = deque(maxlen=maxsize)
+        self.cond = threading.Condition()
+        self.closed = False
+
+    def put(self, item, block=False):
+        """Returns the number of items evicted (0 or 1). With block=True, waits for room instead."""
+        with self.cond:
+            if block:
+                self.cond.wait_for(lambda: len(self.items) < self.items.maxlen or self.closed)
+            evicted = int(len(self.items) == self.items.maxlen)
+            self.items.append(item)
+            self.cond.notify()
+            return evicted
+
+    def get(self):
+        """The oldest queued item, or None once the queue is closed and empty."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.items or self.closed)
+            item = self.items.popleft() if self.items else None
+            self.cond.notify_all()      # Wake a blocked put()
+            return item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class Stage:
+    """
+    One worker thread: takes frames from its input queue, runs fn(frame) and passes
+    the frame on. fn stores its output in frame.results; returning False drops the frame.
+    """
+    def __init__(self, name, fn, queue_size=1):
+        self.name = name
+        self.fn = fn
+        self.input = LatestQueue(queue_size)
+        self.processed = 0
+        self.dropped = 0        # Evicted from the queue or too old when their turn came
+        self.busy_ms = 0.0
+
+    def record(self, seconds):
+        if capture.recorder is not None:
+            capture.recorder.stage(self.name, seconds)
+        self.processed += 1
+        self.busy_ms = seconds * 1000 if not self.busy_ms else self.busy_ms + EMA * (seconds * 1000 - self.busy_ms)
+
+
+class Pipeline:
+    """
+    Capture -> stage threads -> the caller's render loop, with a one-slot LatestQueue
+    between each step. While the caller renders frame N, the stages already work on
+    N+1 (MediaPipe and OpenCV release the GIL in their native code), and a stage that
+    falls behind drops frames rather than building up lag.
+
+        with Pipeline(cap, [Stage("track", track)], prepare=lambda img: cv2.flip(img, 1)) as pipeline:
+            for frame in pipeline:
+                render(frame.image, frame.results)
+
+    'prepare' runs on the capture thread and must return an array it owns: the
+    capture's buffer is reused as soon as the next frame is read (flip/resize/cvtColor
+    all return new arrays). Rendering stays on the calling thread, as cv2.imshow needs.
+
+    With lossless=True (the default when the source itself doesn't drop frames, i.e.
+    a video file being replayed) nothing is dropped: each step waits for the next.
+    """
+    def __init__(self, source, stages, prepare=None, max_age=DEFAULT_MAX_AGE, output_size=1, lossless=None):
+        self.source = source
+        self.stages = list(stages)
+        self.prepare = prepare or (lambda img: img.copy())
+        self.lossless = not getattr(source, "drop", True) if lossless is None else lossless
+        self.max_age = None if self.lossless else max_age
+        self.output = LatestQueue(output_size)
+        self.render_dropped = 0
+        self.threads = []
+        self.error = None
+        self.stopped = False
+
+        # Stats
+        self.rendered = 0
+        self.latency_ms = 0.0       # Capture -> handed to the render loop
+        self.e2e_ms = 0.0           # Capture -> render loop asks for the next frame
+        self.render_fps = 0.0
+        self.last_yield_time = None
+
+    # --- Threads ---
+
+    def _queues(self):
+        return [stage.input for stage in self.stages] + [self.output]
+
+    def _capture(self):
+        seq = 0
+        first = self._queues()[0]
+        while not self.stopped:
+            ok, image = self.source.read()
+            if not ok:
+                break
+            stamp = getattr(self.source, "last_timestamp", None) or time.perf_counter()
+            seq += 1
+            started = time.perf_counter()
+            frame = Frame(seq, stamp, self.prepare(image))
+            if capture.recorder is not None:
+                capture.recorder.stage("prepare", time.perf_counter() - started)
+            evicted = first.put(frame, self.lossless)
+            if self.stages:
+                self.stages[0].dropped += evicted
+            else:
+                self.render_dropped += evicted
+        first.close()
+
+    def _run_stage(self, index):
+        stage = self.stages[index]
+        downstream = self._queues()[index + 1]
+        while True:
+            frame = stage.input.get()
+            if frame is None:
+                break
+            if self.max_age and frame.age() > self.max_age:
+                stage.dropped += 1
+                continue
+            started = time.perf_counter()
+            keep = stage.fn(frame)
+            stage.record(time.perf_counter() - started)
+            if keep is False:
+                continue
+            evicted = downstream.put(frame, self.lossless)
+            if index + 1 < len(self.stages):
+                self.stages[index + 1].dropped += evicted
+            else:
+                self.render_dropped += evicted
+        downstream.close()
+
+    def _guard(self, target, *args):
+        try:
+            target(*args)
+        except BaseException as e:       # Surfaced in the render loop
+            self.error = e
+            self.stopped = True
+            for queue in self._queues():
+                queue.close()
+
+    def start(self):
+        self.threads = [threading.Thread(target=self._guard, args=(self._capture,), daemon=True)]
+        self.threads += [threading.Thread(target=self._guard, args=(self._run_stage, i), daemon=True)
+                         for i in range(len(self.stages))]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stops the threads and releases the source."""
+        self.stopped = True
+        for queue in self._queues():
+            queue.close()
+        self.source.release()       # Unblocks a capture thread waiting in read()
+        for thread in self.threads:
+            thread.join(timeout=2.0)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Render side ---
+
+    def __iter__(self):
+        while True:
+            frame = self.output.get()
+            if frame is None:
+                if self.error is not None:
+                    raise self.error
+                return
+            if self.max_age and frame.age() > self.max_age:
+                self.render_dropped += 1
+                continue
+            yielded = time.perf_counter()
+            if self.last_yield_time is not None:
+                fps = 1.0 / max(yielded - self.last_yield_time, 1e-6)
+                self.render_fps = fps if not self.render_fps else self.render_fps + EMA * (fps - self.render_fps)
+            self.latency_ms = self._smooth(self.latency_ms, yielded - frame.timestamp)
+            self.rendered += 1
+            self.last_yield_time = yielded
+            if capture.recorder is not None:
+                capture.recorder.frame_out(frame.timestamp)
+            yield frame
+            # Back here once the caller has drawn and shown the frame
+            self.e2e_ms = self._smooth(self.e2e_ms, time.perf_counter() - frame.timestamp)
+
+    @staticmethod
+    def _smooth(current, seconds):
+        value = seconds * 1000
+        return value if not current else current + EMA * (value - current)
+
+    def stats(self):
+        return {
+            "stages": {stage.name: {"processed": stage.processed, "dropped": stage.dropped,
+                                    "busy_ms": stage.busy_ms} for stage in self.stages},
+            "rendered": self.rendered, "render_dropped": self.render_dropped, "render_fps": self.render_fps,
+            "latency_ms": self.latency_ms, "e2e_ms": self.e2e_ms,
+        }
+
+    def stats_text(self):
+        s = self.stats()
+        stages = " | ".join(f"{name} {info['busy_ms']:.0f} ms (-{info['dropped']})" for name, info in s["stages"].items())
+        return (f"{stages} | render {s['render_fps']:.1f} fps (-{s['render_dropped']}) | "
+                f"latency {s['latency_ms']:.0f} ms | e2e {s['e2e_ms']:.0f} ms")
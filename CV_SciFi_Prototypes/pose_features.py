@@ -0,0 +1,155 @@
+import numpy as np
+
+from landmark_filters import DEFAULT_RATE, RingBuffer
+
+# --- FEATURE CONFIG ---
+# 11=Left Shoulder, 12=Right Shoulder, 13=Left Elbow, 14=Right Elbow, 15=Left Wrist, 16=Right Wrist
+UPPER_BODY = [11, 12, 13, 14, 15, 16]
+FRAME_FEATURES = 26         # Per frame: (x, y, z, visibility) x 6 landmarks + 2 arm extensions
+# Positions and extensions move; visibility doesn't, so only these get motion features
+MOTION = np.array([i * 4 + k for i in range(6) for k in range(3)] + [24, 25])
+DEFAULT_WINDOW = 8          # Frames of motion history (~0.25 s at 30 fps, about one punch)
+FEATURE_COUNT = FRAME_FEATURES + 4 * len(MOTION)
+
+
+def extract_features(landmarks):
+    """
+    The per-frame pose vector, purely relative coordinates (invariant to camera distance):
+    each upper-body landmark relative to the centre of the shoulders, its z and visibility,
+    then the wrist-to-shoulder distance of each arm (extension factor).
+    """
+    lms = landmarks.landmark
+    points = np.array([(lms[i].x, lms[i].y, lms[i].z, lms[i].visibility) for i in UPPER_BODY])
+    center = (points[0, :2] + points[1, :2]) / 2
+
+    features = np.empty(FRAME_FEATURES)
+    rows = features[:24].reshape(6, 4)
+    rows[:] = points
+    rows[:, :2] -= center
+    # Left / right arm extension: wrist to shoulder
+    features[24] = np.hypot(*(points[4, :2] - points[0, :2]))
+    features[25] = np.hypot(*(points[5, :2] - points[1, :2]))
+    return features
+
+
+class PoseFeatureStream:
+    """
+    Turns the per-frame pose vectors into motion-aware features, O(1) per frame:
+
+        [frame vector (26) | velocity | acceleration | window mean velocity | window std velocity]
+
+    with velocity and acceleration (per second) of the positions and arm extensions.
+    The window statistics come from a RingBuffer of [v, v^2] rows and its running sum,
+    so nothing is recomputed over the window. The first FRAME_FEATURES entries are the
+    old single-frame features, which keeps single-frame models usable.
+    """
+    def __init__(self, window=DEFAULT_WINDOW, rate=DEFAULT_RATE):
+        self.window = window
+        self.rate = rate
+        self.moments = RingBuffer(window, (2, len(MOTION)))
+        self.features = np.zeros(FEATURE_COUNT)
+        self.previous = None        # Last frame's motion values
+        self.velocity = np.zeros(len(MOTION))
+        self.last_time = None
+
+    def update(self, frame, timestamp=None):
+        """
+        Adds one frame vector (from extract_features); returns the full feature vector.
+        The array is reused on the next update(): copy it to keep it.
+        """
+        frame = np.asarray(frame, np.float64)
+        motion = frame[MOTION]
+        dt = 1.0 / self.rate
+        if timestamp is not None and self.last_time is not None and timestamp > self.last_time:
+            dt = timestamp - self.last_time
+        self.last_time = timestamp
+
+        if self.previous is None:
+            velocity = np.zeros_like(motion)
+            acceleration = np.zeros_like(motion)
+        else:
+            velocity = (motion - self.previous) / dt
+            acceleration = (velocity - self.velocity) / dt
+        self.previous, self.velocity = motion, velocity
+        self.moments.push((velocity, velocity * velocity))
+        mean, mean_sq = self.moments.mean()
+
+        n = len(MOTION)
+        out = self.features
+        out[:FRAME_FEATURES] = frame
+        out[FRAME_FEATURES:FRAME_FEATURES + n] = velocity
+        out[FRAME_FEATURES + n:FRAME_FEATURES + 2 * n] = acceleration
+        out[FRAME_FEATURES + 2 * n:FRAME_FEATURES + 3 * n] = mean
+        np.sqrt(np.maximum(mean_sq - mean * mean, 0.0), out=out[FRAME_FEATURES + 3 * n:])
+        return out
+
+    def reset(self):
+        """Forget the motion history (call when the pose is lost, so old motion doesn't leak in)."""
+        self.moments.clear()
+        self.previous = self.last_time = None
+        self.velocity[:] = 0
+
+
+def for_model(features, model):
+    """The feature vector trimmed to what 'model' was trained on (single-frame models use the first 26)."""
+    n = getattr(model, "n_features_in_", len(features))
+    return features[:n].reshape(1, -1)
+
+
+# --- Benchmark ---
+
+def recompute_window(frames, rate=DEFAULT_RATE):
+    """The same features recomputed from a stored window each frame, as the benchmark baseline."""
+    motion = np.asarray(frames)[:, MOTION]
+    velocity = np.diff(motion, axis=0) * rate
+    acceleration = np.diff(velocity, axis=0) * rate
+    return np.concatenate([frames[-1], velocity[-1], acceleration[-1], velocity.mean(axis=0), velocity.std(axis=0)])
+
+
+def synthetic_frames(frames, seed=0):
+    """Frame vectors of a boxer: a guard with small sway and a jab every second."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames) / DEFAULT_RATE
+    base = rng.uniform(-0.2, 0.2, FRAME_FEATURES)
+    jab = np.maximum(np.sin(2 * np.pi * t), 0) ** 8
+    data = base + rng.normal(0, 0.003, (frames, FRAME_FEATURES))
+    data[:, 16] += 0.25 * jab       # Left wrist x
+    data[:, 24] += 0.25 * jab       # Left arm extension
+    return data
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from collections import deque
+    from types import SimpleNamespace
+    parser = argparse.ArgumentParser(description="Per-frame cost of the streaming pose features vs recomputing the window.")
+    parser.add_argument("--frames", type=int, default=3000)
+    args = parser.parse_args()
+
+    data = synthetic_frames(args.frames)
+    pose = SimpleNamespace(landmark=[SimpleNamespace(x=0.5, y=0.5, z=0.0, visibility=1.0)] * 33)
+    started = time.perf_counter()
+    for _ in range(args.frames):
+        extract_features(pose)
+    extract_us = (time.perf_counter() - started) * 1e6 / args.frames
+    print(f"{FEATURE_COUNT} features per frame ({FRAME_FEATURES} pose + 4 x {len(MOTION)} motion); "
+          f"extract_features {extract_us:.1f} us")
+    print(f"{'Window':>6} {'streaming':>12} {'recompute':>12}")
+    for window in (4, 8, 16, 32, 64):
+        stream = PoseFeatureStream(window)
+        started = time.perf_counter()
+        for frame in data:
+            streamed = stream.update(frame)
+        stream_us = (time.perf_counter() - started) * 1e6 / len(data)
+
+        history = deque(maxlen=window + 1)      # window velocities need window + 1 frames
+        started = time.perf_counter()
+        for frame in data:
+            history.append(frame)
+            if len(history) > 2:
+                recomputed = recompute_window(history)
+        recompute_us = (time.perf_counter() - started) * 1e6 / len(data)
+        # Both see the same last window once it is full
+        assert np.allclose(streamed, recomputed), "streaming and recomputed features differ"
+        print(f"{window:>6} {stream_us:9.1f} us {recompute_us:9.1f} us")
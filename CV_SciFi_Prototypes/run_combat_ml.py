@@ -3,9 +3,13 @@ import mediapipe as mp
 import numpy as np
 import pickle
 import time
+from capture import ThreadedCapture
+from forest_inference import PackedForest
+from pose_features import PoseFeatureStream, extract_features, for_model
 
 # --- CONFIG ---
 MODEL_FILE = "combat_model.pkl"
+FOREST_FILE = "combat_model.forest"  # Written next to the pickle by combat_analyzer.py
 PROB_THRESHOLD = 0.65  # 65% Confidence required to trigger
 
 # Colors
@@ -13,40 +17,27 @@ C_RED = (0, 0, 255)
 C_CYAN = (255, 255, 0)
 C_GREEN = (0, 255, 0)
 
-def extract_features(landmarks):
-    """ MUST MATCH TRAINING FEATURE EXTRACTION EXACTLY """
-    lms = landmarks.landmark
-    center_x = (lms[11].x + lms[12].x) / 2
-    center_y = (lms[11].y + lms[12].y) / 2
-    
-    features = []
-    relevant_indices = [11, 12, 13, 14, 15, 16]
-    for i in relevant_indices:
-        features.append(lms[i].x - center_x)
-        features.append(lms[i].y - center_y)
-        features.append(lms[i].z)
-        features.append(lms[i].visibility)
-    
-    features.append(np.linalg.norm([lms[15].x - lms[11].x, lms[15].y - lms[11].y]))
-    features.append(np.linalg.norm([lms[16].x - lms[12].x, lms[16].y - lms[12].y]))
-    return features
-
 def main():
-    # Load Model
+    # Load Model (the memory-mapped packed forest; the pickle only if it hasn't been exported)
     try:
-        with open(MODEL_FILE, 'rb') as f:
-            model = pickle.load(f)
-        print("Model Loaded Successfully.")
-    except:
-        print("ERROR: Run train_combat.py first!")
-        return
+        model = PackedForest.load(FOREST_FILE)
+        print("Packed Model Loaded Successfully.")
+    except FileNotFoundError:
+        try:
+            with open(MODEL_FILE, 'rb') as f:
+                model = pickle.load(f)
+            print("Model Loaded Successfully (run 'python forest_inference.py combat_model.pkl --export combat_model.forest' for faster inference).")
+        except:
+            print("ERROR: Run combat_analyzer.py first!")
+            return
 
     mp_pose = mp.solutions.pose
     pose = mp_pose.Pose(min_detection_confidence=0.7, min_tracking_confidence=0.7)
-    cap = cv2.VideoCapture(0)
-    cap.set(3, 1280)
-    cap.set(4, 720)
+    cap = ThreadedCapture(0, width=1280, height=720)
     
+    # Same motion features as the trainer
+    stream = PoseFeatureStream()
+
     # State tracking
     last_action = "PASSIVE"
     action_color = C_GREEN
@@ -66,13 +57,13 @@ def main():
         cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
         
         if results.pose_landmarks:
-            # 1. Extract Features
-            feats = extract_features(results.pose_landmarks)
+            # 1. Extract Features (pose + motion over the last frames)
+            feats = stream.update(extract_features(results.pose_landmarks), cap.last_timestamp)
             
-            # 2. Predict (reshaped to single sample)
-            feats_array = np.array(feats).reshape(1, -1)
-            prediction = model.predict(feats_array)[0]
+            # 2. Predict (reshaped to single sample); one pass gives both class and confidence
+            feats_array = for_model(feats, model)
             probs = model.predict_proba(feats_array)[0]
+            prediction = model.classes_[np.argmax(probs)]
             confidence = np.max(probs)
             
             # 3. Logic
@@ -101,6 +92,8 @@ def main():
             cv2.rectangle(frame, (20, 110), (20 + bar_width, 120), action_color, -1)
             cv2.rectangle(frame, (20, 110), (220, 120), (255,255,255), 1)
             cv2.putText(frame, f"{confidence*100:.0f}%", (230, 120), cv2.FONT_HERSHEY_PLAIN, 1, (255,255,255), 1)
+        else:
+            stream.reset()
 
         cv2.imshow("ML Combat Analyzer", frame)
         if cv2.waitKey(1) == ord('q'): break
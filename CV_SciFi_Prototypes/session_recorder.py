@@ -0,0 +1,214 @@
+import os
+import json
+import atexit
+import time
+import queue
+import threading
+from datetime import datetime
+
+import numpy as np
+
+# --- RECORDER CONFIG ---
+CHUNK_ROWS = 512            # Samples per .npy chunk
+FLUSH_SECONDS = 5.0         # A partial chunk is written after this long, so a crash loses at most this much
+MANIFEST = "manifest.json"
+
+
+def atomic_save(path, write):
+    """Runs write(tmp_path) and renames over 'path': readers see the old file or the new one, never half."""
+    tmp = f"{path}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+class SessionRecorder:
+    """
+    Append-only recorder for labelled feature vectors.
+
+    Samples go into a preallocated float32 chunk (features, then the label in the last
+    column). Full chunks are handed to a writer thread that saves them as
+    <session>/chunk-NNNNN.npy and then rewrites the manifest, both atomically. The writer
+    also flushes a partial chunk once it is FLUSH_SECONDS old, whether or not anything
+    is still being appended. The manifest lists only chunks already on disk, so whatever was
+    flushed before a crash can be loaded.
+
+        with SessionRecorder("combat_data", n_features) as recorder:
+            recorder.append(features, label)
+    """
+    def __init__(self, root, n_features, meta=None, chunk_rows=CHUNK_ROWS, flush_seconds=FLUSH_SECONDS):
+        self.n_features = n_features
+        self.chunk_rows = chunk_rows
+        self.flush_seconds = flush_seconds
+        self.path = self._new_session_dir(root)
+        self.manifest = {"version": 1, "n_features": n_features, "rows": 0, "chunks": [],
+                         "created": datetime.now().isoformat(timespec="seconds"), "meta": meta or {}}
+
+        self.buffer = np.empty((chunk_rows, n_features + 1), np.float32)
+        self.filled = 0
+        self.rows = 0               # Appended so far (written or not)
+        self.chunks = 0
+        self.last_flush = time.perf_counter()
+        self.error = None
+        self.lock = threading.Lock()    # Guards the buffer: the writer thread swaps it out on a timer
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+        self.closed = False
+        atexit.register(self.close)     # Still flush if the recording loop dies with an exception
+        self._write_manifest()
+
+    @staticmethod
+    def _new_session_dir(root):
+        base = os.path.join(root, datetime.now().strftime("session-%Y%m%d-%H%M%S"))
+        path, n = base, 1
+        while True:
+            try:
+                os.makedirs(path)
+                return path
+            except FileExistsError:     # Two sessions started within the same second
+                n += 1
+                path = f"{base}-{n}"
+
+    # --- Recording side ---
+
+    def append(self, features, label):
+        if self.error is not None:
+            raise self.error
+        with self.lock:
+            row = self.buffer[self.filled]
+            row[:-1] = features
+            row[-1] = label
+            self.filled += 1
+            self.rows += 1
+            if self.filled == self.chunk_rows:
+                self._hand_off()
+
+    def flush(self):
+        """Hands the buffered rows to the writer thread and starts a fresh buffer."""
+        with self.lock:
+            self._hand_off()
+
+    def _hand_off(self):
+        # Caller holds self.lock
+        if self.filled:
+            self.queue.put((self.chunks, self.buffer[:self.filled]))
+            self.chunks += 1
+            self.buffer = np.empty_like(self.buffer)
+            self.filled = 0
+        self.last_flush = time.perf_counter()
+
+    def close(self):
+        """Flushes what is left and waits until everything is on disk."""
+        if self.closed:
+            return
+        self.closed = True
+        atexit.unregister(self.close)
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Writer thread ---
+
+    def _writer(self):
+        while True:
+            due = self.last_flush + self.flush_seconds - time.perf_counter()
+            try:
+                item = self.queue.get(timeout=max(due, 0.01))
+            except queue.Empty:
+                self.flush()        # Partial chunk is due, even if nothing was appended since
+                continue
+            if item is None:
+                return
+            if self.error is not None:
+                continue        # Already failed: drain the queue so close() doesn't hang
+            index, rows = item
+            try:
+                name = f"chunk-{index:05d}.npy"
+                atomic_save(os.path.join(self.path, name), lambda tmp: self._save_npy(tmp, rows))
+                self.manifest["chunks"].append({"file": name, "rows": len(rows)})
+                self.manifest["rows"] += len(rows)
+                self._write_manifest()
+            except Exception as e:      # Surfaced by the next append() / close()
+                self.error = e
+
+    @staticmethod
+    def _save_npy(path, rows):
+        with open(path, "wb") as f:
+            np.save(f, rows)
+
+    def _write_manifest(self):
+        def write(tmp):
+            with open(tmp, "w") as f:
+                json.dump(self.manifest, f, indent=2)
+        atomic_save(os.path.join(self.path, MANIFEST), write)
+
+
+# --- Loading ---
+
+def list_sessions(root):
+    """(session path, manifest) for every session under 'root', oldest first."""
+    sessions = []
+    if not os.path.isdir(root):
+        return sessions
+    for name in sorted(os.listdir(root)):
+        manifest_path = os.path.join(root, name, MANIFEST)
+        if os.path.isfile(manifest_path):
+            with open(manifest_path) as f:
+                sessions.append((os.path.join(root, name), json.load(f)))
+    return sessions
+
+
+def load_dataset(root, n_features=None):
+    """
+    (X, y, groups) from every session under 'root'. Each chunk is memory-mapped and
+    copied once into the preallocated result; 'groups' holds the session number of each
+    row, for cross-validation that never trains and tests on the same session.
+    Sessions recorded with a different feature count are skipped.
+    """
+    chunks, skipped = [], []
+    for session, (path, manifest) in enumerate(list_sessions(root)):
+        if n_features is not None and manifest["n_features"] != n_features:
+            skipped.append(os.path.basename(path))
+            continue
+        for chunk in manifest["chunks"]:
+            chunks.append((session, np.load(os.path.join(path, chunk["file"]), mmap_mode="r")))
+    if skipped:
+        print(f"Skipped {len(skipped)} session(s) with a different feature layout: {', '.join(skipped)}")
+    if not chunks:
+        return np.empty((0, n_features or 0), np.float32), np.empty(0, np.int64), np.empty(0, np.int64)
+
+    total = sum(len(rows) for _, rows in chunks)
+    width = chunks[0][1].shape[1]
+    data = np.empty((total, width), np.float32)
+    groups = np.empty(total, np.int64)
+    offset = 0
+    for session, rows in chunks:
+        data[offset:offset + len(rows)] = rows
+        groups[offset:offset + len(rows)] = session
+        offset += len(rows)
+    return data[:, :-1], data[:, -1].astype(np.int64), groups
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Summarize the recorded sessions.")
+    parser.add_argument("root", nargs="?", default="combat_data")
+    args = parser.parse_args()
+
+    sessions = list_sessions(args.root)
+    if not sessions:
+        raise SystemExit(f"No sessions in {args.root}")
+    for path, manifest in sessions:
+        labels = np.concatenate([np.load(os.path.join(path, c["file"]), mmap_mode="r")[:, -1]
+                                 for c in manifest["chunks"]] or [np.empty(0)])
+        values, counts = np.unique(labels.astype(np.int64), return_counts=True)
+        per_class = ", ".join(f"{v}: {c}" for v, c in zip(values, counts))
+        print(f"{os.path.basename(path)}  {manifest['rows']:>6} rows  {manifest['n_features']} features  {per_class}")
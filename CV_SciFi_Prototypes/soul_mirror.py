@@ -2,59 +2,18 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import math
-import random
-from collections import deque
-
-class EtherealParticles:
-    def __init__(self):
-        self.particles = []
-
-    def emit(self, x, y, velocity_x, velocity_y, color):
-        """Spawns particles that drift based on eye movement momentum"""
-        for _ in range(5):  # Emit burst
-            p = {
-                'x': x,
-                'y': y,
-                'vx': velocity_x * -0.5 + random.uniform(-2, 2), # Drag effect
-                'vy': velocity_y * -0.5 + random.uniform(-2, 2),
-                'life': 1.0,
-                'decay': random.uniform(0.02, 0.06),
-                'color': color,
-                'size': random.uniform(1, 3)
-            }
-            self.particles.append(p)
-
-    def update_and_draw(self, canvas):
-        for p in self.particles[:]:
-            p['x'] += p['vx']
-            p['y'] += p['vy']
-            p['life'] -= p['decay']
-            
-            if p['life'] <= 0:
-                self.particles.remove(p)
-                continue
-                
-            # Fade out
-            alpha = p['life']
-            radius = int(p['size'] * alpha)
-            if radius < 1: radius = 1
-            
-            # Draw glow
-            color = p['color'] # BGR tuple
-            # Modulate intensity by alpha
-            faded_color = (int(color[0]*alpha), int(color[1]*alpha), int(color[2]*alpha))
-            
-            cv2.circle(canvas, (int(p['x']), int(p['y'])), radius, faded_color, -1)
+from capture import ThreadedCapture
+from particles import EtherealParticles
+from landmark_filters import RingBuffer
 
 class SoulMirror:
     def __init__(self):
         self.mp_face_mesh = mp.solutions.face_mesh
-        self.cap = cv2.VideoCapture(0)
+        self.cap = ThreadedCapture(0)
         
         # Art State
         self.particles = EtherealParticles()
-        self.history_left = deque(maxlen=20) # For smooth trails
-        self.history_right = deque(maxlen=20)
+        self.eye_history = RingBuffer(20, (2, 2)) # [left, right] pupil per frame, for smooth trails
         
         # Indices for landmarks
         self.LEFT_PUPIL = 468
@@ -136,12 +95,11 @@ class SoulMirror:
                         right_pt = self.get_coords(face_landmarks.landmark[self.RIGHT_PUPIL], w, h)
                         
                         # 2. Update History
-                        self.history_left.append(left_pt)
-                        self.history_right.append(right_pt)
+                        self.eye_history.push((left_pt, right_pt))
                         
                         # 3. Calculate Velocity (simple delta)
-                        if len(self.history_left) > 2:
-                            prev_x, prev_y = self.history_left[-2]
+                        if len(self.eye_history) > 2:
+                            prev_x, prev_y = self.eye_history[-2][0]
                             dx = left_pt[0] - prev_x
                             dy = left_pt[1] - prev_y
                             
@@ -5,6 +5,8 @@ from ultralytics import YOLO
 import math
 import time
 from collections import deque
+from capture import ThreadedCapture
+from landmark_filters import OneEuroFilter
 
 # --- CONFIGURATION (TUNE THESE) ---
 WIDTH, HEIGHT = 1280, 720
@@ -31,28 +33,18 @@ DATA_DB = {
 
 class DynamicSmoother:
     """ 
-    Adaptive smoothing. 
+    Adaptive smoothing (a One-Euro filter on the cursor, in pixels).
     If you move fast -> Low smoothing (Responsive).
     If you move slow -> High smoothing (Precision/No Jitter).
     """
     def __init__(self, x, y):
-        self.x, self.y = x, y
-        self.last_x, self.last_y = x, y
+        # At rest the cursor follows at ~5% per frame; at a steady 100 px/frame, ~70%
+        self.filter = OneEuroFilter(min_cutoff=0.25, beta=0.004)
+        self.filter((x, y))
         
-    def update(self, target_x, target_y):
-        # Calculate speed of intended movement
-        dist = math.hypot(target_x - self.last_x, target_y - self.last_y)
-        
-        # Dynamic Alpha: 
-        # High distance = High Alpha (0.7) -> Fast follow
-        # Low distance = Low Alpha (0.05) -> Heavy smoothing
-        alpha = min(0.8, max(0.05, dist / 100.0))
-        
-        self.x = self.x * (1 - alpha) + target_x * alpha
-        self.y = self.y * (1 - alpha) + target_y * alpha
-        
-        self.last_x, self.last_y = self.x, self.y
-        return int(self.x), int(self.y)
+    def update(self, target_x, target_y, timestamp=None):
+        x, y = self.filter((target_x, target_y), timestamp)
+        return int(x), int(y)
 
 print(">>> SYSTEMS INITIALIZING...")
 print(">>> LOAD YOLOv8...")
@@ -82,9 +74,7 @@ def draw_corner_rect(img, pts, color, t=2, l=20):
 
 def main():
     # address = "http://192.0.0.4:8080/video"
-    cap = cv2.VideoCapture(0)
-    cap.set(3, WIDTH)
-    cap.set(4, HEIGHT)
+    cap = ThreadedCapture(0, width=WIDTH, height=HEIGHT)
     font = cv2.FONT_HERSHEY_SIMPLEX
     
     # Calibration State
@@ -165,7 +155,7 @@ def main():
                 target_y = max(0, min(HEIGHT, target_y))
 
         # Update Cursor Physics (Even if face lost, it stays in place)
-        cx, cy = cursor_physics.update(target_x, target_y)
+        cx, cy = cursor_physics.update(target_x, target_y, cap.last_timestamp)
 
         # 2. OBJECT DETECTION (YOLO)
         # Skip frames for performance if needed, but modern GPU/CPU handles v8n fine
@@ -2,6 +2,7 @@ import cv2
 import mediapipe as mp
 import numpy as np
 from collections import deque
+from capture import ThreadedCapture
 
 class TimeRipper:
     def __init__(self):
@@ -39,9 +40,7 @@ class TimeRipper:
 
     def run(self):
         address = "http://192.0.0.4:8080/video" 
-        cap = cv2.VideoCapture(address)
-        cap.set(3, 1280)
-        cap.set(4, 720)
+        cap = ThreadedCapture(address, width=1280, height=720)
         
         print("Opening Time Rift...")
         print("Wave your hand to reveal the past.")
@@ -2,6 +2,7 @@
 
 import cv2
 import mediapipe as mp
+from capture import ThreadedCapture
 
 # Initialize MediaPipe solutions
 mp_drawing = mp.solutions.drawing_utils
@@ -13,7 +14,7 @@ drawing_spec = mp_drawing.DrawingSpec(thickness=1, circle_radius=1)
 
 # Initialize the webcam
 # If you have multiple cameras, you might need to change the '0' to '1' or '2'
-cap = cv2.VideoCapture(0)
+cap = ThreadedCapture(0)
 
 # Check if the webcam is opened correctly
 if not cap.isOpened():
@@ -3,6 +3,7 @@ import mediapipe as mp
 import numpy as np
 import time
 import random
+from capture import ThreadedCapture
 
 class WeepingAngel:
     def __init__(self):
@@ -14,14 +15,11 @@ class WeepingAngel:
             min_tracking_confidence=0.7
         )
         
-        self.cap = cv2.VideoCapture(0)
+        self.cap = ThreadedCapture(0, width=1280, height=720)
         # Check if camera opened successfully
         if not self.cap.isOpened():
             print("Error: Could not access the webcam.")
             exit()
-
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
         
         # Landmark Indices
         self.LEFT_EYE_TOP = 386
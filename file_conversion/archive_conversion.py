@@ -11,6 +11,10 @@ from rich.prompt import Prompt, IntPrompt
 from rich.table import Table
 from rich.live import Live
 
+from conversion_api import Converter, ConversionJob, ConversionError
+from zero_copy_io import STREAMING, repack_archive
+from profiling import stage
+
 # RICH: Define theme and console
 custom_theme = Theme({
     "info": "dim cyan",
@@ -99,50 +103,64 @@ def get_output_format():
     )
     return format_list[choice - 1][1]['id']
 
-def convert_archive(input_file_path, output_format):
-    base_name = os.path.splitext(input_file_path)[0]
-    output_archive_path_base = f"{base_name}_converted"
-    temp_dir = tempfile.mkdtemp()
+# --- HEADLESS API ---
+class ArchiveConverter(Converter):
+    category = "Archive"
+    formats = {details['id']: details for details in SUPPORTED_FORMATS.values()}
+
+    def execute(self, job):
+        ext = self.formats[job.output_format]['ext']
+        # make_archive() adds the extension itself, so strip it from the requested path
+        base = job.output_path[:-len(ext)] if job.output_path.endswith(ext) else job.output_path
+        if STREAMING:
+            # Zip/tar members go straight from one archive into the other, skipping the temp dir
+            try:
+                with stage("repack", streamed=True):
+                    return repack_archive(job.input_path, base + ext, job.output_format), "", {"streamed": True}
+            except ValueError:
+                pass
+        temp_dir = tempfile.mkdtemp()
+        try:
+            try:
+                with stage("unpack"):
+                    shutil.unpack_archive(job.input_path, temp_dir)
+            except (shutil.ReadError, ValueError) as e:
+                raise ConversionError(f"Could not read the input archive: {e}") from e
+            with stage("repack"):
+                output_path = shutil.make_archive(base_name=base, format=job.output_format, root_dir=temp_dir)
+        finally:
+            shutil.rmtree(temp_dir)
+        return output_path, "", {}
+
+
+CONVERTER = ArchiveConverter()
 
-    final_archive_name = "" # To store the final filename
+
+def convert_archive(input_file_path, output_format):
+    result = None
 
     # RICH: Use console.status to show the current step of the process
-    with console.status("[bold green]Starting conversion...", spinner="dots") as status:
+    with console.status(f"[bold green]Unpacking and re-packing as '{output_format.upper()}'...[/]", spinner="dots"):
         try:
-            # Step 1: Unpack
-            status.update("[bold green]Step 1/3: Unpacking source archive to a temporary location...[/]")
-            shutil.unpack_archive(input_file_path, temp_dir)
-            
-            # Step 2: Re-pack
-            status.update(f"[bold green]Step 2/3: Creating new '{output_format.upper()}' archive...[/]")
-            final_archive_name = shutil.make_archive(
-                base_name=output_archive_path_base,
-                format=output_format,
-                root_dir=temp_dir
-            )
-
-            # Step 3: Clean up (will run in the 'finally' block)
-            status.update("[bold green]Step 3/3: Cleaning up temporary files...[/]")
-
-        except (shutil.ReadError, ValueError) as e:
-            console.print(Panel(
-                f"[danger]Could not read the input archive '[path]{os.path.basename(input_file_path)}[/]'.[/]\n"
-                f"[warning]Reason:[/] {e}\n[dim]The file may be corrupted, password-protected, or in an unsupported format.[/]",
-                title="[bold red]Critical Error[/]", border_style="red"
-            ))
-            final_archive_name = None # Flag as failed
-        except Exception as e:
-            console.print(Panel(f"[danger]AN UNEXPECTED ERROR OCCURRED: {e}[/]",
-                          title="[bold red]Critical Error[/]", border_style="red"))
-            final_archive_name = None # Flag as failed
-        finally:
-            shutil.rmtree(temp_dir)
-            
-    if final_archive_name:
+            result = CONVERTER.convert(ConversionJob(input_file_path, output_format))
+        except ConversionError as e:
+            if isinstance(e.__cause__, (shutil.ReadError, ValueError)):
+                console.print(Panel(
+                    f"[danger]Could not read the input archive '[path]{os.path.basename(input_file_path)}[/]'.[/]\n"
+                    f"[warning]Reason:[/] {e.__cause__}\n[dim]The file may be corrupted, password-protected, or in an unsupported format.[/]",
+                    title="[bold red]Critical Error[/]", border_style="red"
+                ))
+            else:
+                console.print(Panel(f"[danger]AN UNEXPECTED ERROR OCCURRED: {e}[/]",
+                              title="[bold red]Critical Error[/]", border_style="red"))
+
+    if result:
         console.print(Panel(
-            f"🎉 [success]Success! Conversion complete.[/] 🎉\n[info]New archive saved at:[/info] [path]{final_archive_name}[/]",
+            f"🎉 [success]Success! Conversion complete.[/] 🎉\n[info]New archive saved at:[/info] [path]{result.output_path}[/]\n"
+            f"[info]Size:[/info] {result.bytes_written / 1024:.1f} KB  [info]Time:[/info] {result.elapsed:.2f}s",
             title="[bold green]Complete[/]", border_style="green"
         ))
+    return result
 
 def main(input_file_path=None):
     """The main execution function for the archive converter."""
@@ -1,9 +1,14 @@
 import os
 import shutil
-import time
+import subprocess
+from dataclasses import dataclass
 from pydub import AudioSegment
 from pydub.exceptions import CouldntDecodeError
 
+from conversion_api import Converter, ConversionJob, ConversionError
+from zero_copy_io import STREAMING
+from profiling import stage
+
 # RICH: Import the necessary components from the rich library
 from rich.console import Console
 from rich.theme import Theme
@@ -157,19 +162,140 @@ def get_bitrate(output_format):
                 console.print("[danger]❌ ERROR: Please enter a valid number.[/]")
     return None
 
+# --- HEADLESS API ---
+@dataclass
+class AudioOptions:
+    bitrate: str = None     # e.g. "192k"; None = the encoder's default / lossless
+    workers: int = None     # Chunked parallel encode for long files; None = every core, 1 = never
+    dedupe_index: str = None  # Fingerprint index (SQLite); skip inputs already in it, then add this one
+    peaks: bool = False     # Also write '<output>.peaks' (multi-resolution waveform min/max) for web players
+
+
+# Files at least this long are encoded in parallel chunks (MP3, AAC, M4A, AC3 targets)
+PARALLEL_MIN_SECONDS = 600
+
+# Format id -> (ffmpeg encoder, muxer) for the streamed route, where ffmpeg reads the
+# input file itself instead of pydub decoding all of it into Python bytes first
+STREAM_CODECS = {
+    "mp3": ("libmp3lame", "mp3"), "aac": ("aac", "adts"), "ogg": ("libvorbis", "ogg"),
+    "opus": ("libopus", "opus"), "wma": ("wmav2", "asf"), "ac3": ("ac3", "ac3"), "ipod": ("aac", "ipod"),
+    "flac": ("flac", "flac"), "wav": ("pcm_s16le", "wav"), "aiff": ("pcm_s16be", "aiff"), "alac": ("alac", "ipod"),
+}
+# Uncompressed targets take their PCM codec from the input's sample format (see pcm_encoder)
+PCM_BYTE_ORDER = {"wav": "le", "aiff": "be"}
+
+
+def pcm_encoder(output_format, source):
+    """
+    PCM codec for a WAV/AIFF target that keeps the bit depth of the probed 'source':
+    24- and 32-bit integer inputs stay 24/32-bit and float PCM stays float. Everything
+    else (8/16-bit, and lossy decoders, which output float) is written as 16-bit.
+    """
+    order = PCM_BYTE_ORDER[output_format]
+    sample_format, bits = source["sample_format"], source["bits_per_sample"] or 16
+    if sample_format in ("flt", "dbl") and (source["audio_codec"] or "").startswith("pcm_f"):
+        return f"pcm_f{bits}{order}"
+    if sample_format in ("s32", "s64") and bits > 16:
+        return f"pcm_s{24 if bits <= 24 else 32}{order}"
+    return f"pcm_s16{order}"
+
+
+def stream_encode(job, source):
+    """Encodes input file -> output file in one ffmpeg process; no audio passes through Python."""
+    encoder, muxer = STREAM_CODECS[job.output_format]
+    if job.output_format in PCM_BYTE_ORDER:
+        encoder = pcm_encoder(job.output_format, source)
+    command = [shutil.which("ffmpeg") or "ffmpeg", "-y", "-v", "error", "-i", job.input_path,
+               "-map", "0:a:0", "-map_metadata", "0", "-c:a", encoder, "-f", muxer]
+    if job.options.bitrate:
+        command += ["-b:a", job.options.bitrate]
+    with stage("encode", tool="ffmpeg"):
+        process = subprocess.run(command + [job.output_path], capture_output=True)
+    if process.returncode != 0:
+        raise ConversionError("Could not decode the input file. It may be corrupted or unsupported.",
+                              process.stderr.decode("utf-8", errors="replace"))
+
+
+class AudioConverter(Converter):
+    category = "Audio"
+    formats = {details['id']: details for details in SUPPORTED_FORMATS.values()}
+    options_class = AudioOptions
+
+    def execute(self, job):
+        fingerprint = None
+        if job.options.dedupe_index:
+            from audio_fingerprint import FingerprintIndex, DuplicateAudioError, fingerprint_file
+            with stage("fingerprint"):
+                fingerprint = fingerprint_file(job.input_path)
+                with FingerprintIndex(job.options.dedupe_index) as index:
+                    match = index.find_duplicate(job.input_path, fingerprint)
+            if match:
+                raise DuplicateAudioError(f"Skipped: {os.path.basename(job.input_path)} is a duplicate of "
+                                          f"{match['path']} ({match['score']} aligned hashes).", match)
+
+        output_path, stderr, metadata = self.encode(job)
+        if fingerprint is not None:
+            # Indexed only after a successful conversion, so a failed run can be retried
+            with FingerprintIndex(job.options.dedupe_index) as index:
+                index.add(job.input_path, *fingerprint)
+        return output_path, stderr, metadata
+
+    def encode(self, job):
+        if job.options.workers != 1:
+            from audio_parallel import CHUNKED_CODECS, probe_audio, encode_parallel
+            if job.output_format in CHUNKED_CODECS:
+                _, duration = probe_audio(job.input_path)
+                if duration and duration >= PARALLEL_MIN_SECONDS:
+                    # Also avoids pydub decoding hours of audio into memory
+                    metadata = {"duration_seconds": duration}
+                    with stage("encode", mode="parallel"):
+                        summary = encode_parallel(job.input_path, job.output_path, job.output_format,
+                                                  job.options.bitrate, job.options.workers)
+                    if job.options.peaks:
+                        # The chunk encoders each decode a slice, so peaks get their own streaming decode.
+                        # Written after the encode, so a failed conversion leaves no orphan sidecar
+                        from waveform_peaks import peaks_from_file, peaks_path_for
+                        with stage("peaks"):
+                            metadata["peaks_path"] = peaks_from_file(job.input_path, peaks_path_for(job.output_path))
+                    return job.output_path, "", {**metadata, **summary}
+        if STREAMING and not job.options.peaks and job.output_format in STREAM_CODECS:
+            from video_conversion import probe_media
+            source = probe_media(job.input_path)
+            stream_encode(job, source)
+            return job.output_path, "", {"streamed": True, "duration_seconds": source["duration"]}
+        try:
+            with stage("decode"):
+                audio = AudioSegment.from_file(job.input_path)
+        except CouldntDecodeError as e:
+            raise ConversionError("Could not decode the input file. It may be corrupted or unsupported.", str(e)) from e
+
+        export_params = {'format': job.output_format}
+        if job.options.bitrate:
+            export_params['bitrate'] = job.options.bitrate
+        with stage("encode"):
+            audio.export(job.output_path, **export_params)
+        metadata = {"duration_seconds": audio.duration_seconds}
+        if job.options.peaks:
+            # Reuses the samples pydub already decoded for the export
+            from waveform_peaks import peaks_from_segment, peaks_path_for
+            with stage("peaks"):
+                metadata["peaks_path"] = peaks_from_segment(audio, peaks_path_for(job.output_path))
+        return job.output_path, "", metadata
+
+
+CONVERTER = AudioConverter()
+
+
 def convert_audio(input_file_path, output_format, bitrate=None):
     """Handles the core audio conversion logic with a rich progress bar."""
-    # Find the correct output extension from our detailed dictionary
-    output_extension = next((v['ext'] for k, v in SUPPORTED_FORMATS.items() if v['id'] == output_format), output_format)
-    
-    base_name = os.path.splitext(input_file_path)[0]
-    output_file_path = f"{base_name}_converted.{output_extension}"
+    job = CONVERTER.prepare(ConversionJob(input_file_path, output_format, AudioOptions(bitrate=bitrate)))
+    output_extension = CONVERTER.output_extension(output_format)
 
     summary_panel = Panel(
         f"[info]Input File:[/info] [path]{os.path.basename(input_file_path)}[/]\n"
         f"[info]Output Format:[/info] [format]{output_extension.upper()}[/]\n"
         f"[info]Quality/Bitrate:[/info] [format]{bitrate or 'Lossless/Default'}[/]\n"
-        f"[info]Output File:[/info] [path]{os.path.basename(output_file_path)}[/]",
+        f"[info]Output File:[/info] [path]{os.path.basename(job.output_path)}[/]",
         title="[bold yellow]Conversion Summary[/]",
         border_style="yellow"
     )
@@ -187,36 +313,31 @@ def convert_audio(input_file_path, output_format, bitrate=None):
             task = progress.add_task("[green]Processing...", total=100)
             
             # Since pydub doesn't provide progress, we simulate it
-            progress.update(task, advance=10, description="Reading audio file...")
-            audio = AudioSegment.from_file(input_file_path)
-            progress.update(task, advance=30, description="Exporting with FFmpeg...")
-
-            export_params = {'format': output_format}
-            if bitrate:
-                export_params['bitrate'] = bitrate
-            audio.export(output_file_path, **export_params)
-            
-            progress.update(task, advance=60, description="[bold green]Finalizing...[/]")
-            time.sleep(0.5)
+            progress.update(task, advance=10, description="Decoding and exporting with FFmpeg...")
+            result = CONVERTER.convert(job)
+            progress.update(task, advance=90, description="[bold green]Finalizing...[/]")
 
         console.print(Panel(
-            f"🎉 [success]Success! Conversion complete.[/] 🎉\n[info]New file saved at:[/info] [path]{output_file_path}[/]",
+            f"🎉 [success]Success! Conversion complete.[/] 🎉\n[info]New file saved at:[/info] [path]{result.output_path}[/]\n"
+            f"[info]Size:[/info] {result.bytes_written / 1024:.1f} KB  [info]Time:[/info] {result.elapsed:.2f}s",
             title="[bold green]Complete[/]",
             border_style="green"
         ))
+        return result
 
-    except CouldntDecodeError:
-        console.print(Panel(
-            "[danger]CRITICAL ERROR: Could not decode the input file.[/danger]\n"
-            "[warning]The file might be corrupted, or it might be an unsupported format.[/]",
-            title="[bold red]Conversion Failed[/]", border_style="red"
-        ))
-    except Exception as e:
-        console.print(Panel(
-            f"[danger]AN UNEXPECTED ERROR OCCURRED: {e}[/]\n"
-            "[warning]Please ensure FFmpeg is installed and accessible in your system's PATH.[/]",
-            title="[bold red]Conversion Failed[/]", border_style="red"
-        ))
+    except ConversionError as e:
+        from audio_fingerprint import DuplicateAudioError
+        if isinstance(e, DuplicateAudioError):
+            console.print(Panel(f"[warning]{e}[/]", title="[bold yellow]Duplicate[/]", border_style="yellow"))
+            return None
+        if isinstance(e.__cause__, CouldntDecodeError):
+            message = ("[danger]CRITICAL ERROR: Could not decode the input file.[/danger]\n"
+                       "[warning]The file might be corrupted, or it might be an unsupported format.[/]")
+        else:
+            message = (f"[danger]AN UNEXPECTED ERROR OCCURRED: {e}[/]\n"
+                       "[warning]Please ensure FFmpeg is installed and accessible in your system's PATH.[/]")
+        console.print(Panel(message, title="[bold red]Conversion Failed[/]", border_style="red"))
+        return None
 
 
 # The new main function that can accept a file path
@@ -0,0 +1,312 @@
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+import subprocess
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from conversion_api import ConversionError
+
+# RICH: Import necessary components
+from rich.console import Console
+from rich.theme import Theme
+from rich.panel import Panel
+from rich.table import Table
+
+# RICH: Define theme and console
+custom_theme = Theme({
+    "info": "dim cyan", "warning": "magenta", "danger": "bold red",
+    "success": "bold green", "prompt": "bold yellow", "path": "bold cyan",
+    "format": "bold blue",
+})
+console = Console(theme=custom_theme)
+
+FFMPEG = shutil.which("ffmpeg") or "ffmpeg"
+
+# --- Fingerprint parameters ---
+# Landmark fingerprints: pairs of spectral peaks (f1, f2, dt) hashed to an integer
+# and stored with the anchor's time. Peaks in the low/mid spectrum survive lossy
+# re-encoding, so the same track at any bitrate yields largely the same hashes,
+# all shifted by one constant time offset.
+SAMPLE_RATE = 11025
+N_FFT = 1024
+HOP = 512                       # ~46 ms per frame
+PEAK_NEIGHBORHOOD = (15, 15)    # (frames, bins) a peak must dominate
+PEAK_MIN_DB = 10                # Above the track's median level
+FAN_OUT = 8                     # Pairs per anchor peak
+MAX_DT = 63                     # Frames; must fit in 6 bits
+MAX_DECODE_SECONDS = 600        # Fingerprint at most the first 10 minutes
+DEFAULT_INDEX = "audio_fingerprints.db"
+MIN_MATCHES = 20                # Aligned hashes needed to call two files the same recording
+MIN_MATCH_RATIO = 0.01          # ...and the share of the query's hashes they represent
+SQLITE_BATCH = 900              # Stay under SQLite's bound-parameter limit
+
+
+class DuplicateAudioError(ConversionError):
+    """Raised by the conversion dedupe hook when the input is already in the index."""
+    def __init__(self, message, match):
+        super().__init__(message)
+        self.match = match
+
+    def __reduce__(self):
+        return (type(self), (str(self), self.match))
+
+
+def decode_mono(path, seconds=MAX_DECODE_SECONDS):
+    """Decodes (the start of) a file to mono float32 at SAMPLE_RATE."""
+    command = [FFMPEG, "-v", "error", "-i", path, "-map", "0:a:0", "-t", str(seconds),
+               "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "f32le", "pipe:1"]
+    process = subprocess.run(command, capture_output=True)
+    if process.returncode != 0:
+        raise ConversionError(f"Could not decode {os.path.basename(path)}.", process.stderr.decode("utf-8", errors="replace"))
+    return np.frombuffer(process.stdout, dtype="<f4")
+
+
+def spectrogram_db(samples):
+    """Log-magnitude STFT, shape (frames, bins). Computed as one batched rfft."""
+    if len(samples) < N_FFT:
+        samples = np.pad(samples, (0, N_FFT - len(samples)))
+    frames = sliding_window_view(samples, N_FFT)[::HOP] * np.hanning(N_FFT).astype(np.float32)
+    magnitude = np.abs(np.fft.rfft(frames, axis=1))
+    return 20 * np.log10(magnitude + 1e-9)
+
+
+def _sliding_max(array, size, axis):
+    """Maximum over a centred window of 'size' along 'axis' (edges padded with -inf)."""
+    pad = [(0, 0)] * array.ndim
+    pad[axis] = (size // 2, size // 2)
+    padded = np.pad(array, pad, constant_values=-np.inf)
+    return sliding_window_view(padded, size, axis=axis).max(axis=-1)
+
+
+def find_peaks(spectrogram):
+    """(frame, bin) of local maxima that stand clearly above the track's median level."""
+    local_max = _sliding_max(_sliding_max(spectrogram, PEAK_NEIGHBORHOOD[0], 0), PEAK_NEIGHBORHOOD[1], 1)
+    threshold = np.median(spectrogram) + PEAK_MIN_DB
+    frames, bins = np.nonzero((spectrogram == local_max) & (spectrogram > threshold))
+    return frames, bins
+
+
+def landmark_hashes(frames, bins):
+    """
+    Pairs every peak with the next FAN_OUT peaks in time order. Returns (hashes, anchor
+    frames) as int64 arrays. hash = f1 << 16 | f2 << 6 | dt.
+    """
+    order = np.lexsort((bins, frames))
+    frames, bins = frames[order], bins[order]
+    hashes, anchors = [], []
+    for step in range(1, FAN_OUT + 1):
+        dt = frames[step:] - frames[:-step]
+        valid = (dt > 0) & (dt <= MAX_DT)
+        f1, f2 = bins[:-step][valid], bins[step:][valid]
+        hashes.append((f1.astype(np.int64) << 16) | (f2.astype(np.int64) << 6) | dt[valid])
+        anchors.append(frames[:-step][valid])
+    if not hashes:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    return np.concatenate(hashes), np.concatenate(anchors).astype(np.int64)
+
+
+def fingerprint_samples(samples):
+    return landmark_hashes(*find_peaks(spectrogram_db(samples)))
+
+
+def fingerprint_file(path):
+    """Returns (hashes, offsets, duration seconds) for an audio or video file."""
+    samples = decode_mono(path)
+    hashes, offsets = fingerprint_samples(samples)
+    return hashes, offsets, len(samples) / SAMPLE_RATE
+
+
+# --- On-disk index ---
+
+class FingerprintIndex:
+    """
+    SQLite store: one row per track and one per (hash, track, offset), with an index
+    on hash so a lookup touches only matching postings, not every stored track.
+    """
+    def __init__(self, path=DEFAULT_INDEX):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS tracks (
+                id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime REAL,
+                duration REAL, hash_count INTEGER, added REAL
+            );
+            CREATE TABLE IF NOT EXISTS hashes (hash INTEGER NOT NULL, track_id INTEGER NOT NULL, offset INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS hashes_by_hash ON hashes (hash);
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def is_indexed(self, path):
+        """True if this exact file (same size and mtime) is already in the index."""
+        stat = os.stat(path)
+        row = self.db.execute("SELECT size, mtime FROM tracks WHERE path = ?", (os.path.abspath(path),)).fetchone()
+        return row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime
+
+    def add(self, path, hashes=None, offsets=None, duration=None):
+        """Inserts (or replaces) one track. Each insert is its own transaction."""
+        if hashes is None:
+            hashes, offsets, duration = fingerprint_file(path)
+        path, stat = os.path.abspath(path), os.stat(path)
+        with self.db:
+            old = self.db.execute("SELECT id FROM tracks WHERE path = ?", (path,)).fetchone()
+            if old:
+                self.db.execute("DELETE FROM hashes WHERE track_id = ?", old)
+                self.db.execute("DELETE FROM tracks WHERE id = ?", old)
+            track_id = self.db.execute(
+                "INSERT INTO tracks (path, size, mtime, duration, hash_count, added) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime, duration, len(hashes), time.time())).lastrowid
+            self.db.executemany("INSERT INTO hashes (hash, track_id, offset) VALUES (?, ?, ?)",
+                                zip(hashes.tolist(), [track_id] * len(hashes), offsets.tolist()))
+        return track_id
+
+    def query(self, hashes, offsets, limit=5, exclude_path=None):
+        """
+        Candidate tracks ranked by their largest group of time-aligned hash matches
+        (a histogram over db_offset - query_offset). Returns a list of dicts.
+        """
+        if len(hashes) == 0:
+            return []
+        unique_hashes = np.unique(hashes).tolist()
+        rows = []
+        for start in range(0, len(unique_hashes), SQLITE_BATCH):
+            batch = unique_hashes[start:start + SQLITE_BATCH]
+            rows += self.db.execute(
+                f"SELECT hash, track_id, offset FROM hashes WHERE hash IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+        if not rows:
+            return []
+
+        matches = np.array(rows, dtype=np.int64)
+        # Join the postings back to every query occurrence of the same hash
+        order = np.argsort(hashes, kind="stable")
+        sorted_hashes, sorted_offsets = hashes[order], offsets[order]
+        lo = np.searchsorted(sorted_hashes, matches[:, 0], side="left")
+        hi = np.searchsorted(sorted_hashes, matches[:, 0], side="right")
+        counts = hi - lo
+        repeat_rows = np.repeat(np.arange(len(matches)), counts)
+        query_positions = np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)]) if len(lo) else np.empty(0, int)
+        track_ids = matches[repeat_rows, 1]
+        deltas = matches[repeat_rows, 2] - sorted_offsets[query_positions]
+
+        # Best aligned bin per track: count (track, delta) pairs, keep each track's maximum
+        pairs, pair_counts = np.unique(np.stack([track_ids, deltas], axis=1), axis=0, return_counts=True)
+        best = {}
+        for (track_id, delta), count in zip(pairs.tolist(), pair_counts.tolist()):
+            if count > best.get(track_id, (0, 0))[0]:
+                best[track_id] = (count, delta)
+
+        results = []
+        for track_id, (score, delta) in sorted(best.items(), key=lambda item: -item[1][0])[:limit * 2]:
+            path, duration = self.db.execute("SELECT path, duration FROM tracks WHERE id = ?", (track_id,)).fetchone()
+            if exclude_path and path == os.path.abspath(exclude_path):
+                continue
+            results.append({"track_id": track_id, "path": path, "duration": duration, "score": score,
+                            "ratio": score / len(hashes), "offset_seconds": delta * HOP / SAMPLE_RATE})
+        return results[:limit]
+
+    def find_duplicate(self, path, fingerprint=None):
+        """The best matching indexed track if 'path' is a near-duplicate of it, else None."""
+        hashes, offsets, _ = fingerprint or fingerprint_file(path)
+        for match in self.query(hashes, offsets, limit=1, exclude_path=path):
+            if is_duplicate(match):
+                return match
+        return None
+
+    def stats(self):
+        tracks = self.db.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+        hashes = self.db.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+        size = sum(os.path.getsize(p) for p in (self.path, self.path + "-wal") if os.path.exists(p))
+        return {"tracks": tracks, "hashes": hashes, "bytes": size}
+
+
+def is_duplicate(match):
+    return match["score"] >= MIN_MATCHES and match["ratio"] >= MIN_MATCH_RATIO
+
+
+def collect_audio_files(paths):
+    from main import FILE_TYPE_MAPPING
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                found += [os.path.join(root, n) for n in sorted(names)
+                          if FILE_TYPE_MAPPING.get(os.path.splitext(n)[1].lower(), ("",))[0] in ("Audio", "Video")]
+        else:
+            found.append(path)
+    return found
+
+
+def add_command(index, paths):
+    added = skipped = 0
+    for path in collect_audio_files(paths):
+        if index.is_indexed(path):
+            skipped += 1
+            continue
+        try:
+            started = time.perf_counter()
+            index.add(path)
+            added += 1
+            console.print(f"[success]+[/] {path} [dim]({time.perf_counter() - started:.2f}s)[/]")
+        except ConversionError as e:
+            console.print(f"[warning]✗ {path}: {e}[/]")
+    console.print(f"[info]{added} added, {skipped} already indexed. Index: {index.stats()}[/]")
+
+
+def query_command(index, path):
+    started = time.perf_counter()
+    hashes, offsets, _ = fingerprint_file(path)
+    fingerprinted = time.perf_counter()
+    matches = index.query(hashes, offsets, exclude_path=path)
+    looked_up = time.perf_counter()
+    table = Table(title=f"[bold green]Matches for {os.path.basename(path)}[/]", border_style="cyan")
+    table.add_column("Track", style="cyan")
+    table.add_column("Score", justify="right")
+    table.add_column("Ratio", justify="right")
+    table.add_column("Offset", justify="right")
+    table.add_column("Verdict")
+    for match in matches:
+        duplicate = is_duplicate(match)
+        table.add_row(match["path"], str(match["score"]), f"{match['ratio']:.1%}", f"{match['offset_seconds']:+.2f}s",
+                      "[danger]duplicate[/]" if duplicate else "[dim]different[/]")
+    console.print(table)
+    console.print(f"[info]{len(hashes)} hashes; fingerprint {(fingerprinted - started) * 1000:.0f} ms, "
+                  f"lookup {(looked_up - fingerprinted) * 1000:.0f} ms[/]")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Spectral-peak audio fingerprints for duplicate detection.")
+    parser.add_argument("--db", default=DEFAULT_INDEX, help="SQLite index file.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_parser = subparsers.add_parser("add", help="Fingerprint files/folders into the index (incremental).")
+    add_parser.add_argument("paths", nargs="+")
+    query_parser = subparsers.add_parser("query", help="Find indexed tracks matching a file.")
+    query_parser.add_argument("path")
+    subparsers.add_parser("stats", help="Show index size.")
+    args = parser.parse_args()
+
+    with FingerprintIndex(args.db) as index:
+        try:
+            if args.command == "add":
+                add_command(index, args.paths)
+            elif args.command == "query":
+                query_command(index, args.path)
+            else:
+                console.print(index.stats())
+        except ConversionError as e:
+            console.print(Panel(f"[danger]{e}[/]", title="[bold red]Error[/]", border_style="red"))
+            sys.exit(1)
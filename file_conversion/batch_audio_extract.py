@@ -0,0 +1,226 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from conversion_api import ConversionError, path_size
+from video_conversion import FFMPEG_PATH, AUDIO_OUTPUT_FORMATS, VIDEO_EXTENSIONS, probe_media
+
+# RICH: Import necessary components
+from rich.console import Console
+from rich.theme import Theme
+from rich.prompt import Prompt, IntPrompt
+from rich.table import Table
+from rich.panel import Panel
+from rich.progress import Progress, BarColumn, TextColumn, MofNCompleteColumn, TimeElapsedColumn
+
+# RICH: Define theme and console
+custom_theme = Theme({
+    "info": "dim cyan", "warning": "magenta", "danger": "bold red",
+    "success": "bold green", "prompt": "bold yellow", "path": "bold cyan",
+    "format": "bold blue",
+})
+console = Console(theme=custom_theme)
+
+# --- BATCH CONFIG ---
+AUDIO_FORMATS = {details['id']: details for details in AUDIO_OUTPUT_FORMATS.values()}
+MANIFEST_NAME = "manifest.json"
+DEFAULT_BUDGET = os.cpu_count() or 2
+
+
+def find_videos(input_dir, recursive=False):
+    """Video files in 'input_dir' (and its subfolders when 'recursive'), sorted by path."""
+    if not recursive:
+        return sorted(os.path.join(input_dir, name) for name in os.listdir(input_dir)
+                      if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS)
+    found = []
+    for root, _, names in os.walk(input_dir):
+        found += [os.path.join(root, name) for name in names if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS]
+    return sorted(found)
+
+
+def plan_outputs(video_paths, input_dir, output_dir, output_format):
+    """Maps each video to an output path, keeping subfolders and avoiding name clashes (a.mp4 + a.mkv)."""
+    planned, taken = {}, set()
+    for path in video_paths:
+        relative = os.path.splitext(os.path.relpath(path, input_dir))[0]
+        candidate = os.path.join(output_dir, f"{relative}.{output_format}")
+        if candidate in taken:
+            source_ext = os.path.splitext(path)[1].lstrip(".").lower()
+            candidate = os.path.join(output_dir, f"{relative}_{source_ext}.{output_format}")
+        taken.add(candidate)
+        planned[path] = candidate
+    return planned
+
+
+def build_extract_command(input_path, output_path, details, copy, bitrate=None):
+    """
+    Audio-only ffmpeg run. Encodes are pinned to one thread so the pool size is the
+    real CPU budget; stream copies only remux and cost almost nothing.
+    """
+    command = [FFMPEG_PATH, "-y", "-v", "error", "-i", input_path, "-map", "0:a:0", "-vn", "-sn", "-dn"]
+    if copy:
+        command += ["-c:a", "copy"]
+    else:
+        command += ["-threads", "1", "-c:a", details['codec']]
+        if bitrate or details['bitrate']:
+            command += ["-b:a", bitrate or details['bitrate']]
+    return command + [output_path]
+
+
+def extract_one(input_path, output_path, details, bitrate=None, allow_copy=True):
+    """Extracts the first audio stream of one video. Returns a manifest entry; never raises."""
+    entry = {"input": input_path, "output": output_path, "status": "ok"}
+    started = time.perf_counter()
+    source = probe_media(input_path)
+    entry["source_codec"], entry["source_duration"] = source["audio_codec"], source["duration"]
+    if not source["has_audio"]:
+        entry.update(status="skipped", error="No audio stream.", elapsed=time.perf_counter() - started)
+        return entry
+
+    # Bitrate overrides force an encode: a stream copy keeps the original bitrate
+    copy = allow_copy and not bitrate and source["audio_codec"] in details.get("copy_from", [])
+    entry["mode"] = "copy" if copy else "encode"
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    process = subprocess.run(build_extract_command(input_path, output_path, details, copy, bitrate), capture_output=True)
+    if process.returncode != 0 and copy:
+        # Some codec/container pairs refuse a copy (odd sample formats, missing extradata)
+        entry["mode"] = "encode"
+        process = subprocess.run(build_extract_command(input_path, output_path, details, False, bitrate), capture_output=True)
+    if process.returncode != 0:
+        entry.update(status="failed", error=process.stderr.decode("utf-8", errors="replace").strip()[-500:])
+    else:
+        entry["duration"] = probe_media(output_path)["duration"]
+        entry["bytes"] = path_size(output_path)
+    entry["elapsed"] = round(time.perf_counter() - started, 3)
+    return entry
+
+
+def extract_audio_batch(input_dir, output_dir, output_format, budget=DEFAULT_BUDGET, bitrate=None,
+                        allow_copy=True, recursive=False, on_done=None):
+    """
+    Extracts audio from every video in 'input_dir' with at most 'budget' ffmpeg
+    processes at once, writes manifest.json into 'output_dir' and returns the manifest.
+    """
+    if output_format not in AUDIO_FORMATS:
+        raise ConversionError(f"Unsupported audio format '{output_format}'. Choose from: {', '.join(AUDIO_FORMATS)}")
+    details = AUDIO_FORMATS[output_format]
+    videos = find_videos(input_dir, recursive)
+    if not videos:
+        raise ConversionError(f"No video files found in {input_dir}")
+    planned = plan_outputs(videos, input_dir, output_dir, output_format)
+    os.makedirs(output_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    entries = []
+    with ThreadPoolExecutor(max_workers=max(1, budget)) as pool:
+        futures = [pool.submit(extract_one, path, planned[path], details, bitrate, allow_copy) for path in videos]
+        for future in as_completed(futures):
+            entries.append(future.result())
+            if on_done:
+                on_done(entries[-1])
+    entries.sort(key=lambda entry: entry["input"])
+
+    manifest = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "input_dir": os.path.abspath(input_dir), "format": output_format, "budget": budget,
+        "elapsed": round(time.perf_counter() - started, 3),
+        "totals": {
+            "files": len(entries),
+            "ok": sum(entry["status"] == "ok" for entry in entries),
+            "copied": sum(entry.get("mode") == "copy" and entry["status"] == "ok" for entry in entries),
+            "duration": round(sum(entry.get("duration") or 0 for entry in entries), 3),
+            "bytes": sum(entry.get("bytes", 0) for entry in entries),
+        },
+        "files": [{**entry, "input": os.path.relpath(entry["input"], input_dir),
+                   "output": os.path.relpath(entry["output"], output_dir)} for entry in entries],
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def display_manifest(manifest, output_dir):
+    table = Table(title="[bold green]Batch Audio Extraction[/]", border_style="cyan")
+    table.add_column("File", style="cyan")
+    table.add_column("Mode", style="magenta")
+    table.add_column("Duration", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("Status")
+    for entry in manifest["files"]:
+        status = "[success]ok[/]" if entry["status"] == "ok" else f"[warning]{entry['status']}[/]"
+        duration = f"{entry['duration']:.1f}s" if entry.get("duration") else "-"
+        size = f"{entry['bytes'] / 1024 / 1024:.2f} MB" if entry.get("bytes") else "-"
+        table.add_row(entry["input"], entry.get("mode", "-"), duration, size, status)
+    console.print(table)
+    totals = manifest["totals"]
+    console.print(Panel(
+        f"[success]{totals['ok']}/{totals['files']} extracted[/] ({totals['copied']} stream-copied) "
+        f"in {manifest['elapsed']:.1f}s with a budget of {manifest['budget']} ffmpeg processes.\n"
+        f"[info]Manifest:[/info] [path]{os.path.join(output_dir, MANIFEST_NAME)}[/]",
+        title="[bold green]Done[/]", border_style="green"
+    ))
+
+
+def run_batch(input_dir, output_dir, output_format, budget, bitrate=None, allow_copy=True, recursive=False):
+    videos = find_videos(input_dir, recursive)
+    with Progress(TextColumn("[progress.description]{task.description}"), BarColumn(),
+                  MofNCompleteColumn(), TimeElapsedColumn(), console=console) as progress:
+        task = progress.add_task("[green]Extracting audio...", total=len(videos))
+        manifest = extract_audio_batch(input_dir, output_dir, output_format, budget, bitrate, allow_copy,
+                                       recursive, on_done=lambda entry: progress.advance(task))
+    display_manifest(manifest, output_dir)
+    return manifest
+
+
+def main():
+    console.print(Panel(
+        "[bold green]🐍 Batch Audio Extractor 🐍[/]\n[cyan]Pull the audio track out of every video in a folder[/]",
+        title="[bold yellow]Converter[/]", border_style="green", padding=(1, 2)
+    ))
+    while True:
+        input_dir = Prompt.ask("\n[prompt]➡️  Folder with your videos[/prompt]").strip().replace("'", "").replace('"', '')
+        if os.path.isdir(input_dir):
+            break
+        console.print("❌ [danger]ERROR: Folder not found.[/]")
+
+    table = Table(title="[bold green]Select Format[/]", border_style="cyan")
+    table.add_column("No.", style="bold yellow", justify="center")
+    table.add_column("Format", style="bold blue")
+    table.add_column("Description", style="dim cyan")
+    format_list = list(AUDIO_OUTPUT_FORMATS.items())
+    for i, (name, details) in enumerate(format_list, 1):
+        table.add_row(str(i), name, details['desc'])
+    console.print(table)
+    choice = IntPrompt.ask("[prompt]➡️  Choice[/prompt]", choices=[str(i) for i in range(1, len(format_list) + 1)])
+    output_format = format_list[choice - 1][1]['id']
+    budget = IntPrompt.ask("[prompt]➡️  Max concurrent ffmpeg processes[/prompt]", default=DEFAULT_BUDGET)
+    try:
+        run_batch(input_dir, os.path.join(input_dir, "audio"), output_format, budget)
+    except ConversionError as e:
+        console.print(Panel(f"[danger]{e}[/]", title="[bold red]Error[/]", border_style="red"))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 1:
+        main()
+        sys.exit(0)
+    parser = argparse.ArgumentParser(description="Extract audio from every video in a folder, in parallel.")
+    parser.add_argument("input_dir")
+    parser.add_argument("--out", help="Output folder (default: '<input_dir>/audio').")
+    parser.add_argument("--format", default="m4a", choices=list(AUDIO_FORMATS))
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="Max concurrent ffmpeg processes.")
+    parser.add_argument("--bitrate", help="Force a re-encode at this bitrate (disables stream copy).")
+    parser.add_argument("--no-copy", action="store_true", help="Always re-encode, even when the codec matches.")
+    parser.add_argument("--recursive", action="store_true", help="Include videos in subfolders.")
+    args = parser.parse_args()
+    try:
+        run_batch(args.input_dir, args.out or os.path.join(args.input_dir, "audio"), args.format,
+                  args.budget, args.bitrate, not args.no_copy, args.recursive)
+    except ConversionError as e:
+        console.print(Panel(f"[danger]{e}[/]", title="[bold red]Error[/]", border_style="red"))
+        sys.exit(1)
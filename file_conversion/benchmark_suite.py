@@ -0,0 +1,659 @@
+import os
+import sys
+import json
+import wave
+import shutil
+import tarfile
+import zipfile
+import argparse
+import platform
+import resource
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+
+from profiling import process_io_counters
+
+# RICH: Import necessary components
+from rich.console import Console
+from rich.theme import Theme
+from rich.table import Table
+from rich.panel import Panel
+
+# RICH: Define theme and console
+custom_theme = Theme({
+    "info": "dim cyan", "warning": "magenta", "danger": "bold red",
+    "success": "bold green", "prompt": "bold yellow", "path": "bold cyan",
+    "format": "bold blue",
+})
+console = Console(theme=custom_theme)
+
+# --- BENCHMARK CONFIG ---
+# Bump CORPUS_VERSION whenever the generators change, so old corpora are rebuilt
+CORPUS_VERSION = 2
+DEFAULT_SEED = 1234
+DEFAULT_CORPUS_DIR = "bench_corpus"
+DEFAULT_THRESHOLD = 0.10          # 10% slower / bigger counts as a regression
+NOISE_FLOOR_SECONDS = 0.02        # Ignore wall-time changes smaller than this
+FIXED_ZIP_TIME = (2020, 1, 1, 0, 0, 0)
+FIXED_MTIME = 1577836800          # The same instant as a Unix timestamp (zip can't store pre-1980 times)
+
+IMAGE_SIZES = {"small": (64, 64), "medium": (1024, 768), "large": (3840, 2160)}
+IMAGE_MODES = ["RGB", "RGBA", "L", "P"]
+AUDIO_CLIPS = {"short": 5, "long": 60}                       # seconds of 44.1 kHz stereo PCM
+VIDEO_CLIPS = {"sd": ("640x360", 5), "hd": ("1280x720", 10)}  # ffmpeg testsrc2 size, seconds
+PDF_PAGES = {"short": 10, "long": 200}
+PPTX_SLIDES = 30
+
+# Corpus kind -> (output format, options) pairs to benchmark
+TARGETS = {
+    "image": [("jpeg", {"quality": 85}), ("webp", {"quality": 80}), ("png", None)],
+    "audio": [("mp3", {"bitrate": "192k"}), ("flac", None)],
+    "video": [("mkv", {"preset": "veryfast"}), ("mp3", None), ("gif", None), ("hls", {"preset": "veryfast"})],
+    "pdf": [("txt_extract", None), ("png_pages", None)],
+    "docx": [("html", None), ("plain", None)],
+    "pptx": [("pdf", None), ("odp", None)],
+    "archive": [("gztar", None), ("zip", None)],
+    "epub": [("txt", None), ("html", None)],
+    "font": [("woff2-subset", {"ranges": ["latin", "latin-ext"]}), ("woff2", None)],
+}
+
+LOREM = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+         "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud").split()
+
+
+# --- Synthetic corpus generators ---
+# Everything is derived from one seeded RNG, so the same seed always produces
+# byte-identical inputs (ffmpeg clips are bit-exact for a given ffmpeg build).
+
+def _words(rng, count):
+    return " ".join(LOREM[i] for i in rng.integers(0, len(LOREM), count))
+
+
+def make_image(path, size, mode, rng):
+    from PIL import Image
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    # Smooth gradients plus noise: realistic for encoders, not trivially compressible
+    base = np.stack([x / max(width - 1, 1), y / max(height - 1, 1), (x + y) / max(width + height - 2, 1)], axis=-1)
+    pixels = base * 200 + rng.normal(0, 12, (height, width, 3))
+    rgb = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), "RGB")
+    if mode == "RGBA":
+        alpha = Image.fromarray((np.clip(x / max(width - 1, 1), 0, 1) * 255).astype(np.uint8), "L")
+        image = rgb.copy()
+        image.putalpha(alpha)
+    elif mode == "P":
+        image = rgb.convert("P", palette=Image.ADAPTIVE, colors=256)
+    else:
+        image = rgb.convert(mode)
+    image.save(path, "PNG")
+
+
+def make_wav(path, seconds, rng, rate=44100):
+    t = np.arange(int(seconds * rate)) / rate
+    # A slow chirp per channel with a little noise
+    left = np.sin(2 * np.pi * (220 + 400 * t / seconds) * t)
+    right = np.sin(2 * np.pi * (330 + 200 * t / seconds) * t)
+    samples = np.stack([left, right], axis=1) * 0.6 + rng.normal(0, 0.02, (len(t), 2))
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(pcm.tobytes())
+
+
+def make_video(path, size, seconds, ffmpeg_path):
+    command = [
+        ffmpeg_path, "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate=30:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={seconds}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-g", "60", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-b:a", "128k", "-shortest",
+        "-fflags", "+bitexact", "-flags:v", "+bitexact", "-flags:a", "+bitexact", path,
+    ]
+    subprocess.run(command, check=True, capture_output=True)
+
+
+def _zip_writestr(archive, name, data):
+    info = zipfile.ZipInfo(name, date_time=FIXED_ZIP_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    archive.writestr(info, data)
+
+
+def make_tree_files(rng):
+    """(name, bytes) pairs for a nested tree of compressible text and incompressible binaries."""
+    files = []
+    for i in range(200):
+        files.append((f"docs/section_{i % 10}/note_{i:03d}.txt", _words(rng, 400).encode()))
+    for i in range(20):
+        files.append((f"assets/blob_{i:02d}.bin", rng.integers(0, 256, 256 * 1024, dtype=np.uint8).tobytes()))
+    return files
+
+
+def make_zip(path, files):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in files:
+            _zip_writestr(archive, name, data)
+
+
+def make_tar(path, files):
+    import io
+    with tarfile.open(path, "w") as archive:
+        for name, data in files:
+            info = tarfile.TarInfo(name)
+            info.size, info.mtime, info.mode = len(data), FIXED_MTIME, 0o644
+            archive.addfile(info, io.BytesIO(data))
+
+
+def make_pdf(path, pages, rng):
+    import fitz
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Benchmark page {number + 1}", fontsize=18)
+        page.insert_textbox(fitz.Rect(72, 100, 540, 700), _words(rng, 350), fontsize=10)
+        page.draw_rect(fitz.Rect(400, 20, 560, 60), color=(0.2, 0.4, 0.8), fill=(0.8, 0.9, 1.0))
+    doc.save(path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+
+
+def make_docx(path, paragraphs, rng):
+    """A minimal WordprocessingML package; enough for pandoc and LibreOffice."""
+    body = []
+    for i in range(paragraphs):
+        if i % 10 == 0:
+            body.append(f'<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>Section {i // 10 + 1}</w:t></w:r></w:p>')
+        body.append(f"<w:p><w:r><w:t>{_words(rng, 80)}</w:t></w:r></w:p>")
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{"".join(body)}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        _zip_writestr(archive, "[Content_Types].xml", DOCX_CONTENT_TYPES)
+        _zip_writestr(archive, "_rels/.rels", DOCX_RELS)
+        _zip_writestr(archive, "word/document.xml", document)
+
+
+PPTX_NS = ('xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+           'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+           'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"')
+PPTX_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+PPTX_TYPE = "application/vnd.openxmlformats-officedocument."
+PPTX_EMPTY_TREE = ('<p:cSld><p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr>'
+                   '<p:grpSpPr/>{shapes}</p:spTree></p:cSld>')
+PPTX_THEME = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<a:theme xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" name="Bench"><a:themeElements>'
+    '<a:clrScheme name="Bench">' + "".join(
+        f'<a:{name}><a:srgbClr val="{color}"/></a:{name}>' for name, color in (
+            ("dk1", "000000"), ("lt1", "FFFFFF"), ("dk2", "1F497D"), ("lt2", "EEECE1"), ("accent1", "4F81BD"),
+            ("accent2", "C0504D"), ("accent3", "9BBB59"), ("accent4", "8064A2"), ("accent5", "4BACC6"),
+            ("accent6", "F79646"), ("hlink", "0000FF"), ("folHlink", "800080"))) + '</a:clrScheme>'
+    '<a:fontScheme name="Bench"><a:majorFont><a:latin typeface="Arial"/><a:ea typeface=""/><a:cs typeface=""/></a:majorFont>'
+    '<a:minorFont><a:latin typeface="Arial"/><a:ea typeface=""/><a:cs typeface=""/></a:minorFont></a:fontScheme>'
+    '<a:fmtScheme name="Bench">'
+    '<a:fillStyleLst>' + '<a:solidFill><a:schemeClr val="phClr"/></a:solidFill>' * 3 + '</a:fillStyleLst>'
+    '<a:lnStyleLst>' + '<a:ln w="9525"><a:solidFill><a:schemeClr val="phClr"/></a:solidFill></a:ln>' * 3 + '</a:lnStyleLst>'
+    '<a:effectStyleLst>' + '<a:effectStyle><a:effectLst/></a:effectStyle>' * 3 + '</a:effectStyleLst>'
+    '<a:bgFillStyleLst>' + '<a:solidFill><a:schemeClr val="phClr"/></a:solidFill>' * 3 + '</a:bgFillStyleLst>'
+    '</a:fmtScheme></a:themeElements></a:theme>'
+)
+
+
+def _pptx_rels(targets):
+    rels = "".join(f'<Relationship Id="rId{i}" Type="{PPTX_REL}{kind}" Target="{target}"/>'
+                   for i, (kind, target) in enumerate(targets, 1))
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>')
+
+
+def _pptx_text_box(shape_id, name, y, height, size, text):
+    return (f'<p:sp><p:nvSpPr><p:cNvPr id="{shape_id}" name="{name}"/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+            f'<p:spPr><a:xfrm><a:off x="457200" y="{y}"/><a:ext cx="8229600" cy="{height}"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr>'
+            f'<p:txBody><a:bodyPr wrap="square"/><a:lstStyle/><a:p><a:r><a:rPr lang="en-US" sz="{size}"/>'
+            f'<a:t>{text}</a:t></a:r></a:p></p:txBody></p:sp>')
+
+
+def make_pptx(path, slides, rng):
+    """A minimal PresentationML package (one master, one layout, a theme): enough for LibreOffice."""
+    slide_ids = "".join(f'<p:sldId id="{256 + i}" r:id="rId{i + 2}"/>' for i in range(slides))
+    presentation = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    f'<p:presentation {PPTX_NS}><p:sldMasterIdLst><p:sldMasterId id="2147483648" r:id="rId1"/>'
+                    f'</p:sldMasterIdLst><p:sldIdLst>{slide_ids}</p:sldIdLst>'
+                    '<p:sldSz cx="9144000" cy="6858000"/><p:notesSz cx="6858000" cy="9144000"/></p:presentation>')
+    master = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+              f'<p:sldMaster {PPTX_NS}>{PPTX_EMPTY_TREE.format(shapes="")}'
+              '<p:clrMap bg1="lt1" tx1="dk1" bg2="lt2" tx2="dk2" accent1="accent1" accent2="accent2" accent3="accent3" '
+              'accent4="accent4" accent5="accent5" accent6="accent6" hlink="hlink" folHlink="folHlink"/>'
+              '<p:sldLayoutIdLst><p:sldLayoutId id="2147483649" r:id="rId1"/></p:sldLayoutIdLst></p:sldMaster>')
+    layout = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+              f'<p:sldLayout {PPTX_NS} type="blank">{PPTX_EMPTY_TREE.format(shapes="")}'
+              '<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sldLayout>')
+    overrides = [("/ppt/presentation.xml", "presentationml.presentation.main+xml"),
+                 ("/ppt/slideMasters/slideMaster1.xml", "presentationml.slideMaster+xml"),
+                 ("/ppt/slideLayouts/slideLayout1.xml", "presentationml.slideLayout+xml"),
+                 ("/ppt/theme/theme1.xml", "theme+xml")]
+    overrides += [(f"/ppt/slides/slide{i + 1}.xml", "presentationml.slide+xml") for i in range(slides)]
+    content_types = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                     '<Default Extension="xml" ContentType="application/xml"/>'
+                     + "".join(f'<Override PartName="{part}" ContentType="{PPTX_TYPE}{kind}"/>' for part, kind in overrides)
+                     + '</Types>')
+
+    with zipfile.ZipFile(path, "w") as archive:
+        _zip_writestr(archive, "[Content_Types].xml", content_types)
+        _zip_writestr(archive, "_rels/.rels", _pptx_rels([("officeDocument", "ppt/presentation.xml")]))
+        _zip_writestr(archive, "ppt/presentation.xml", presentation)
+        _zip_writestr(archive, "ppt/_rels/presentation.xml.rels", _pptx_rels(
+            [("slideMaster", "slideMasters/slideMaster1.xml")] +
+            [("slide", f"slides/slide{i + 1}.xml") for i in range(slides)] + [("theme", "theme/theme1.xml")]))
+        _zip_writestr(archive, "ppt/slideMasters/slideMaster1.xml", master)
+        _zip_writestr(archive, "ppt/slideMasters/_rels/slideMaster1.xml.rels", _pptx_rels(
+            [("slideLayout", "../slideLayouts/slideLayout1.xml"), ("theme", "../theme/theme1.xml")]))
+        _zip_writestr(archive, "ppt/slideLayouts/slideLayout1.xml", layout)
+        _zip_writestr(archive, "ppt/slideLayouts/_rels/slideLayout1.xml.rels", _pptx_rels(
+            [("slideMaster", "../slideMasters/slideMaster1.xml")]))
+        _zip_writestr(archive, "ppt/theme/theme1.xml", PPTX_THEME)
+        for i in range(slides):
+            shapes = (_pptx_text_box(2, "Title", 457200, 914400, 3600, f"Slide {i + 1}") +
+                      _pptx_text_box(3, "Body", 1600200, 4572000, 1800, _words(rng, 60)))
+            _zip_writestr(archive, f"ppt/slides/slide{i + 1}.xml",
+                          '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                          f'<p:sld {PPTX_NS}>{PPTX_EMPTY_TREE.format(shapes=shapes)}'
+                          '<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>')
+            _zip_writestr(archive, f"ppt/slides/_rels/slide{i + 1}.xml.rels", _pptx_rels(
+                [("slideLayout", "../slideLayouts/slideLayout1.xml")]))
+
+
+def make_epub(path, chapters, rng):
+    container = ('<?xml version="1.0"?><container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+                 '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>'
+                 '</rootfiles></container>')
+    manifest = "".join(f'<item id="c{i}" href="chapter_{i}.xhtml" media-type="application/xhtml+xml"/>' for i in range(chapters))
+    spine = "".join(f'<itemref idref="c{i}"/>' for i in range(chapters))
+    opf = ('<?xml version="1.0"?><package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="id">'
+           '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:title>Benchmark Book</dc:title>'
+           '<dc:identifier id="id">bench-book</dc:identifier><dc:language>en</dc:language></metadata>'
+           f'<manifest>{manifest}</manifest><spine>{spine}</spine></package>')
+    with zipfile.ZipFile(path, "w") as archive:
+        info = zipfile.ZipInfo("mimetype", date_time=FIXED_ZIP_TIME)
+        archive.writestr(info, "application/epub+zip")
+        _zip_writestr(archive, "META-INF/container.xml", container)
+        _zip_writestr(archive, "OEBPS/content.opf", opf)
+        for i in range(chapters):
+            paragraphs = "".join(f"<p>{_words(rng, 120)}</p>" for _ in range(30))
+            _zip_writestr(archive, f"OEBPS/chapter_{i}.xhtml",
+                          f'<html xmlns="http://www.w3.org/1999/xhtml"><head><title>Chapter {i + 1}</title></head>'
+                          f'<body><h1>Chapter {i + 1}</h1>{paragraphs}</body></html>')
+
+
+def make_font(path):
+    """A TrueType font with a box glyph for every Latin-1 and Latin Extended-A character."""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    codepoints = list(range(0x20, 0x7F)) + list(range(0xA0, 0x180))
+    glyph_order = [".notdef"] + [f"uni{cp:04X}" for cp in codepoints]
+    glyphs, metrics = {}, {}
+    for index, name in enumerate(glyph_order):
+        pen = TTGlyphPen(None)
+        if name != "uni0020":
+            inset = 40 + index % 60  # Vary the outlines so glyphs don't deduplicate
+            pen.moveTo((inset, 0)); pen.lineTo((inset, 700)); pen.lineTo((560 - inset, 700))
+            pen.lineTo((560 - inset, 0)); pen.closePath()
+        glyphs[name] = pen.glyph()
+        metrics[name] = (600, inset if name != "uni0020" else 0)
+
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(glyph_order)
+    builder.setupCharacterMap({cp: f"uni{cp:04X}" for cp in codepoints})
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics(metrics)
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "BenchSans", "styleName": "Regular"})
+    builder.setupOS2(sTypoAscender=800, sTypoDescender=-200, usWinAscent=800, usWinDescent=200)
+    builder.setupPost()
+    builder.save(path)
+
+
+def generate_corpus(corpus_dir, seed=DEFAULT_SEED, force=False):
+    """
+    Builds the synthetic corpus in 'corpus_dir' and returns its manifest entries
+    (name, kind, category). Reuses an existing corpus built with the same seed/version.
+    """
+    manifest_path = os.path.join(corpus_dir, "corpus.json")
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("seed") == seed and manifest.get("version") == CORPUS_VERSION and all(
+                os.path.exists(os.path.join(corpus_dir, entry["name"])) for entry in manifest["files"]):
+            return manifest["files"]
+
+    if os.path.isdir(corpus_dir):
+        shutil.rmtree(corpus_dir)
+    os.makedirs(corpus_dir)
+    rng = np.random.default_rng(seed)
+    entries = []
+
+    def add(name, kind, category):
+        entries.append({"name": name, "kind": kind, "category": category})
+        return os.path.join(corpus_dir, name)
+
+    with console.status("[info]Generating images...[/]"):
+        for size_name, size in IMAGE_SIZES.items():
+            # The 4K frame only in RGB: enough to catch scaling issues without a huge corpus
+            for mode in (IMAGE_MODES if size_name != "large" else ["RGB"]):
+                make_image(add(f"image_{size_name}_{mode.lower()}.png", "image", "Image"), size, mode, rng)
+
+    with console.status("[info]Generating audio...[/]"):
+        for clip_name, seconds in AUDIO_CLIPS.items():
+            make_wav(add(f"audio_{clip_name}.wav", "audio", "Audio"), seconds, rng)
+
+    from video_conversion import FFMPEG_PATH
+    with console.status("[info]Generating video with ffmpeg...[/]"):
+        for clip_name, (size, seconds) in VIDEO_CLIPS.items():
+            make_video(add(f"video_{clip_name}.mp4", "video", "Video"), size, seconds, FFMPEG_PATH)
+
+    with console.status("[info]Generating archives, documents, presentations, e-books and fonts...[/]"):
+        tree = make_tree_files(rng)
+        make_zip(add("archive_tree.zip", "archive", "Archive"), tree)
+        make_tar(add("archive_tree.tar", "archive", "Archive"), tree)
+        for length, pages in PDF_PAGES.items():
+            make_pdf(add(f"document_{length}.pdf", "pdf", "Document"), pages, rng)
+        make_docx(add("document_report.docx", "docx", "Document"), 300, rng)
+        make_pptx(add("presentation_deck.pptx", "pptx", "Presentation"), PPTX_SLIDES, rng)
+        make_epub(add("ebook_novel.epub", "epub", "E-book"), 40, rng)
+        try:
+            make_font(add("font_bench.ttf", "font", "Font"))
+        except ImportError:
+            entries.pop()
+            console.print("[warning]fonttools is not installed; skipping the font corpus.[/]")
+
+    with open(manifest_path, "w") as f:
+        json.dump({"version": CORPUS_VERSION, "seed": seed, "files": entries}, f, indent=2)
+    return entries
+
+
+# --- Running the benchmark ---
+
+def build_cases(entries, only=None):
+    """Expands corpus entries into benchmark cases (one per input/target pair)."""
+    cases = []
+    for entry in entries:
+        if only and entry["category"] not in only:
+            continue
+        for output_format, options in TARGETS[entry["kind"]]:
+            cases.append({
+                "id": f"{entry['name']}->{output_format}",
+                "category": entry["category"],
+                "input": entry["name"],
+                "output_format": output_format,
+                "options": options,
+            })
+    return cases
+
+
+def _own_peak_rss_kb():
+    # ru_maxrss survives fork+exec, so a child would report the benchmark parent's peak.
+    # VmHWM belongs to the address space, which exec replaces.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _rusage_snapshot():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+    return cpu, max(_own_peak_rss_kb(), children.ru_maxrss)
+
+
+def run_child(spec):
+    """
+    Runs one conversion in this (fresh) process and returns its measurements.
+    CPU time includes external tools (ffmpeg, pandoc...) the converter waits on.
+    """
+    from main import CONVERTERS
+    from conversion_api import ConversionJob
+
+    converter = CONVERTERS[spec["category"]]
+    # Outputs go to the scratch directory, named the way the converter would name them
+    scratch_input = os.path.join(spec["output_dir"], os.path.basename(spec["input_path"]))
+    try:
+        output_path = converter.default_output_path(
+            scratch_input, spec["output_format"], converter.coerce_options(spec["options"]))
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+    job = ConversionJob(spec["input_path"], spec["output_format"], spec["options"], output_path)
+    cpu_before, _ = _rusage_snapshot()
+    io_before = process_io_counters()
+    try:
+        result = converter.convert(job)
+    except Exception as e:
+        cpu_after, peak_rss = _rusage_snapshot()
+        return {"status": "error", "error": str(e).splitlines()[0] if str(e) else type(e).__name__,
+                "cpu": cpu_after - cpu_before, "peak_rss_kb": peak_rss}
+    cpu_after, peak_rss = _rusage_snapshot()
+    io_after = process_io_counters()
+    # Bytes read+written by the converter and the tools it ran (see process_io_counters)
+    io_bytes = (io_after["read"] + io_after["written"] - io_before["read"] - io_before["written"]
+                if io_before and io_after else None)
+    return {"status": "ok", "wall": result.elapsed, "cpu": cpu_after - cpu_before,
+            "peak_rss_kb": peak_rss, "bytes_out": result.bytes_written, "io_bytes": io_bytes}
+
+
+def _run_in_subprocess(spec, env=None):
+    # A fresh interpreter per run keeps peak RSS honest: nothing from earlier jobs lingers
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), "_child"],
+                             input=json.dumps(spec), capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    try:
+        return json.loads(process.stdout.strip().splitlines()[-1])
+    except (IndexError, json.JSONDecodeError):
+        return {"status": "error", "error": (process.stderr.strip().splitlines() or ["child crashed"])[-1]}
+
+
+def run_case(case, corpus_dir, output_dir, repeat):
+    spec = {"category": case["category"], "input_path": os.path.abspath(os.path.join(corpus_dir, case["input"])),
+            "output_format": case["output_format"], "options": case["options"],
+            "output_dir": os.path.abspath(output_dir)}
+    runs = []
+    for _ in range(repeat):
+        # Start every run from an empty scratch directory
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.makedirs(output_dir)
+        measurement = _run_in_subprocess(spec)
+        if measurement["status"] != "ok":
+            return {**case, **measurement}
+        runs.append(measurement)
+
+    walls = [run["wall"] for run in runs]
+    return {
+        **case, "status": "ok", "runs": len(runs),
+        "wall_min": min(walls), "wall_median": statistics.median(walls),
+        "cpu_median": statistics.median(run["cpu"] for run in runs),
+        "peak_rss_kb": max(run["peak_rss_kb"] for run in runs),
+        "bytes_out": runs[-1]["bytes_out"],
+    }
+
+
+def _ffmpeg_version():
+    from video_conversion import FFMPEG_PATH
+    try:
+        return subprocess.run([FFMPEG_PATH, "-version"], capture_output=True, text=True).stdout.split("\n")[0]
+    except OSError:
+        return None
+
+
+def run_benchmark(corpus_dir, output_json, repeat=3, only=None, seed=DEFAULT_SEED):
+    entries = generate_corpus(corpus_dir, seed)
+    cases = build_cases(entries, only)
+    output_dir = os.path.join(corpus_dir, "_outputs")
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = []
+    for index, case in enumerate(cases, 1):
+        with console.status(f"[info]({index}/{len(cases)}) {case['id']}[/]"):
+            result = run_case(case, corpus_dir, output_dir, repeat)
+        results.append(result)
+        if result["status"] == "ok":
+            console.print(f"[success]✓[/] {case['id']}  [dim]{result['wall_min'] * 1000:.1f} ms, "
+                          f"{result['peak_rss_kb'] / 1024:.1f} MiB peak[/]")
+        else:
+            console.print(f"[warning]✗[/] {case['id']}  [dim]{result['error']}[/]")
+    shutil.rmtree(output_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "ffmpeg": _ffmpeg_version(),
+            "seed": seed, "corpus_version": CORPUS_VERSION, "repeat": repeat,
+        },
+        "results": results,
+    }
+    with open(output_json, "w") as f:
+        json.dump(report, f, indent=2)
+    console.print(f"\n[success]Results written to[/] [path]{output_json}[/]")
+    return report
+
+
+# --- Comparing two runs ---
+
+def _relative_change(old, new):
+    return (new - old) / old if old else 0.0
+
+
+def compare_reports(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns one row per case present in both reports. A case regresses when it
+    now fails, or its best wall time, median CPU time, peak RSS or output size grew
+    by more than 'threshold'. Time changes under NOISE_FLOOR_SECONDS are ignored.
+    """
+    old_results = {r["id"]: r for r in baseline["results"]}
+    rows = []
+    for new in current["results"]:
+        old = old_results.get(new["id"])
+        if old is None:
+            continue
+        row = {"id": new["id"], "old_status": old["status"], "new_status": new["status"], "regressions": []}
+        if old["status"] == "ok" and new["status"] != "ok":
+            row["regressions"].append("now fails")
+        if old["status"] == "ok" and new["status"] == "ok":
+            for metric in ("wall_min", "cpu_median", "peak_rss_kb", "bytes_out"):
+                if metric not in old or metric not in new:
+                    continue
+                change = _relative_change(old[metric], new[metric])
+                row[metric] = change
+                timed = metric in ("wall_min", "cpu_median")
+                if change > threshold and not (timed and new[metric] - old[metric] < NOISE_FLOOR_SECONDS):
+                    row["regressions"].append(metric)
+        rows.append(row)
+    return rows
+
+
+def _format_change(change):
+    if change is None:
+        return "[dim]-[/]"
+    color = "danger" if change > 0.005 else "success" if change < -0.005 else "info"
+    return f"[{color}]{change:+.1%}[/]"
+
+
+def display_comparison(rows, threshold):
+    table = Table(title=f"Benchmark Comparison (threshold {threshold:.0%})", header_style="bold magenta")
+    table.add_column("Case", style="cyan")
+    table.add_column("Wall", justify="right")
+    table.add_column("CPU", justify="right")
+    table.add_column("Peak RSS", justify="right")
+    table.add_column("Output", justify="right")
+    table.add_column("Verdict")
+    for row in rows:
+        if row["regressions"]:
+            verdict = f"[danger]REGRESSION[/] [dim]({', '.join(row['regressions'])})[/]"
+        elif row["new_status"] != "ok":
+            verdict = f"[dim]{row['new_status']}[/]"
+        else:
+            verdict = "[success]ok[/]"
+        table.add_row(row["id"], _format_change(row.get("wall_min")), _format_change(row.get("cpu_median")),
+                      _format_change(row.get("peak_rss_kb")), _format_change(row.get("bytes_out")), verdict)
+    console.print(table)
+
+
+def compare_command(baseline_path, current_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+    rows = compare_reports(baseline, current, threshold)
+    display_comparison(rows, threshold)
+    regressions = [row for row in rows if row["regressions"]]
+    if regressions:
+        console.print(Panel(f"[danger]{len(regressions)} regression(s) found.[/]", border_style="red"))
+        return 1
+    console.print(Panel("[success]No regressions.[/]", border_style="green"))
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ["_child"]:
+        print(json.dumps(run_child(json.loads(sys.stdin.read()))))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Benchmark every converter over a deterministic synthetic corpus.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    corpus_parser = subparsers.add_parser("corpus", help="Generate the synthetic corpus only.")
+    corpus_parser.add_argument("--dir", default=DEFAULT_CORPUS_DIR)
+    corpus_parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    corpus_parser.add_argument("--force", action="store_true", help="Rebuild even if an up-to-date corpus exists.")
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark and write results JSON.")
+    run_parser.add_argument("--corpus", default=DEFAULT_CORPUS_DIR)
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_parser.add_argument("--out", default="bench_results.json")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the best wall time is compared.")
+    run_parser.add_argument("--only", help="Comma-separated categories, e.g. Image,Audio")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two results files and flag regressions.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args()
+    if args.command == "corpus":
+        files = generate_corpus(args.dir, args.seed, args.force)
+        console.print(f"[success]Corpus ready:[/] {len(files)} files in [path]{args.dir}[/]")
+    elif args.command == "run":
+        only = set(args.only.split(",")) if args.only else None
+        run_benchmark(args.corpus, args.out, args.repeat, only, args.seed)
+    else:
+        sys.exit(compare_command(args.baseline, args.current, args.threshold))
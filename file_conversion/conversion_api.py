@@ -0,0 +1,139 @@
+import os
+import time
+import subprocess
+from dataclasses import dataclass, field, replace, fields, is_dataclass
+
+from profiling import stage, job_accounting
+
+# --- Headless conversion API ---
+# Every converter module implements a Converter subclass. The Rich menus in each
+# module are a thin layer on top: they collect choices, build a ConversionJob,
+# and display the ConversionResult. Services, queues and thread pools can use
+# the converters directly without any terminal interaction.
+
+
+class ConversionError(Exception):
+    """Raised when a conversion fails. 'stderr' holds the external tool's output, if any."""
+    def __init__(self, message, stderr=""):
+        super().__init__(message)
+        self.stderr = stderr
+
+    def __reduce__(self):
+        # Keep 'stderr' when the error crosses a process-pool boundary
+        return (type(self), (str(self), self.stderr))
+
+
+@dataclass
+class ConversionJob:
+    input_path: str
+    output_format: str
+    options: object = None      # The converter's options dataclass, a plain dict, or None for defaults
+    output_path: str = None     # None = '<input>_converted.<ext>' next to the input
+
+
+@dataclass
+class ConversionResult:
+    job: ConversionJob
+    output_path: str
+    bytes_written: int
+    elapsed: float
+    stderr: str = ""
+    metadata: dict = field(default_factory=dict)
+
+
+def path_size(path):
+    """Size of a file, or the total size of every file inside a directory."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+class Converter:
+    """
+    Base class for all converters. Subclasses set 'category', 'formats' and
+    'options_class', then implement either build_command() (external tools that
+    can run as a plain subprocess) or execute() (in-process work).
+    """
+    category = None
+    formats = {}            # Output format id -> details dict (the same tables the CLI shows)
+    options_class = None
+
+    def output_formats(self):
+        return list(self.formats)
+
+    def output_extension(self, output_format):
+        details = self.formats.get(output_format, {})
+        return details.get("ext", output_format).lstrip(".")
+
+    def default_output_path(self, input_path, output_format, options):
+        base_name = os.path.splitext(input_path)[0]
+        return f"{base_name}_converted.{self.output_extension(output_format)}"
+
+    def coerce_options(self, options):
+        if self.options_class is None:
+            return options
+        if options is None:
+            return self.options_class()
+        if isinstance(options, dict):
+            known = {f.name for f in fields(self.options_class)}
+            unknown = set(options) - known
+            if unknown:
+                raise ConversionError(f"Unknown {self.category} option(s): {', '.join(sorted(unknown))}")
+            return self.options_class(**options)
+        if is_dataclass(options):
+            return options
+        raise ConversionError(f"Options must be a {self.options_class.__name__} or a dict.")
+
+    def prepare(self, job):
+        """Validates the job and fills in defaults. Returns a new, fully resolved job."""
+        if not os.path.exists(job.input_path):
+            raise ConversionError(f"Input file not found: {job.input_path}")
+        if self.formats and job.output_format not in self.formats:
+            raise ConversionError(
+                f"Unsupported {self.category} output format '{job.output_format}'. "
+                f"Choose from: {', '.join(self.output_formats())}"
+            )
+        options = self.coerce_options(job.options)
+        output_path = job.output_path or self.default_output_path(job.input_path, job.output_format, options)
+        return replace(job, options=options, output_path=output_path)
+
+    def build_command(self, job):
+        """argv for converters that are a single external tool run, or None for in-process work."""
+        return None
+
+    def execute(self, job):
+        """Runs a prepared job. Returns (output_path, stderr, metadata)."""
+        command = self.build_command(job)
+        if command is None:
+            raise NotImplementedError(f"{type(self).__name__} must implement build_command() or execute().")
+        with stage("subprocess", tool=os.path.basename(command[0])):
+            process = subprocess.run(command, capture_output=True)
+        stderr = process.stderr.decode("utf-8", errors="replace")
+        return self.finish_command(job, process.returncode, process.stdout.decode("utf-8", errors="replace"), stderr)
+
+    def finish_command(self, job, returncode, stdout, stderr):
+        """Checks the result of build_command(). Shared by execute() and asynchronous runners."""
+        if returncode != 0:
+            raise ConversionError(f"{self.category} conversion failed (exit code {returncode}).", stdout + stderr)
+        return job.output_path, stderr, {}
+
+    def make_result(self, job, started, output_path, stderr="", metadata=None):
+        return ConversionResult(
+            job=job, output_path=output_path, bytes_written=path_size(output_path),
+            elapsed=time.perf_counter() - started, stderr=stderr, metadata=metadata or {},
+        )
+
+    def convert(self, job):
+        """Runs a job synchronously and returns a ConversionResult. Raises ConversionError."""
+        job = self.prepare(job)
+        started = time.perf_counter()
+        with job_accounting(f"{self.category} -> {job.output_format}", input=os.path.basename(job.input_path)) as accounting:
+            try:
+                output_path, stderr, metadata = self.execute(job)
+            except (ConversionError, NotImplementedError):
+                raise
+            except Exception as e:
+                raise ConversionError(str(e)) from e
+        # Per-stage wall/CPU/RSS/IO figures; see profiling.py
+        return self.make_result(job, started, output_path, stderr, {**(metadata or {}), **accounting.as_metadata()})
@@ -0,0 +1,376 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import asyncio
+import argparse
+from bisect import bisect_left
+from dataclasses import asdict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+# RICH: Import necessary components
+from rich.console import Console
+from rich.theme import Theme
+from rich.panel import Panel
+
+from conversion_api import ConversionJob, ConversionError
+
+# RICH: Define theme and console
+custom_theme = Theme({
+    "info": "dim cyan", "warning": "magenta", "danger": "bold red",
+    "success": "bold green", "prompt": "bold yellow", "path": "bold cyan",
+    "format": "bold blue",
+})
+console = Console(theme=custom_theme)
+
+# --- SERVER CONFIG ---
+DEFAULT_HOST, DEFAULT_PORT = "127.0.0.1", 8765
+DEFAULT_QUEUE_SIZE = 32
+# Concurrent jobs per category. LibreOffice shares one user profile, so it must stay at 1.
+DEFAULT_WORKERS = {
+    "Audio": os.cpu_count() or 2, "Video": 2, "Image": os.cpu_count() or 2,
+    "Document": 2, "Presentation": 1, "Archive": 2, "E-book": 2, "Font": 2,
+}
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus style
+LATENCY_BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, float("inf")]
+MAX_REQUEST_BYTES = 1024 * 1024
+
+
+def _run_in_process(category, job):
+    """Process-pool entry point for in-process converters (Pillow, PyMuPDF, pydub, ...)."""
+    from main import CONVERTERS
+    return CONVERTERS[category].convert(job)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+        self.samples = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.samples += 1
+
+    def snapshot(self):
+        cumulative, buckets = 0, {}
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {"buckets": buckets, "count": self.samples, "sum": round(self.total, 4)}
+
+
+class CategoryPool:
+    """A bounded job queue and its workers for one category (Audio, Video, ...)."""
+    def __init__(self, category, converter, workers, queue_size):
+        self.category = category
+        self.converter = converter
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.executor = None        # Created on first in-process job
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_latency = LatencyHistogram()
+        self.run_latency = LatencyHistogram()
+        self.tasks = []
+
+    def start(self):
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.executor:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def _run_subprocess(self, job, command):
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await process.communicate()
+        output_path, stderr_text, metadata = self.converter.finish_command(
+            job, process.returncode, stdout.decode("utf-8", errors="replace"),
+            stderr.decode("utf-8", errors="replace"))
+        return self.converter.make_result(job, started, output_path, stderr_text, metadata)
+
+    async def _execute(self, job):
+        # External tools run as async subprocesses; everything else goes to a process pool
+        command = self.converter.build_command(job)
+        if command is not None:
+            return await self._run_subprocess(job, command)
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _run_in_process, self.category, job)
+
+    async def _worker(self):
+        while True:
+            job_id, job, enqueued_at, events = await self.queue.get()
+            started = time.perf_counter()
+            self.wait_latency.observe(started - enqueued_at)
+            self.running += 1
+            await events.put({"event": "started", "job_id": job_id, "category": self.category,
+                              "queue_wait": round(started - enqueued_at, 4)})
+            try:
+                result = await self._execute(job)
+                self.completed += 1
+                await events.put({"event": "done", "job_id": job_id, "result": _result_to_dict(result)})
+            except Exception as e:
+                self.failed += 1
+                await events.put({"event": "error", "job_id": job_id, "error": str(e),
+                                  "stderr": getattr(e, "stderr", "")})
+            finally:
+                self.running -= 1
+                self.run_latency.observe(time.perf_counter() - started)
+                await events.put(None)
+                self.queue.task_done()
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue.qsize(), "queue_capacity": self.queue.maxsize,
+            "running": self.running, "workers": self.workers,
+            "completed": self.completed, "failed": self.failed,
+            "queue_wait_seconds": self.wait_latency.snapshot(),
+            "run_seconds": self.run_latency.snapshot(),
+        }
+
+
+def _job_spec(body):
+    """Parses and type-checks a POST /jobs body; raises ConversionError on a bad shape."""
+    spec = json.loads(body or b"{}")
+    if not isinstance(spec, dict):
+        raise ConversionError("The job spec must be a JSON object.")
+    for field_name in ("input_path", "output_format"):
+        if field_name not in spec:
+            raise ConversionError(f"Missing field '{field_name}'")
+        if not isinstance(spec[field_name], str) or not spec[field_name]:
+            raise ConversionError(f"'{field_name}' must be a non-empty string.")
+    if not isinstance(spec.get("options") or {}, dict):
+        raise ConversionError("'options' must be a JSON object.")
+    if not isinstance(spec.get("output_path") or "", str):
+        raise ConversionError("'output_path' must be a string.")
+    return spec
+
+
+def _result_to_dict(result):
+    data = asdict(result)
+    job = data.pop("job")
+    data["input_path"] = job["input_path"]
+    data["output_format"] = job["output_format"]
+    data["elapsed"] = round(data["elapsed"], 4)
+    return data
+
+
+class ConversionServer:
+    """
+    HTTP/1.1 job server over TCP or a Unix socket.
+      POST /jobs     JSON job spec -> newline-delimited JSON events, streamed as they happen
+      GET  /metrics  per-category queue depth, counters and latency histograms
+      GET  /health   liveness check
+    A full category queue makes POST /jobs wait (backpressure), or return 503
+    immediately when the request has '?wait=0'.
+    """
+    def __init__(self, converters, file_type_mapping, workers=None, queue_size=DEFAULT_QUEUE_SIZE):
+        self.file_type_mapping = file_type_mapping
+        workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self.pools = {category: CategoryPool(category, converter, workers.get(category, 1), queue_size)
+                      for category, converter in converters.items()}
+        self.started_at = time.time()
+
+    def category_for(self, path):
+        info = self.file_type_mapping.get(os.path.splitext(path)[1].lower())
+        return info[0] if info else None
+
+    async def start(self, host=None, port=None, unix_path=None):
+        for pool in self.pools.values():
+            pool.start()
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            return await asyncio.start_unix_server(self.handle_connection, path=unix_path, limit=MAX_REQUEST_BYTES)
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_REQUEST_BYTES)
+
+    async def stop(self):
+        await asyncio.gather(*(pool.stop() for pool in self.pools.values()))
+
+    # --- HTTP plumbing ---
+    async def handle_connection(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            if not request_line:
+                return
+            method, target, _ = request_line.split(" ", 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length > MAX_REQUEST_BYTES:
+                await self.send_json(writer, 413, {"error": "Request body too large."})
+                return
+            body = await reader.readexactly(length) if length else b""
+            await self.route(method.upper(), target, body, writer)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            await self.send_json(writer, 400, {"error": f"Malformed request: {e}"})
+        except ConnectionError:
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def send_json(self, writer, status, payload, extra_headers=""):
+        body = json.dumps(payload, indent=2, default=str).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                  503: "Service Unavailable"}.get(status, "")
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n{extra_headers}Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def send_chunk(self, writer, payload):
+        # default=str: converter metadata may hold paths, numpy scalars and the like
+        data = (json.dumps(payload, default=str) + "\n").encode()
+        writer.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+    async def route(self, method, target, body, writer):
+        url = urlsplit(target)
+        if method == "GET" and url.path == "/health":
+            await self.send_json(writer, 200, {"status": "ok", "uptime": round(time.time() - self.started_at, 1)})
+        elif method == "GET" and url.path == "/metrics":
+            await self.send_json(writer, 200, self.metrics())
+        elif method == "POST" and url.path == "/jobs":
+            wait = parse_qs(url.query).get("wait", ["1"])[0] != "0"
+            await self.submit(body, wait, writer)
+        else:
+            await self.send_json(writer, 404, {"error": f"No route for {method} {url.path}"})
+
+    # --- Jobs ---
+    async def submit(self, body, wait, writer):
+        try:
+            spec = _job_spec(body)
+            input_path = os.path.abspath(spec["input_path"])
+            category = self.category_for(input_path)
+            if category is None:
+                raise ConversionError(f"Unknown file type: '{os.path.splitext(input_path)[1]}'")
+            pool = self.pools[category]
+            # prepare() may probe the input (ffmpeg for HLS) and create folders: keep it off the event loop
+            job = await asyncio.to_thread(pool.converter.prepare, ConversionJob(
+                input_path, spec["output_format"], spec.get("options"), spec.get("output_path")))
+        except (json.JSONDecodeError, ConversionError) as e:
+            await self.send_json(writer, 400, {"error": str(e)})
+            return
+
+        job_id = uuid.uuid4().hex[:12]
+        events = asyncio.Queue()
+        item = (job_id, job, time.perf_counter(), events)
+        if not wait:
+            try:
+                pool.queue.put_nowait(item)
+            except asyncio.QueueFull:
+                await self.send_json(writer, 503, {"error": f"The {category} queue is full.",
+                                                   "queue_depth": pool.queue.qsize()}, "Retry-After: 1\r\n")
+                return
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+        if wait:
+            if pool.queue.full():
+                await self.send_chunk(writer, {"event": "waiting", "job_id": job_id, "category": category,
+                                               "queue_depth": pool.queue.qsize()})
+            await pool.queue.put(item)      # Backpressure: blocks while the category queue is full
+        await self.send_chunk(writer, {"event": "queued", "job_id": job_id, "category": category,
+                                       "queue_depth": pool.queue.qsize()})
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            await self.send_chunk(writer, event)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    def metrics(self):
+        return {category: pool.stats() for category, pool in self.pools.items()}
+
+
+# --- Minimal client ---
+def submit_job(spec, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, wait=True):
+    """Posts a job and yields each event dict as the server streams it back."""
+    if unix_path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(unix_path)
+    else:
+        sock = socket.create_connection((host, port))
+    body = json.dumps(spec).encode()
+    path = "/jobs" if wait else "/jobs?wait=0"
+    sock.sendall(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    with sock, sock.makefile("rb") as response:
+        status = int(response.readline().split()[1])
+        headers = {}
+        while True:
+            line = response.readline().decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding") != "chunked":
+            payload = json.loads(response.read(int(headers.get("content-length", 0))) or b"{}")
+            yield {"event": "rejected", "status": status, **payload}
+            return
+        while True:
+            size = int(response.readline().strip(), 16)
+            if size == 0:
+                break
+            yield json.loads(response.read(size))
+            response.readline()
+
+
+async def serve(args):
+    # Imported here so the module (and _run_in_process) stays light for worker processes
+    from main import CONVERTERS, FILE_TYPE_MAPPING
+
+    workers = {}
+    for spec in args.workers or []:
+        category, _, count = spec.partition("=")
+        workers[category] = int(count)
+    server = ConversionServer(CONVERTERS, FILE_TYPE_MAPPING, workers=workers, queue_size=args.queue_size)
+    listener = await server.start(args.host, args.port, args.unix)
+    where = f"unix:{args.unix}" if args.unix else f"http://{args.host}:{args.port}"
+    console.print(Panel(
+        f"[success]Conversion server listening on[/] [path]{where}[/]\n"
+        "[info]POST /jobs[/]  •  [info]GET /metrics[/]  •  [info]GET /health[/]\n"
+        f"[dim]Queue size per category: {args.queue_size}[/]",
+        title="[bold yellow]Universal Converter Service[/]", border_style="green", padding=(1, 2)
+    ))
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the file converters as a long-lived asyncio service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Listen on this Unix socket path instead of TCP.")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Bounded queue size per category.")
+    parser.add_argument("--workers", action="append", metavar="CATEGORY=N",
+                        help="Concurrent jobs for a category, e.g. --workers Video=4. Repeatable.")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        console.print("\n[warning]Server stopped.[/]")
+        sys.exit(0)
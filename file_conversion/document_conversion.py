@@ -1,5 +1,6 @@
 import os
 import sys
+from dataclasses import dataclass, field
 import pypandoc
 import fitz  # PyMuPDF
 
@@ -7,9 +8,11 @@ import fitz  # PyMuPDF
 from rich.console import Console
 from rich.theme import Theme
 from rich.panel import Panel
-from rich.prompt import Prompt, IntPrompt
+from rich.prompt import Prompt, IntPrompt, Confirm
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+
+from conversion_api import Converter, ConversionJob, ConversionError
+from pdf_assembly import merge_pdfs, split_pdf, interleave_pdfs, SAVE_MODE_NAMES
 
 # RICH: Define theme and console
 custom_theme = Theme({
@@ -45,8 +48,14 @@ SUPPORTED_FORMATS = {
 PYMUPDF_OPTIONS = {
     "Extract Text to TXT": {"id": "txt_extract", "type": "[white]Text Data[/]", "desc": "Pulls all readable text from the document into a single .txt file."},
     "Pages to PNG Images": {"id": "png_pages", "type": "[cyan]Image Data[/]", "desc": "Creates a separate PNG image for each page of the document."},
+    "Merge PDFs": {"id": "pdf_merge", "type": "[red]PDF Assembly[/]", "desc": "[dim](PDF only)[/] Appends other PDFs after this one, keeping their bookmarks."},
+    "Split PDF": {"id": "pdf_split", "type": "[red]PDF Assembly[/]", "desc": "[dim](PDF only)[/] Splits into several PDFs by bookmarks, every N pages or page ranges."},
+    "Interleave PDFs": {"id": "pdf_interleave", "type": "[red]PDF Assembly[/]", "desc": "[dim](PDF only)[/] Alternates pages with another PDF, e.g. odd/even duplex scans."},
 }
 
+# PyMuPDF outputs that rewrite PDFs rather than extract from them
+PDF_ASSEMBLY_FORMATS = {"pdf_merge", "pdf_split", "pdf_interleave"}
+
 PYMUPDF_INPUT_FORMATS = {'.pdf', '.xps', '.oxps', '.epub', '.cbz'}
 
 
@@ -93,58 +102,130 @@ def get_output_format(is_special_input=False):
     )
     return format_list[choice - 1][1]['id']
 
-def convert_with_pymupdf(input_path, output_format):
-    base_name = os.path.splitext(input_path)[0]
-    
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(), transient=True) as progress:
-        task = progress.add_task("[green]Processing...", total=1)
-        doc = fitz.open(input_path)
-        progress.update(task, total=len(doc)) # Set total to number of pages
-        
+def get_assembly_options(output_format_id):
+    """Asks for the extra inputs and settings a merge/split/interleave needs."""
+    options = DocumentOptions()
+    if output_format_id == "pdf_split":
+        options.split = Prompt.ask("[prompt]➡️  Split by 'bookmarks', 'every:N' or page ranges (e.g. 1-3,4-)[/prompt]",
+                                   default="bookmarks")
+    else:
+        while True:
+            path = Prompt.ask("[prompt]➡️  Path to another PDF (leave empty when done)[/prompt]",
+                              default="").strip().replace("'", "").replace('"', '')
+            if not path and options.pdf_inputs:
+                break
+            if path and os.path.isfile(path):
+                options.pdf_inputs.append(path)
+            else:
+                console.print("❌ [danger]ERROR: File not found or is not a valid file.[/]")
+        if output_format_id == "pdf_interleave":
+            options.reverse_others = Confirm.ask("[prompt]➡️  Are the other PDFs in reverse order (duplex back sides)?[/prompt]",
+                                                 default=False)
+    options.save_mode = Prompt.ask("[prompt]➡️  Save mode[/prompt]", choices=SAVE_MODE_NAMES, default="fast")
+    return options
+
+# --- HEADLESS API ---
+@dataclass
+class DocumentOptions:
+    pdf_engine: str = "xelatex"     # LaTeX engine Pandoc uses for PDF output
+    pdf_inputs: list = field(default_factory=list)  # Merge/interleave: the PDFs that go with the input
+    split: str = "bookmarks"        # Split: 'bookmarks', 'every:N' or page ranges like '1-3,4-'
+    save_mode: str = "fast"         # 'fast', 'compact' (garbage=4 + deflate) or 'incremental'
+    reverse_others: bool = False    # Interleave: read the other PDFs back to front (duplex scans)
+    workers: int = None             # Split: parallel writer processes (default: one per CPU)
+
+
+def extract_with_pymupdf(input_path, output_format, output_path):
+    """Text or page-image extraction for fixed-layout inputs (PDF, XPS, ...)."""
+    with fitz.open(input_path) as doc:
         if output_format == "txt_extract":
-            output_path = f"{base_name}_extracted.txt"
             with open(output_path, "w", encoding="utf-8") as txt_file:
                 for page in doc:
                     txt_file.write(f"--- Page {page.number + 1} ---\n")
                     txt_file.write(page.get_text())
                     txt_file.write("\n\n")
-                    progress.update(task, advance=1, description=f"Extracting text from page {page.number + 1}")
-            return output_path
-            
         elif output_format == "png_pages":
-            output_dir = f"{base_name}_pages_as_images"
-            if not os.path.exists(output_dir): os.makedirs(output_dir)
+            os.makedirs(output_path, exist_ok=True)
             for page in doc:
                 pix = page.get_pixmap()
-                pix.save(os.path.join(output_dir, f"page_{page.number + 1}.png"))
-                progress.update(task, advance=1, description=f"Saving page {page.number + 1} as PNG")
-            return output_dir
-    return None
+                pix.save(os.path.join(output_path, f"page_{page.number + 1}.png"))
+        return {"pages": len(doc)}
 
-def convert_with_pandoc(input_path, output_format):
+
+def convert_with_pandoc(input_path, output_format, output_path, pdf_engine="xelatex"):
     if not PANDOC_INSTALLED:
-        console.print(Panel("[danger]Cannot convert: Pandoc is not installed on this system.[/]",
-                      title="[bold red]Critical Error[/]", border_style="red"))
-        return None
-        
-    base_name = os.path.splitext(input_path)[0]
-    output_path = f"{base_name}_converted.{output_format}"
-    extra_args = ['--pdf-engine=xelatex'] if output_format == 'pdf' else []
+        raise ConversionError("Cannot convert: Pandoc is not installed on this system.")
+    extra_args = [f'--pdf-engine={pdf_engine}'] if output_format == 'pdf' else []
+    try:
+        pypandoc.convert_file(input_path, output_format, outputfile=output_path, extra_args=extra_args)
+    except Exception as e:
+        raise ConversionError("Pandoc conversion failed.", str(e)) from e
+
+
+def assemble_pdf(job):
+    """Merge, split or interleave through pdf_assembly; returns its summary as metadata."""
+    options = job.options
+    inputs = [job.input_path] + list(options.pdf_inputs)
+    if job.output_format == "pdf_merge":
+        return merge_pdfs(inputs, job.output_path, options.save_mode)
+    if job.output_format == "pdf_split":
+        return split_pdf(job.input_path, job.output_path, options.split, options.save_mode, options.workers)
+    reverse = range(1, len(inputs)) if options.reverse_others else ()
+    return interleave_pdfs(inputs, job.output_path, reverse, options.save_mode)
+
+
+class DocumentConverter(Converter):
+    category = "Document"
+    formats = {details['id']: details for table in (SUPPORTED_FORMATS, PYMUPDF_OPTIONS) for details in table.values()}
+    options_class = DocumentOptions
+
+    def default_output_path(self, input_path, output_format, options):
+        base_name = os.path.splitext(input_path)[0]
+        if output_format == "txt_extract":
+            return f"{base_name}_extracted.txt"
+        if output_format == "png_pages":
+            return f"{base_name}_pages_as_images"
+        if output_format == "pdf_split":
+            return f"{base_name}_split"
+        if output_format == "pdf_merge":
+            return f"{base_name}_merged.pdf"
+        if output_format == "pdf_interleave":
+            return f"{base_name}_interleaved.pdf"
+        return f"{base_name}_converted.{output_format}"
+
+    def prepare(self, job):
+        job = super().prepare(job)
+        is_special_input = os.path.splitext(job.input_path)[1].lower() in PYMUPDF_INPUT_FORMATS
+        is_special_output = job.output_format in {d['id'] for d in PYMUPDF_OPTIONS.values()}
+        if is_special_input != is_special_output:
+            allowed = PYMUPDF_OPTIONS if is_special_input else SUPPORTED_FORMATS
+            raise ConversionError(f"'{job.output_format}' is not available for this input. "
+                                  f"Choose from: {', '.join(d['id'] for d in allowed.values())}")
+        if job.output_format in PDF_ASSEMBLY_FORMATS:
+            if os.path.splitext(job.input_path)[1].lower() != ".pdf":
+                raise ConversionError(f"'{job.output_format}' needs a PDF input.")
+            if job.options.save_mode not in SAVE_MODE_NAMES:
+                raise ConversionError(f"Unknown save mode '{job.options.save_mode}'. "
+                                      f"Choose from: {', '.join(SAVE_MODE_NAMES)}")
+            if job.output_format != "pdf_split" and not job.options.pdf_inputs:
+                raise ConversionError(f"'{job.output_format}' needs at least one more PDF in 'pdf_inputs'.")
+            missing = [path for path in job.options.pdf_inputs if not os.path.isfile(path)]
+            if missing:
+                raise ConversionError(f"File not found: {missing[0]}")
+        return job
+
+    def execute(self, job):
+        if job.output_format in PDF_ASSEMBLY_FORMATS:
+            return job.output_path, "", assemble_pdf(job)
+        if job.output_format in {d['id'] for d in PYMUPDF_OPTIONS.values()}:
+            metadata = extract_with_pymupdf(job.input_path, job.output_format, job.output_path)
+            return job.output_path, "", metadata
+        convert_with_pandoc(job.input_path, job.output_format, job.output_path, job.options.pdf_engine)
+        return job.output_path, "", {}
+
+
+CONVERTER = DocumentConverter()
 
-    # RICH: Use a spinner for the conversion process
-    with console.status("[bold green]Pandoc is converting your document...", spinner="dots"):
-        try:
-            pypandoc.convert_file(
-                input_path,
-                output_format,
-                outputfile=output_path,
-                extra_args=extra_args
-            )
-            return output_path
-        except Exception as e:
-            console.print(Panel(f"[danger]Pandoc conversion failed.[/]\n[bold]Details:[/bold]\n[dim]{e}[/dim]",
-                          title="[bold red]Error[/]", border_style="red"))
-            return None
 
 def main(input_file_path=None):
     """The main execution function for the document converter."""
@@ -165,22 +246,28 @@ def main(input_file_path=None):
                       title="[bold cyan]Heads Up![/]", border_style="cyan"))
 
     output_format_id = get_output_format(is_special_input=is_special_format)
-    
+    options = get_assembly_options(output_format_id) if output_format_id in PDF_ASSEMBLY_FORMATS else None
+
     console.print(Panel(
         f"[info]Input File:[/info] [path]{os.path.basename(input_file_path)}[/]\n"
         f"[info]Chosen Action:[/info] [format]{output_format_id.replace('_', ' ').title()}[/]",
         title="[bold yellow]Conversion Summary[/]", border_style="yellow"
     ))
     
-    result_path = None
-    if is_special_format:
-        result_path = convert_with_pymupdf(input_file_path, output_format_id)
-    else:
-        result_path = convert_with_pandoc(input_file_path, output_format_id)
+    result = None
+    engine = "PyMuPDF is extracting your document..." if is_special_format else "Pandoc is converting your document..."
+    # RICH: Use a spinner for the conversion process
+    with console.status(f"[bold green]{engine}", spinner="dots"):
+        try:
+            result = CONVERTER.convert(ConversionJob(input_file_path, output_format_id, options))
+        except ConversionError as e:
+            console.print(Panel(f"[danger]{e}[/]\n[bold]Details:[/bold]\n[dim]{e.stderr}[/dim]",
+                          title="[bold red]Error[/]", border_style="red"))
 
-    if result_path:
+    if result:
         console.print(Panel(
-            f"🎉 [success]Success! Conversion complete.[/] 🎉\n[info]Output saved at:[/info] [path]{result_path}[/]",
+            f"🎉 [success]Success! Conversion complete.[/] 🎉\n[info]Output saved at:[/info] [path]{result.output_path}[/]\n"
+            f"[info]Size:[/info] {result.bytes_written / 1024:.1f} KB  [info]Time:[/info] {result.elapsed:.2f}s",
             title="[bold green]Complete[/]", border_style="green"
         ))
     else:
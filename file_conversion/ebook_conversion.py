@@ -1,8 +1,13 @@
 import os
 import sys
+import time
 import shutil
+import argparse
 import subprocess
 
+from conversion_api import Converter, ConversionJob, ConversionError
+from epub_reader import EpubError, can_convert_natively, convert_epub_natively
+
 # RICH: Import necessary components
 from rich.console import Console
 from rich.theme import Theme
@@ -33,6 +38,7 @@ SUPPORTED_FORMATS = {
     "LRF": {"id": "lrf", "for": "[yellow]Legacy Sony[/]", "desc": "Older, proprietary format for Sony Reader devices."},
     "PDB": {"id": "pdb", "for": "[yellow]Legacy Palm[/]", "desc": "Format used by Palm Pilot and some older e-reader apps."},
     "TXT": {"id": "txt", "for": "[white]Universal Text[/]", "desc": "Extracts plain text content. Removes all formatting and images."},
+    "HTML": {"id": "html", "for": "[white]Web Browsers[/]", "desc": "Single self-contained web page with images embedded. [dim](EPUB input only)[/]", "native_only": True},
 }
 
 def get_calibre_path():
@@ -47,6 +53,7 @@ def get_calibre_path():
     return shutil.which("ebook-convert")
 
 CALIBRE_PATH = get_calibre_path()
+CALIBRE_FORMATS = {details['id'] for details in SUPPORTED_FORMATS.values() if not details.get('native_only')}
 
 def display_intro():
     console.print(Panel(
@@ -55,12 +62,11 @@ def display_intro():
     ))
     if not CALIBRE_PATH:
         console.print(Panel(
-            "[danger]CRITICAL: Calibre's 'ebook-convert' tool was not found.[/]\n"
-            "This script is a wrapper for Calibre and cannot function without it.\n"
+            "[warning]Calibre's 'ebook-convert' tool was not found.[/]\n"
+            "Only the built-in EPUB → TXT/HTML conversions are available.\n"
             "Please install it from [bold blue underline]https://calibre-ebook.com/download[/]",
             title="[bold red]Dependency Missing[/]", border_style="red"
         ))
-        sys.exit(1)
 
 def get_input_file():
     while True:
@@ -69,17 +75,21 @@ def get_input_file():
             return input_path
         console.print("❌ [danger]ERROR: File not found or is not a valid file.[/]")
 
-def get_output_format():
+def get_output_format(input_file_path):
     """RICH: Displays e-book format options in a detailed table."""
     table = Table(title="[bold green]✅ Select an Output E-book Format[/]", border_style="cyan", show_lines=True)
     table.add_column("Num", style="bold yellow", justify="center")
     table.add_column("Format", style="bold blue")
     table.add_column("Best For", style="white")
     table.add_column("Description", style="dim cyan")
+    table.add_column("Engine", justify="center")
     
-    format_list = list(SUPPORTED_FORMATS.items())
+    is_epub = input_file_path.lower().endswith(".epub")
+    format_list = [(name, details) for name, details in SUPPORTED_FORMATS.items()
+                   if is_epub or not details.get('native_only')]
     for i, (name, details) in enumerate(format_list, 1):
-        table.add_row(str(i), name, details['for'], details['desc'])
+        engine = "[green]Built-in[/]" if can_convert_natively(input_file_path, details['id']) else "Calibre"
+        table.add_row(str(i), name, details['for'], details['desc'], engine)
         
     console.print(table)
     
@@ -89,48 +99,90 @@ def get_output_format():
     )
     return format_list[choice - 1][1]['id']
 
+# --- HEADLESS API ---
+class EbookConverter(Converter):
+    category = "E-book"
+    formats = {details['id']: details for details in SUPPORTED_FORMATS.values()}
+
+    def prepare(self, job):
+        job = super().prepare(job)
+        if self.formats[job.output_format].get('native_only') and not can_convert_natively(job.input_path, job.output_format):
+            raise ConversionError(f"'{job.output_format}' output is only available for EPUB input.")
+        return job
+
+    def calibre_command(self, job):
+        if not CALIBRE_PATH:
+            raise ConversionError("This conversion requires Calibre's 'ebook-convert', which is not installed.")
+        return [CALIBRE_PATH, job.input_path, job.output_path]
+
+    def build_command(self, job):
+        # Cheap EPUB targets are handled in-process by the built-in reader
+        if can_convert_natively(job.input_path, job.output_format):
+            return None
+        return self.calibre_command(job)
+
+    def execute(self, job):
+        if can_convert_natively(job.input_path, job.output_format):
+            try:
+                convert_epub_natively(job.input_path, job.output_path, job.output_format)
+                return job.output_path, "", {"engine": "native"}
+            except EpubError as e:
+                # Anything the lightweight reader can't handle is handed over to Calibre
+                if not CALIBRE_PATH or job.output_format not in CALIBRE_FORMATS:
+                    raise ConversionError(f"The built-in EPUB reader failed: {e}") from e
+        process = subprocess.run(self.calibre_command(job), capture_output=True)
+        return self.finish_command(job, process.returncode,
+                                   process.stdout.decode('utf-8', errors='replace'),
+                                   process.stderr.decode('utf-8', errors='replace'))
+
+    def finish_command(self, job, returncode, stdout, stderr):
+        if returncode != 0:
+            # Check for common DRM error message from Calibre
+            error_output = stdout + stderr
+            if "DRM" in error_output:
+                raise ConversionError("This book has DRM (Digital Rights Management). Calibre cannot convert DRM-protected e-books.", error_output)
+            raise ConversionError("Calibre failed to convert the file.", error_output)
+        return job.output_path, stderr, {"engine": "calibre"}
+
+
+CONVERTER = EbookConverter()
+
+
 def convert_ebook(input_file_path, output_format):
-    base_name = os.path.splitext(input_file_path)[0]
-    output_file_path = f"{base_name}_converted.{output_format}"
+    use_native = can_convert_natively(input_file_path, output_format)
     
     console.print(Panel(
         f"[info]Input File:[/info] [path]{os.path.basename(input_file_path)}[/]\n"
-        f"[info]Output Format:[/info] [format]{output_format.upper()}[/]",
+        f"[info]Output Format:[/info] [format]{output_format.upper()}[/]\n"
+        f"[info]Engine:[/info] [format]{'Built-in EPUB reader' if use_native else 'Calibre'}[/]",
         title="[bold yellow]Conversion Summary[/]", border_style="yellow"
     ))
 
-    command = [CALIBRE_PATH, input_file_path, output_file_path]
-    
     # RICH: Use console.status for feedback during the external process
-    with console.status("[bold green]Calibre is processing your e-book...[/]", spinner="dots") as status:
+    spinner_text = "Reading your e-book..." if use_native else "Calibre is processing your e-book..."
+    with console.status(f"[bold green]{spinner_text}[/]", spinner="dots") as status:
         try:
-            # Run the command, capturing output
-            result = subprocess.run(command, capture_output=True, text=True, check=True, encoding='utf-8')
-            
+            result = CONVERTER.convert(ConversionJob(input_file_path, output_format))
             console.print(Panel(
-                f"🎉 [success]Success! E-book conversion complete.[/] 🎉\n[info]New file saved at:[/info] [path]{output_file_path}[/]",
+                f"🎉 [success]Success! E-book conversion complete.[/] 🎉\n[info]New file saved at:[/info] [path]{result.output_path}[/]\n"
+                f"[info]Engine:[/info] {result.metadata.get('engine')}  [info]Time:[/info] {result.elapsed:.2f}s",
                 title="[bold green]Complete[/]", border_style="green"
             ))
+            return result
 
-        except FileNotFoundError:
-            console.print(Panel("[danger]CRITICAL ERROR: Could not find the Calibre executable.[/]\n",
-                          title="[bold red]Error[/]", border_style="red"))
-        except subprocess.CalledProcessError as e:
-            # Check for common DRM error message from Calibre
-            error_output = e.stdout + e.stderr
-            if "DRM" in error_output:
-                drm_message = "[bold]This book has DRM (Digital Rights Management).[/]\nCalibre cannot convert DRM-protected e-books."
+        except ConversionError as e:
+            if isinstance(e.__cause__, FileNotFoundError):
+                message = "[danger]CRITICAL ERROR: Could not find the Calibre executable.[/]\n"
+            elif "DRM" in str(e):
+                message = "[danger]Calibre failed to convert the file.[/]\n[bold]This book has DRM (Digital Rights Management).[/]\nCalibre cannot convert DRM-protected e-books."
+            elif e.stderr:
+                message = "[danger]Calibre failed to convert the file.[/]\n[warning]The file may be corrupted, password-protected, or unsupported.[/]"
             else:
-                drm_message = "[warning]The file may be corrupted, password-protected, or unsupported.[/]"
-
-            console.print(Panel(
-                f"[danger]Calibre failed to convert the file.[/]\n{drm_message}\n\n"
-                f"[bold]Error Details from Calibre:[/]\n[dim]{error_output}[/dim]",
-                title="[bold red]Conversion Failed[/]", border_style="red"
-            ))
-        except Exception as e:
-            console.print(Panel(f"[danger]AN UNEXPECTED ERROR OCCURRED: {e}[/]",
-                          title="[bold red]Error[/]", border_style="red"))
+                message = f"[danger]{e}[/]"
+            if e.stderr:
+                message += f"\n\n[bold]Error Details from Calibre:[/]\n[dim]{e.stderr}[/dim]"
+            console.print(Panel(message, title="[bold red]Conversion Failed[/]", border_style="red"))
+    return None
 
 def main(input_file_path=None):
     """The main execution function for the e-book converter."""
@@ -142,8 +194,53 @@ def main(input_file_path=None):
         console.print(Panel(f"File provided: [path]{input_file_path}[/]",
             title="[bold green]Starting E-book Converter[/]", border_style="green"))
             
-    output_format_id = get_output_format()
+    output_format_id = get_output_format(input_file_path)
     convert_ebook(input_file_path, output_format_id)
 
+
+# --- BENCHMARK: Built-in reader vs Calibre ---
+def benchmark_native_path(input_file_path, runs=3):
+    """Times the built-in EPUB reader against Calibre for every natively supported target."""
+    import tempfile
+    from epub_reader import NATIVE_WRITERS
+
+    table = Table(title=f"[bold green]⏱️  EPUB Fast Path Benchmark ({runs} runs)[/]", border_style="cyan")
+    table.add_column("Target", style="bold blue")
+    table.add_column("Built-in (ms)", justify="right", style="green")
+    table.add_column("Calibre (ms)", justify="right", style="magenta")
+    table.add_column("Speed-up", justify="right", style="bold yellow")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for output_format in NATIVE_WRITERS:
+            output_path = os.path.join(temp_dir, f"bench.{output_format}")
+            native_times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                convert_epub_natively(input_file_path, output_path, output_format)
+                native_times.append(time.perf_counter() - start)
+            native_ms = min(native_times) * 1000
+
+            calibre_cell, speedup_cell = "[dim]n/a[/]", "[dim]n/a[/]"
+            if CALIBRE_PATH and output_format in CALIBRE_FORMATS:
+                calibre_times = []
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    subprocess.run([CALIBRE_PATH, input_file_path, output_path], capture_output=True, check=True)
+                    calibre_times.append(time.perf_counter() - start)
+                calibre_ms = min(calibre_times) * 1000
+                calibre_cell = f"{calibre_ms:.1f}"
+                speedup_cell = f"{calibre_ms / native_ms:.0f}x"
+            table.add_row(output_format.upper(), f"{native_ms:.1f}", calibre_cell, speedup_cell)
+
+    console.print(table)
+
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Convert e-books with Calibre or the built-in EPUB reader.")
+    parser.add_argument("--bench", metavar="EPUB", help="Benchmark the built-in EPUB reader against Calibre.")
+    parser.add_argument("--runs", type=int, default=3, help="Benchmark repetitions (best run is reported).")
+    args = parser.parse_args()
+    if args.bench:
+        benchmark_native_path(args.bench, args.runs)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,251 @@
+import os
+import re
+import io
+import base64
+import codecs
+import zipfile
+import posixpath
+import mimetypes
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import unquote
+from xml.etree import ElementTree
+
+# --- Native EPUB reader ---
+# An EPUB is just a zip of XHTML files plus an OPF "package" that lists the reading
+# order (the spine). For cheap targets like TXT and HTML we can read the spine
+# straight out of the zip instead of paying Calibre's multi-second startup cost.
+
+CONTAINER_PATH = "META-INF/container.xml"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+NS = {
+    "container": "urn:oasis:names:tc:opendocument:xmlns:container",
+    "opf": "http://www.idpf.org/2007/opf",
+    "dc": "http://purl.org/dc/elements/1.1/",
+}
+
+# Tags whose text content should never reach the output
+SKIPPED_TAGS = {"head", "script", "style", "title", "svg"}
+# Tags that start a new line in plain-text output
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "br", "li", "tr", "blockquote", "pre",
+    "h1", "h2", "h3", "h4", "h5", "h6", "hr", "dt", "dd", "figcaption",
+}
+
+BODY_PATTERN = re.compile(r"<body[^>]*>(.*)</body>", re.IGNORECASE | re.DOTALL)
+SRC_PATTERN = re.compile(r"""(<img\b[^>]*?\bsrc=)(["'])(.*?)\2""", re.IGNORECASE | re.DOTALL)
+XML_ENCODING_PATTERN = re.compile(rb"""^<\?xml[^>]*?\bencoding=["']([A-Za-z0-9._-]+)["']""")
+
+
+class EpubError(Exception):
+    """Raised when a file is not a readable (DRM-free) EPUB."""
+
+
+def _sniff_encoding(head):
+    """Encoding of an XHTML document from its BOM or XML declaration (UTF-8 if neither)."""
+    for bom, encoding in ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16")):
+        if head.startswith(bom):
+            return encoding
+    match = XML_ENCODING_PATTERN.match(head)
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+class _TextExtractor(HTMLParser):
+    """Streams readable text out of XHTML, writing it as soon as it is parsed."""
+    def __init__(self, out):
+        super().__init__(convert_charrefs=True)
+        self.out = out
+        self.skip_depth = 0
+        self.at_line_start = True
+
+    def _newline(self):
+        if not self.at_line_start:
+            self.out.write("\n")
+            self.at_line_start = True
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._newline()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._newline()
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._newline()
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        text = " ".join(data.split())
+        if not text:
+            return
+        if not self.at_line_start and data[:1].isspace():
+            self.out.write(" ")
+        self.out.write(text)
+        self.at_line_start = False
+        if data[-1:].isspace():
+            self.out.write(" ")
+
+
+class EpubReader:
+    """Reads the package metadata of an EPUB and streams its spine items from the zip."""
+    def __init__(self, path):
+        self.path = path
+        try:
+            self.zip = zipfile.ZipFile(path)
+        except zipfile.BadZipFile as e:
+            raise EpubError(f"Not a valid EPUB archive: {e}") from e
+
+        try:
+            names = set(self.zip.namelist())
+            if "META-INF/encryption.xml" in names and self._is_drm_protected():
+                raise EpubError("This book has DRM (Digital Rights Management).")
+
+            self.opf_path = self._find_opf_path()
+            self.opf_dir = posixpath.dirname(self.opf_path)
+            self.title, self.manifest, self.spine = self._parse_package()
+        except Exception as e:
+            self.zip.close()
+            if isinstance(e, EpubError):
+                raise
+            raise EpubError(f"Unreadable EPUB structure: {e}") from e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.zip.close()
+
+    def _is_drm_protected(self):
+        """Font obfuscation also uses encryption.xml, so only flag non-font resources."""
+        root = ElementTree.fromstring(self.zip.read("META-INF/encryption.xml"))
+        for ref in root.iter("{http://www.w3.org/2001/04/xmlenc#}CipherReference"):
+            uri = ref.get("URI", "").lower()
+            if not uri.endswith((".ttf", ".otf", ".woff", ".woff2")):
+                return True
+        return False
+
+    def _find_opf_path(self):
+        try:
+            root = ElementTree.fromstring(self.zip.read(CONTAINER_PATH))
+        except KeyError as e:
+            raise EpubError("Missing META-INF/container.xml.") from e
+        except ElementTree.ParseError as e:
+            raise EpubError(f"Malformed META-INF/container.xml: {e}") from e
+        rootfile = root.find(".//container:rootfile", NS)
+        if rootfile is None or not rootfile.get("full-path"):
+            raise EpubError("container.xml does not point to an OPF package.")
+        return rootfile.get("full-path")
+
+    def _parse_package(self):
+        try:
+            root = ElementTree.fromstring(self.zip.read(self.opf_path))
+        except KeyError as e:
+            raise EpubError(f"The OPF package '{self.opf_path}' is missing.") from e
+        except ElementTree.ParseError as e:
+            raise EpubError(f"Malformed OPF package '{self.opf_path}': {e}") from e
+        title_el = root.find(".//dc:title", NS)
+        title = title_el.text.strip() if title_el is not None and title_el.text else os.path.basename(self.path)
+
+        manifest = {}
+        for item in root.iterfind(".//opf:manifest/opf:item", NS):
+            href = posixpath.normpath(posixpath.join(self.opf_dir, unquote(item.get("href", ""))))
+            manifest[item.get("id")] = {"href": href, "media_type": item.get("media-type", "")}
+
+        spine = []
+        for itemref in root.iterfind(".//opf:spine/opf:itemref", NS):
+            item = manifest.get(itemref.get("idref"))
+            if item and "html" in item["media_type"]:
+                spine.append(item["href"])
+        if not spine:
+            raise EpubError("The EPUB spine is empty.")
+        return title, manifest, spine
+
+    def iter_spine(self):
+        """Yields (href, binary file object) for each spine item, in reading order."""
+        for href in self.spine:
+            try:
+                f = self.zip.open(href)
+            except KeyError as e:
+                raise EpubError(f"Spine item '{href}' is missing from the archive.") from e
+            with f:
+                yield href, f
+
+    @staticmethod
+    def _peek_encoding(f):
+        """Encoding declared by a spine item (f must be a buffered zip entry; nothing is consumed)."""
+        return _sniff_encoding(f.peek(256)[:256])
+
+    def write_text(self, out):
+        """Streams the plain text of every spine item into the text file object 'out'."""
+        for _, f in self.iter_spine():
+            parser = _TextExtractor(out)
+            decoder = codecs.getincrementaldecoder(self._peek_encoding(f))(errors="replace")
+            while True:
+                chunk = f.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                parser.feed(decoder.decode(chunk))
+            parser.feed(decoder.decode(b"", final=True))
+            parser.close()
+            out.write("\n\n")
+
+    def _inline_image(self, chapter_href, src):
+        """Returns a data: URI for an image referenced by a chapter, or the original src."""
+        if src.startswith(("data:", "http:", "https:")):
+            return src
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(chapter_href), unquote(src)))
+        try:
+            data = self.zip.read(target)
+        except KeyError:
+            return src
+        mime = mimetypes.guess_type(target)[0] or "application/octet-stream"
+        return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+    def write_html(self, out):
+        """Writes a single self-contained HTML document built from the spine items."""
+        out.write("<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n")
+        out.write(f"<title>{escape(self.title)}</title>\n</head>\n<body>\n")
+        for index, (href, f) in enumerate(self.iter_spine(), 1):
+            document = io.TextIOWrapper(f, encoding=self._peek_encoding(f), errors="replace").read()
+            match = BODY_PATTERN.search(document)
+            body = match.group(1) if match else document
+            body = SRC_PATTERN.sub(
+                lambda m: f"{m.group(1)}{m.group(2)}{self._inline_image(href, m.group(3))}{m.group(2)}", body
+            )
+            out.write(f"<section id=\"chapter-{index}\">\n{body}\n</section>\n")
+        out.write("</body>\n</html>\n")
+
+
+# --- Formats the native reader can produce without Calibre ---
+NATIVE_WRITERS = {
+    "txt": EpubReader.write_text,
+    "html": EpubReader.write_html,
+}
+
+
+def can_convert_natively(input_file_path, output_format):
+    return input_file_path.lower().endswith(".epub") and output_format in NATIVE_WRITERS
+
+
+def convert_epub_natively(input_file_path, output_file_path, output_format):
+    """Converts an EPUB to TXT or HTML without Calibre. Raises EpubError on unreadable books."""
+    writer = NATIVE_WRITERS[output_format]
+    with EpubReader(input_file_path) as reader, open(output_file_path, "w", encoding="utf-8") as out:
+        writer(reader, out)
+    return output_file_path
@@ -1,5 +1,8 @@
 import os
 import sys
+import time
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # RICH: Import necessary components BEFORE checking for the FontForge import
 from rich.console import Console
@@ -9,6 +12,8 @@ from rich.prompt import Prompt, IntPrompt
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 
+from conversion_api import Converter, ConversionJob, ConversionError
+
 # RICH: Define theme and console
 custom_theme = Theme({
     "info": "dim cyan", "warning": "magenta", "danger": "bold red",
@@ -32,6 +37,7 @@ SUPPORTED_FORMATS = {
     "OTF": {"ext": "otf", "gen": True, "type": "[green]Desktop & Print[/]", "desc": "OpenType Font. Often has more advanced features for design."},
     "WOFF2": {"ext": "woff2", "gen": True, "type": "[blue]Modern Web[/]", "desc": "Best compression for web fonts. The modern standard."},
     "WOFF": {"ext": "woff", "gen": True, "type": "[blue]Web[/]", "desc": "Web Open Font Format. Excellent for web use, widely supported."},
+    "WOFF2 SUBSETS": {"ext": "woff2", "gen": True, "subset": True, "type": "[blue]Modern Web[/]", "desc": "One small WOFF2 per unicode range (Latin, Cyrillic, ...) plus CSS & manifest. [dim](Uses fontTools)[/]"},
 
     # --- Font Development & Legacy Formats ---
     "UFO": {"ext": "ufo", "gen": True, "type": "[cyan]Development[/]", "desc": "Unified Font Object. XML-based source format for font design."},
@@ -43,11 +49,15 @@ SUPPORTED_FORMATS = {
     "AFM": {"ext": "afm", "gen": False, "type": "[white]Metrics Data[/]", "desc": "Adobe Font Metrics. Text file describing the font's measurements."},
 }
 
+FONT_EXTENSIONS = {".ttf", ".otf", ".woff", ".woff2", ".sfd", ".pfb", ".ufo", ".dfont"}
+
 def display_intro():
     console.print(Panel(
         "[bold green]🐍 Welcome to the Python Font Converter 🐍[/]\n[cyan]A precision tool for converting font files using the FontForge engine[/]",
         title="[bold yellow]Converter[/]", border_style="green", padding=(1, 2)
     ))
+
+def check_fontforge():
     if not FONTFORGE_AVAILABLE:
         console.print(Panel(
             "[danger]CRITICAL ERROR: The 'fontforge' Python module could not be found.[/]\n"
@@ -62,10 +72,10 @@ def display_intro():
 
 def get_input_file():
     while True:
-        input_path = Prompt.ask("\n[prompt]➡️  Enter the path to your font file[/prompt]").strip().replace("'", "").replace('"', '')
-        if os.path.exists(input_path) and os.path.isfile(input_path):
+        input_path = Prompt.ask("\n[prompt]➡️  Enter the path to your font file (or a folder to convert a whole family)[/prompt]").strip().replace("'", "").replace('"', '')
+        if os.path.exists(input_path):
             return input_path
-        console.print("❌ [danger]ERROR: File not found or is not a valid file.[/]")
+        console.print("❌ [danger]ERROR: File or folder not found.[/]")
 
 def get_output_format():
     """RICH: Displays font format options in a detailed table."""
@@ -88,11 +98,99 @@ def get_output_format():
     # Return the details dictionary for the chosen format
     return format_list[choice - 1][1]
 
+# --- BATCH: Whole font families in parallel ---
+def generate_font_file(input_file_path, output_file_path, is_generate_target):
+    """
+    Converts one font. Batch conversion runs this in worker processes: FontForge keeps
+    global state and is not thread safe, so each process gets its own FontForge instance.
+    """
+    start = time.perf_counter()
+    font = fontforge.open(input_file_path)
+    try:
+        if is_generate_target:
+            font.generate(output_file_path)
+        else:
+            font.save(output_file_path)
+    finally:
+        font.close()
+    return output_file_path, time.perf_counter() - start
+
+def list_font_files(input_dir):
+    return sorted(os.path.join(input_dir, name) for name in os.listdir(input_dir)
+                  if os.path.splitext(name)[1].lower() in FONT_EXTENSIONS)
+
+def convert_family_files(font_paths, output_dir, output_details, max_workers=None, on_done=None):
+    """Converts fonts in a process pool. Returns ([(output_path, seconds)], [(input_path, error)])."""
+    os.makedirs(output_dir, exist_ok=True)
+    output_ext = output_details['ext']
+    results, failures = [], []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for path in font_paths:
+            base_name = os.path.splitext(os.path.basename(path))[0]
+            output_path = os.path.join(output_dir, f"{base_name}_converted.{output_ext}")
+            futures[pool.submit(generate_font_file, path, output_path, output_details['gen'])] = path
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failures.append((futures[future], e))
+            if on_done:
+                on_done(futures[future])
+    return sorted(results), failures
+
+
+# --- HEADLESS API ---
+@dataclass
+class FontOptions:
+    ranges: list = None         # WOFF2 subsets only: presets or unicode-range specs
+    max_workers: int = None     # Folder input / subsetting: worker processes (None = CPU count)
+
+
+class FontConverter(Converter):
+    category = "Font"
+    formats = {("woff2-subset" if details.get('subset') else details['ext']): details
+               for details in SUPPORTED_FORMATS.values()}
+    options_class = FontOptions
+
+    def default_output_path(self, input_path, output_format, options):
+        base = input_path.rstrip(os.sep) if os.path.isdir(input_path) else os.path.splitext(input_path)[0]
+        if output_format == "woff2-subset":
+            return f"{base}_webfonts"
+        if os.path.isdir(input_path):
+            return f"{base}_converted"
+        return f"{base}_converted.{output_format}"
+
+    def execute(self, job):
+        details = self.formats[job.output_format]
+        if details.get('subset'):
+            from font_subsetting import FONTTOOLS_AVAILABLE, DEFAULT_RANGES, collect_font_files, subset_fonts
+            if not FONTTOOLS_AVAILABLE:
+                raise ConversionError("The 'fonttools' package is required for subsetting.")
+            manifest = subset_fonts(collect_font_files(job.input_path), job.options.ranges or DEFAULT_RANGES,
+                                    job.output_path, max_workers=job.options.max_workers)
+            return job.output_path, "", {"manifest": manifest}
+
+        if not FONTFORGE_AVAILABLE:
+            raise ConversionError("The 'fontforge' Python module could not be found.")
+        if os.path.isdir(job.input_path):
+            results, failures = convert_family_files(list_font_files(job.input_path), job.output_path,
+                                                     details, job.options.max_workers)
+            if failures and not results:
+                raise ConversionError(f"All {len(failures)} fonts failed to convert.", "\n".join(str(e) for _, e in failures))
+            return job.output_path, "\n".join(f"{p}: {e}" for p, e in failures), {
+                "converted": [path for path, _ in results], "failed": [path for path, _ in failures]}
+        generate_font_file(job.input_path, job.output_path, details['gen'])
+        return job.output_path, "", {}
+
+
+CONVERTER = FontConverter()
+
+
 def convert_font(input_file_path, output_details):
     output_ext = output_details['ext']
+    job = CONVERTER.prepare(ConversionJob(input_file_path, output_ext))
     is_generate_target = output_details['gen']
-    base_name = os.path.splitext(input_file_path)[0]
-    output_file_path = f"{base_name}_converted.{output_ext}"
     
     console.print(Panel(
         f"[info]Input File:[/info] [path]{os.path.basename(input_file_path)}[/]\n"
@@ -104,32 +202,63 @@ def convert_font(input_file_path, output_details):
         # RICH: Use a progress bar for responsive feedback
         with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(), transient=True) as progress:
             task = progress.add_task("[green]Converting...", total=100)
-            
-            progress.update(task, description="Opening font file with FontForge...", advance=25)
-            font = fontforge.open(input_file_path)
-            
             action_verb = "Generating" if is_generate_target else "Saving"
-            progress.update(task, description=f"{action_verb} new font file...", advance=50)
-            
-            if is_generate_target:
-                font.generate(output_file_path)
-            else:
-                font.save(output_file_path)
-                
+            progress.update(task, description=f"{action_verb} new font file with FontForge...", advance=25)
+            result = CONVERTER.convert(job)
             progress.update(task, description="Done!", completed=100)
             
         console.print(Panel(
-            f"🎉 [success]Success! Font conversion complete.[/] 🎉\n[info]New file saved at:[/info] [path]{output_file_path}[/]",
+            f"🎉 [success]Success! Font conversion complete.[/] 🎉\n[info]New file saved at:[/info] [path]{result.output_path}[/]",
             title="[bold green]Complete[/]", border_style="green"
         ))
+        return result
         
-    except Exception as e:
+    except ConversionError as e:
         console.print(Panel(
             f"[danger]FontForge failed to convert the file.[/]\n"
             f"[warning]The input font may be corrupted, password-protected, or unsupported.[/]\n\n"
             f"[bold]Error Details from FontForge:[/]\n[dim]{e}[/dim]",
             title="[bold red]Conversion Failed[/]", border_style="red"
         ))
+        return None
+
+def convert_font_family(input_dir, output_details, max_workers=None):
+    """RICH: Converts every font file in 'input_dir' using a pool of worker processes."""
+    font_paths = list_font_files(input_dir)
+    if not font_paths:
+        console.print(f"❌ [danger]ERROR: No font files found in '[path]{input_dir}[/]'.[/]")
+        return
+
+    output_ext = output_details['ext']
+    output_dir = CONVERTER.default_output_path(input_dir, output_ext, None)
+    console.print(Panel(
+        f"[info]Input Folder:[/info] [path]{input_dir}[/] ({len(font_paths)} fonts)\n"
+        f"[info]Output Format:[/info] [format]{output_ext.upper()}[/]\n"
+        f"[info]Output Folder:[/info] [path]{output_dir}[/]",
+        title="[bold yellow]Batch Conversion Summary[/]", border_style="yellow"
+    ))
+
+    start = time.perf_counter()
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(), transient=True) as progress:
+        task = progress.add_task("[green]Converting family...", total=len(font_paths))
+        results, failures = convert_family_files(
+            font_paths, output_dir, output_details, max_workers,
+            on_done=lambda path: progress.update(task, advance=1, description=f"Converted {os.path.basename(path)}"),
+        )
+    elapsed = time.perf_counter() - start
+
+    table = Table(title="[bold green]✅ Family Conversion Results[/]", border_style="cyan")
+    table.add_column("Output File", style="path")
+    table.add_column("Time (s)", justify="right", style="dim")
+    for output_path, seconds in results:
+        table.add_row(os.path.basename(output_path), f"{seconds:.2f}")
+    for path, error in failures:
+        table.add_row(f"[danger]{os.path.basename(path)}[/]", f"[danger]{error}[/]")
+    console.print(table)
+    console.print(Panel(
+        f"🎉 [success]{len(results)}/{len(font_paths)} fonts converted in {elapsed:.2f}s.[/] 🎉",
+        title="[bold green]Complete[/]", border_style="green"
+    ))
 
 
 def main(input_file_path=None):
@@ -143,7 +272,17 @@ def main(input_file_path=None):
             title="[bold green]Starting Font Converter[/]", border_style="green"))
 
     output_format_details = get_output_format()
-    convert_font(input_file_path, output_format_details)
+    if output_format_details.get('subset'):
+        # Subsetting is done with fontTools, so FontForge is not needed for this route
+        from font_subsetting import run_subset_job
+        run_subset_job(input_file_path)
+        return
+
+    check_fontforge()
+    if os.path.isdir(input_file_path):
+        convert_font_family(input_file_path, output_format_details)
+    else:
+        convert_font(input_file_path, output_format_details)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,334 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# RICH: Import necessary components
+from rich.console import Console
+from rich.theme import Theme
+from rich.panel import Panel
+from rich.prompt import Prompt
+from rich.table import Table
+
+# RICH: Define theme and console
+custom_theme = Theme({
+    "info": "dim cyan", "warning": "magenta", "danger": "bold red",
+    "success": "bold green", "prompt": "bold yellow", "path": "bold cyan",
+    "format": "bold blue",
+})
+console = Console(theme=custom_theme)
+
+# fontTools does the subsetting and WOFF2 encoding (WOFF2 also needs 'brotli')
+try:
+    from fontTools import subset as ft_subset
+    from fontTools.ttLib import TTFont
+    FONTTOOLS_AVAILABLE = True
+except ImportError:
+    FONTTOOLS_AVAILABLE = False
+
+
+# --- DATA: Unicode range presets (the same slices Google Fonts serves) ---
+UNICODE_RANGE_PRESETS = {
+    "latin": "U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, U+0308, "
+             "U+0329, U+2000-206F, U+2074, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD",
+    "latin-ext": "U+0100-02AF, U+0304, U+0308, U+0329, U+1E00-1E9F, U+1EF2-1EFF, U+2020, U+20A0-20AB, "
+                 "U+20AD-20C0, U+2113, U+2C60-2C7F, U+A720-A7FF",
+    "cyrillic": "U+0301, U+0400-045F, U+0490-0491, U+04B0-04B1, U+2116",
+    "cyrillic-ext": "U+0460-052F, U+1C80-1C88, U+20B4, U+2DE0-2DFF, U+A640-A69F, U+FE2E-FE2F",
+    "greek": "U+0370-0377, U+037A-037F, U+0384-038A, U+038C, U+038E-03A1, U+03A3-03FF",
+    "vietnamese": "U+0102-0103, U+0110-0111, U+0128-0129, U+0168-0169, U+01A0-01A1, U+01AF-01B0, "
+                  "U+0300-0301, U+0303-0304, U+0308-0309, U+0323, U+0329, U+1EA0-1EF9, U+20AB",
+}
+DEFAULT_RANGES = ["latin", "latin-ext"]
+FONT_EXTENSIONS = {".ttf", ".otf", ".woff", ".woff2"}
+MANIFEST_NAME = "manifest.json"
+
+
+def parse_unicode_range(spec):
+    """
+    Turns a range spec into a sorted list of codepoints. Accepts preset names
+    ('latin'), CSS unicode-range syntax ('U+0400-045F, U+2116', 'U+4??'), or a
+    literal character set prefixed with 'chars:' ('chars:0123456789').
+    """
+    spec = spec.strip()
+    if spec.lower() in UNICODE_RANGE_PRESETS:
+        spec = UNICODE_RANGE_PRESETS[spec.lower()]
+    elif spec.startswith("chars:"):
+        return sorted({ord(c) for c in spec[len("chars:"):]})
+
+    codepoints = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        if not part.upper().startswith("U+"):
+            raise ValueError(f"Invalid unicode-range entry: '{part}'")
+        body = part[2:]
+        if "?" in body:
+            start, end = int(body.replace("?", "0"), 16), int(body.replace("?", "F"), 16)
+        elif "-" in body:
+            start, end = (int(x, 16) for x in body.split("-", 1))
+        else:
+            start = end = int(body, 16)
+        if start > end:
+            raise ValueError(f"Invalid unicode-range entry: '{part}'")
+        codepoints.update(range(start, end + 1))
+    return sorted(codepoints)
+
+
+def format_unicode_range(codepoints):
+    """Compacts a list of codepoints back into a CSS unicode-range string."""
+    parts = []
+    codepoints = sorted(codepoints)
+    i = 0
+    while i < len(codepoints):
+        start = end = codepoints[i]
+        while i + 1 < len(codepoints) and codepoints[i + 1] == end + 1:
+            i += 1
+            end = codepoints[i]
+        parts.append(f"U+{start:04X}" if start == end else f"U+{start:04X}-{end:04X}")
+        i += 1
+    return ", ".join(parts)
+
+
+def font_face_descriptors(font, fallback_family):
+    """(family, weight, style) for @font-face, read from the name and OS/2 tables."""
+    name_table = font["name"] if "name" in font else None
+    family = None
+    if name_table is not None:
+        # 16 = typographic family ("Inter"), 1 = legacy family ("Inter Medium")
+        for name_id in (16, 1):
+            record = name_table.getDebugName(name_id)
+            if record:
+                family = record.strip()
+                break
+    weight, style = 400, "normal"
+    if "OS/2" in font:
+        os2 = font["OS/2"]
+        weight = os2.usWeightClass or 400
+        if os2.fsSelection & (1 << 9):      # OBLIQUE
+            style = "oblique"
+        elif os2.fsSelection & 1:           # ITALIC
+            style = "italic"
+    return family or fallback_family, weight, style
+
+
+def _family_from_filename(font_path):
+    return os.path.splitext(os.path.basename(font_path))[0].split("-")[0]
+
+
+def _subset_options():
+    options = ft_subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]   # Keep kerning, ligatures, etc. for the kept glyphs
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    options.drop_tables += ["DSIG"]   # The signature is invalid once glyphs are removed
+    return options
+
+
+def subset_font(font_path, range_name, codepoints, output_dir):
+    """
+    Writes one WOFF2 file containing only the glyphs for 'codepoints'.
+    Runs inside a worker process; returns a manifest entry (or None if the font has no glyphs in range).
+    """
+    start = time.perf_counter()
+    font = TTFont(font_path, lazy=False)
+    family, weight, style = font_face_descriptors(font, _family_from_filename(font_path))
+    available = set(font.getBestCmap() or {})
+    wanted = [cp for cp in codepoints if cp in available]
+    if not wanted:
+        font.close()
+        return None
+
+    subsetter = ft_subset.Subsetter(options=_subset_options())
+    subsetter.populate(unicodes=wanted)
+    subsetter.subset(font)
+
+    base_name = os.path.splitext(os.path.basename(font_path))[0]
+    output_path = os.path.join(output_dir, f"{base_name}.{range_name}.woff2")
+    font.flavor = "woff2"
+    font.save(output_path)
+    font.close()
+    return {
+        "font": os.path.basename(font_path), "range": range_name,
+        "family": family, "weight": weight, "style": style,
+        "file": os.path.basename(output_path), "bytes": os.path.getsize(output_path),
+        "codepoints": len(wanted), "unicode_range": format_unicode_range(wanted),
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def full_font_woff2(font_path, output_dir):
+    """Baseline for the report: the whole font re-encoded as WOFF2."""
+    start = time.perf_counter()
+    base_name = os.path.splitext(os.path.basename(font_path))[0]
+    output_path = os.path.join(output_dir, f"{base_name}.full.woff2")
+    font = TTFont(font_path)
+    font.flavor = "woff2"
+    font.save(output_path)
+    font.close()
+    return {
+        "font": os.path.basename(font_path), "file": os.path.basename(output_path),
+        "bytes": os.path.getsize(output_path), "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def build_css(entries, family_name):
+    """
+    @font-face rules so browsers only download the slices a page actually uses. Each rule
+    carries its font's weight and style, so e.g. Regular and Bold of one family don't collide.
+    """
+    rules = []
+    for entry in entries:
+        rules.append(
+            "@font-face {\n"
+            f"  font-family: '{entry.get('family', family_name)}';\n"
+            f"  font-weight: {entry.get('weight', 400)};\n"
+            f"  font-style: {entry.get('style', 'normal')};\n"
+            f"  src: url('{entry['file']}') format('woff2');\n"
+            "  font-display: swap;\n"
+            f"  unicode-range: {entry['unicode_range']};\n"
+            "}"
+        )
+    return "\n".join(rules) + "\n"
+
+
+def subset_fonts(font_paths, range_specs, output_dir, max_workers=None, include_full=True):
+    """
+    Subsets every font in 'font_paths' into one WOFF2 per range, in parallel worker
+    processes. Writes a manifest.json and fonts.css to 'output_dir' and returns the manifest.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    ranges = {}
+    for spec in range_specs:
+        name, _, value = spec.partition("=") if "=" in spec else (spec, "", spec)
+        name = name.strip().lower()
+        if "=" not in spec and name not in UNICODE_RANGE_PRESETS:
+            # An unnamed 'chars:...' or 'U+...' spec: name it so it makes a usable file name
+            base = "chars" if name.startswith("chars:") else "custom"
+            name, n = base, 1
+            while name in ranges:
+                n += 1
+                name = f"{base}{n}"
+        ranges[name] = parse_unicode_range(value)
+
+    start = time.perf_counter()
+    subsets, baselines = [], []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(subset_font, path, name, cps, output_dir)
+                   for path in font_paths for name, cps in ranges.items()]
+        if include_full:
+            baseline_futures = [pool.submit(full_font_woff2, path, output_dir) for path in font_paths]
+        else:
+            baseline_futures = []
+        for future in as_completed(futures):
+            entry = future.result()
+            if entry:
+                subsets.append(entry)
+        baselines = [future.result() for future in baseline_futures]
+
+    subsets.sort(key=lambda e: (e["font"], list(ranges).index(e["range"])))
+    family_name = subsets[0]["family"] if subsets else _family_from_filename(font_paths[0])
+    with open(os.path.join(output_dir, "fonts.css"), "w", encoding="utf-8") as f:
+        f.write(build_css(subsets, family_name))
+
+    manifest = {
+        "family": family_name,
+        "ranges": {name: format_unicode_range(cps) for name, cps in ranges.items()},
+        "subsets": subsets,
+        "full_fonts": baselines,
+        "wall_seconds": round(time.perf_counter() - start, 4),
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def display_report(manifest):
+    """RICH: Size and time comparison of the range subsets against the full WOFF2."""
+    table = Table(title="[bold green]📦 Subset Report[/]", border_style="cyan")
+    table.add_column("Font", style="bold blue")
+    table.add_column("Range", style="magenta")
+    table.add_column("Glyphs", justify="right")
+    table.add_column("Size (KB)", justify="right", style="green")
+    table.add_column("% of Full", justify="right", style="bold yellow")
+    table.add_column("Time (ms)", justify="right", style="dim")
+
+    full_by_font = {entry["font"]: entry for entry in manifest["full_fonts"]}
+    for entry in manifest["subsets"]:
+        full = full_by_font.get(entry["font"])
+        share = f"{entry['bytes'] / full['bytes'] * 100:.1f}%" if full else "[dim]n/a[/]"
+        table.add_row(entry["font"], entry["range"], str(entry["codepoints"]),
+                      f"{entry['bytes'] / 1024:.1f}", share, f"{entry['seconds'] * 1000:.0f}")
+    for full in manifest["full_fonts"]:
+        table.add_row(full["font"], "[bold]FULL[/]", "all", f"{full['bytes'] / 1024:.1f}",
+                      "100.0%", f"{full['seconds'] * 1000:.0f}")
+    console.print(table)
+    console.print(f"[info]Total wall time:[/info] {manifest['wall_seconds']:.2f}s")
+
+
+def collect_font_files(path):
+    """A single font file, or every font file in a directory (a whole family)."""
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path)
+                      if os.path.splitext(name)[1].lower() in FONT_EXTENSIONS)
+    return [path]
+
+
+def run_subset_job(input_path, range_specs=None, output_dir=None, max_workers=None):
+    """Interactive-friendly wrapper used by font_conversion.py and the CLI below."""
+    if not FONTTOOLS_AVAILABLE:
+        console.print(Panel("[danger]The 'fonttools' package is required for subsetting.[/]\n"
+                            "[info]Install it with:[/] pip install fonttools brotli",
+                            title="[bold red]Dependency Missing[/]", border_style="red"))
+        return None
+
+    font_paths = collect_font_files(input_path)
+    if not font_paths:
+        console.print(f"❌ [danger]ERROR: No font files found in '[path]{input_path}[/]'.[/]")
+        return None
+    range_specs = range_specs or DEFAULT_RANGES
+    if output_dir is None:
+        base = input_path.rstrip(os.sep) if os.path.isdir(input_path) else os.path.splitext(input_path)[0]
+        output_dir = f"{base}_webfonts"
+
+    console.print(Panel(
+        f"[info]Fonts:[/info] [path]{len(font_paths)}[/] file(s)\n"
+        f"[info]Ranges:[/info] [format]{', '.join(range_specs)}[/]\n"
+        f"[info]Output Folder:[/info] [path]{output_dir}[/]",
+        title="[bold yellow]Subset Summary[/]", border_style="yellow"
+    ))
+    try:
+        with console.status("[bold green]Subsetting fonts in parallel...[/]", spinner="dots"):
+            manifest = subset_fonts(font_paths, range_specs, output_dir, max_workers=max_workers)
+    except Exception as e:
+        console.print(Panel(f"[danger]Subsetting failed.[/]\n[dim]{e}[/dim]",
+                      title="[bold red]Conversion Failed[/]", border_style="red"))
+        return None
+
+    display_report(manifest)
+    console.print(Panel(
+        f"🎉 [success]Success! Web font subsets created.[/] 🎉\n[info]Manifest:[/info] [path]{os.path.join(output_dir, MANIFEST_NAME)}[/]",
+        title="[bold green]Complete[/]", border_style="green"
+    ))
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Split fonts into per-unicode-range WOFF2 files for the web.")
+    parser.add_argument("input", nargs="?", help="A font file or a directory containing a font family.")
+    parser.add_argument("-r", "--range", action="append", dest="ranges",
+                        help="Preset name, 'name=U+0000-00FF', or 'name=chars:abc'. Repeatable.")
+    parser.add_argument("-o", "--output", help="Output directory (default: <input>_webfonts).")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count).")
+    args = parser.parse_args()
+
+    input_path = args.input
+    if not input_path:
+        input_path = Prompt.ask("\n[prompt]➡️  Enter the path to a font file or font family folder[/prompt]").strip().replace("'", "").replace('"', '')
+    if not os.path.exists(input_path):
+        console.print("❌ [danger]ERROR: File not found.[/]")
+        sys.exit(1)
+    run_subset_job(input_path, args.ranges, args.output, args.jobs)
@@ -1,5 +1,6 @@
 import os
 import sys
+from dataclasses import dataclass
 import rawpy
 import numpy as np
 from PIL import Image
@@ -15,6 +16,9 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 from rich.live import Live
 from rich.text import Text
 
+from conversion_api import Converter, ConversionJob, ConversionError
+from profiling import stage
+
 # Enables Pillow to open HEIC/HEIF files (like iPhone photos)
 register_heif_opener()
 
@@ -109,20 +113,81 @@ def get_quality_options(output_format):
         )
     return options
 
+# --- HEADLESS API ---
+@dataclass
+class ImageOptions:
+    quality: int = None     # JPEG/WebP quality (1-100); None = Pillow's default
+    optimize: bool = False  # PNG: smaller file, longer save time
+
+    def save_kwargs(self):
+        kwargs = {}
+        if self.quality is not None:
+            kwargs['quality'] = self.quality
+        if self.optimize:
+            kwargs['optimize'] = True
+        return kwargs
+
+
+def open_image(input_file_path):
+    """Opens standard images with Pillow and RAW camera files with rawpy."""
+    file_ext = os.path.splitext(input_file_path)[1].lower()
+    if file_ext in RAW_EXTENSIONS:
+        with rawpy.imread(input_file_path) as raw:
+            return Image.fromarray(raw.postprocess())
+    return Image.open(input_file_path)
+
+
+def flatten_transparency(image, output_format):
+    """Composites transparent images onto white for formats without an alpha channel."""
+    alpha_format = next((v['alpha'] for k, v in SUPPORTED_FORMATS.items() if v['id'] == output_format), "No")
+    if image.mode not in ("RGBA", "LA", "P") or alpha_format != "No":
+        return image
+
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    # Paste the image onto the background, using its alpha channel as a mask
+    # Check for LA mode (Luminance + Alpha)
+    if image.mode == 'LA':
+        image_rgba = image.convert('RGBA')
+        background.paste(image_rgba, mask=image_rgba.split()[3])
+    else: # Assumes RGBA or P
+        # Ensure palette images are converted correctly before accessing split()
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[3])
+    return background
+
+
+class ImageConverter(Converter):
+    category = "Image"
+    formats = {details['id']: details for details in SUPPORTED_FORMATS.values()}
+    options_class = ImageOptions
+
+    def execute(self, job):
+        with stage("decode"):
+            image = open_image(job.input_path)
+            image.load()    # Image.open() only reads the header; decoding happens here
+        with stage("transform"):
+            image = flatten_transparency(image, job.output_format)
+        with stage("encode"):
+            image.save(job.output_path, format=job.output_format, **job.options.save_kwargs())
+        return job.output_path, "", {"width": image.width, "height": image.height, "mode": image.mode}
+
+
+CONVERTER = ImageConverter()
+
+
 def convert_image(input_file_path, output_format, quality_options):
-    base_name = os.path.splitext(input_file_path)[0]
-    output_file_path = f"{base_name}_converted.{output_format}"
+    job = CONVERTER.prepare(ConversionJob(input_file_path, output_format, ImageOptions(**quality_options)))
 
     summary_panel = Panel(
         f"[info]Input File:[/info] [path]{os.path.basename(input_file_path)}[/]\n"
         f"[info]Output Format:[/info] [format]{output_format.upper()}[/]\n"
-        f"[info]Output File:[/info] [path]{os.path.basename(output_file_path)}[/]",
+        f"[info]Output File:[/info] [path]{os.path.basename(job.output_path)}[/]",
         title="[bold yellow]Conversion Summary[/]", border_style="yellow"
     )
     console.print(summary_panel)
 
     try:
-        image = None
         # RICH: Use a progress bar for a responsive feel
         with Progress(
             SpinnerColumn(),
@@ -131,55 +196,24 @@ def convert_image(input_file_path, output_format, quality_options):
             transient=True
         ) as progress:
             task = progress.add_task("[green]Processing...", total=100)
-            
-            # --- Step 1: Open the image ---
-            file_ext = os.path.splitext(input_file_path)[1].lower()
-            
-            if file_ext in RAW_EXTENSIONS:
-                progress.update(task, description="Decoding RAW file with rawpy...", advance=10)
-                with rawpy.imread(input_file_path) as raw:
-                    rgb_array = raw.postprocess()
-                    image = Image.fromarray(rgb_array)
-            else:
-                progress.update(task, description="Opening image with Pillow...", advance=10)
-                image = Image.open(input_file_path)
-            
-            progress.update(task, description="Image loaded.", advance=30)
-            
-            # --- Step 2: Handle Transparency ---
-            alpha_format = next((v['alpha'] for k, v in SUPPORTED_FORMATS.items() if v['id'] == output_format), "No")
-            if image.mode in ("RGBA", "LA", "P") and alpha_format == "No":
-                progress.update(task, description="Flattening transparency...", advance=20)
-                background = Image.new("RGB", image.size, (255, 255, 255))
-                # Paste the image onto the background, using its alpha channel as a mask
-                # Check for LA mode (Luminance + Alpha)
-                if image.mode == 'LA':
-                    image_rgba = image.convert('RGBA')
-                    background.paste(image_rgba, mask=image_rgba.split()[3])
-                else: # Assumes RGBA or P
-                     # Ensure palette images are converted correctly before accessing split()
-                    if image.mode == 'P':
-                        image = image.convert('RGBA')
-                    background.paste(image, mask=image.split()[3])
-
-                image = background
-            
-            # --- Step 3: Save the image ---
-            progress.update(task, description="Saving new image file...", advance=30)
-            image.save(output_file_path, format=output_format, **quality_options)
+            progress.update(task, description="Decoding, processing and saving image...", advance=10)
+            result = CONVERTER.convert(job)
             progress.update(task, completed=100, description="Done!")
 
         console.print(Panel(
-            f"🎉 [success]Success! Image conversion complete.[/] 🎉\n[info]New file saved at:[/info] [path]{output_file_path}[/]",
+            f"🎉 [success]Success! Image conversion complete.[/] 🎉\n[info]New file saved at:[/info] [path]{result.output_path}[/]\n"
+            f"[info]Size:[/info] {result.bytes_written / 1024:.1f} KB  [info]Time:[/info] {result.elapsed:.2f}s",
             title="[bold green]Complete[/]", border_style="green"
         ))
+        return result
 
-    except Exception as e:
+    except ConversionError as e:
         console.print(Panel(
             f"[danger]AN UNEXPECTED ERROR OCCURRED: {e}[/]\n"
             "[warning]The file may be corrupt, unsupported, or you may be missing a dependency (e.g., 'pillow-heif' for HEIC files).[/]",
             title="[bold red]Conversion Failed[/]", border_style="red"
         ))
+        return None
 
 
 def main(input_file_path=None):
@@ -1,5 +1,6 @@
 import os
 import sys
+import argparse
 
 # Import the 'rich' library components
 from rich.console import Console
@@ -9,7 +10,7 @@ from rich.prompt import Prompt
 # Import the newly created main function from each of our converter scripts
 # (Make sure to apply the refactoring change to all of them first!)
 from audio_conversion import main as main_audio
-from video_conversion import main as main_video
+from video_conversion import main as main_video, VIDEO_EXTENSIONS
 from image_conversion import main as main_image
 from document_conversion import main as main_document
 from archive_conversion import main as main_archive
@@ -17,6 +18,17 @@ from powerpoint_conversion import main as main_presentation
 from font_conversion import main as main_font
 from ebook_conversion import main as main_ebook
 
+# The headless converters behind each interactive tool
+from conversion_api import ConversionJob, ConversionError
+from audio_conversion import CONVERTER as audio_converter
+from video_conversion import CONVERTER as video_converter
+from image_conversion import CONVERTER as image_converter
+from document_conversion import CONVERTER as document_converter
+from archive_conversion import CONVERTER as archive_converter
+from powerpoint_conversion import CONVERTER as presentation_converter
+from font_conversion import CONVERTER as font_converter
+from ebook_conversion import CONVERTER as ebook_converter
+
 # Create a console object
 console = Console()
 
@@ -28,10 +40,8 @@ FILE_TYPE_MAPPING = {
     ".aac": ("Audio", main_audio), ".ogg": ("Audio", main_audio), ".wma": ("Audio", main_audio),
     ".m4a": ("Audio", main_audio), ".aiff": ("Audio", main_audio),
 
-    # Video Formats
-    ".mp4": ("Video", main_video), ".mkv": ("Video", main_video), ".mov": ("Video", main_video),
-    ".avi": ("Video", main_video), ".wmv": ("Video", main_video), ".flv": ("Video", main_video),
-    ".webm": ("Video", main_video),
+    # Video Formats (the list lives in video_conversion, shared with batch_audio_extract)
+    **{ext: ("Video", main_video) for ext in sorted(VIDEO_EXTENSIONS)},
 
     # Image Formats
     ".png": ("Image", main_image), ".jpg": ("Image", main_image), ".jpeg": ("Image", main_image),
@@ -63,6 +73,37 @@ FILE_TYPE_MAPPING = {
 }
 
 
+# File type (as used in FILE_TYPE_MAPPING) -> headless Converter
+CONVERTERS = {
+    "Audio": audio_converter,
+    "Video": video_converter,
+    "Image": image_converter,
+    "Document": document_converter,
+    "Presentation": presentation_converter,
+    "Archive": archive_converter,
+    "E-book": ebook_converter,
+    "Font": font_converter,
+}
+
+
+def get_converter(file_path):
+    """Returns the headless Converter for a file based on its extension, or None."""
+    extension = os.path.splitext(file_path)[1].lower()
+    converter_info = FILE_TYPE_MAPPING.get(extension)
+    return CONVERTERS[converter_info[0]] if converter_info else None
+
+
+def convert_file(file_path, output_format, options=None, output_path=None):
+    """
+    Headless entry point: converts a file without any prompts and returns a
+    ConversionResult. Raises ConversionError on failure.
+    """
+    converter = get_converter(file_path)
+    if converter is None:
+        raise ConversionError(f"Unknown file type: '{os.path.splitext(file_path)[1]}'")
+    return converter.convert(ConversionJob(file_path, output_format, options, output_path))
+
+
 def identify_and_run_converter(file_path):
     """Identifies the file type from its extension and runs the correct converter."""
     
@@ -97,6 +138,15 @@ def identify_and_run_converter(file_path):
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Universal File Converter.")
+    parser.add_argument("--watch", nargs="+", metavar="FOLDER", help="Convert files dropped into these folders.")
+    from watch_mode import add_watch_arguments, run_from_args
+    add_watch_arguments(parser.add_argument_group("watch mode"))
+    args = parser.parse_args()
+    if args.watch:
+        run_from_args(args.watch, args)
+        sys.exit(0)
+
     console.print(Panel(
         "[bold green]🐍 Welcome to the Universal File Converter 🐍[/]\n"
         "[cyan]Simply enter the path to any file, and this script will open the right tool for the job.[/]",
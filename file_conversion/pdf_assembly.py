@@ -0,0 +1,408 @@
+import os
+import re
+import sys
+import time
+import argparse
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+from conversion_api import ConversionError
+from profiling import stage
+
+# RICH: Import necessary components
+from rich.console import Console
+from rich.theme import Theme
+from rich.panel import Panel
+from rich.table import Table
+
+# RICH: Define theme and console
+custom_theme = Theme({
+    "info": "dim cyan", "warning": "magenta", "danger": "bold red",
+    "success": "bold green", "prompt": "bold yellow", "path": "bold cyan",
+    "format": "bold blue",
+})
+console = Console(theme=custom_theme)
+
+# --- SAVE MODES ---
+# fast:        no garbage collection or recompression; pages are copied as they are
+# compact:     garbage=4 + deflate: dedupes identical objects across inputs (slow on big outputs)
+# incremental: written in batches, each appended with saveIncr(), so memory stays bounded
+SAVE_MODES = {
+    "fast": {"garbage": 0, "deflate": False},
+    "compact": {"garbage": 4, "deflate": True},
+}
+SAVE_MODE_NAMES = ["fast", "compact", "incremental"]
+INCREMENTAL_BATCH_PAGES = 500
+RANGE_PATTERN = re.compile(r"^\s*(\d*)\s*(?:(-)\s*(\d*))?\s*$")
+
+
+class PhaseTimer:
+    """Wall time per phase ('open', 'copy', 'save', ...), also reported as profiling stages."""
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def __call__(self, name):
+        started = time.perf_counter()
+        try:
+            with stage(name):
+                yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+
+def _open_pdf(path):
+    try:
+        doc = fitz.open(path)
+    except Exception as e:
+        raise ConversionError(f"Could not open {os.path.basename(path)}: {e}") from e
+    if not doc.is_pdf:
+        doc.close()
+        raise ConversionError(f"{os.path.basename(path)} is not a PDF.")
+    if doc.needs_pass:
+        doc.close()
+        raise ConversionError(f"{os.path.basename(path)} is password-protected.")
+    return doc
+
+
+def _save(doc, output_path, save_mode):
+    options = SAVE_MODES.get(save_mode, SAVE_MODES["fast"])
+    doc.save(output_path, **options)
+
+
+# --- Page selection ---
+
+def parse_ranges(spec, page_count):
+    """
+    '1-3,4-10,11-' -> [(0, 2), (3, 9), (10, last)] (0-based, inclusive). Open ends
+    run to the first/last page; a single number is one page.
+    """
+    ranges = []
+    for part in spec.split(","):
+        match = RANGE_PATTERN.match(part)
+        if not match or not (match.group(1) or match.group(3) or match.group(2)):
+            raise ConversionError(f"Bad page range '{part.strip()}'. Use e.g. '1-3,4-10,11-'.")
+        first = int(match.group(1)) if match.group(1) else 1
+        last = (int(match.group(3)) if match.group(3) else page_count) if match.group(2) else first
+        if not 1 <= first <= last <= page_count:
+            raise ConversionError(f"Page range '{part.strip()}' is outside 1-{page_count}.")
+        ranges.append((first - 1, last - 1))
+    return ranges
+
+
+def bookmark_ranges(doc, level=1):
+    """One (first, last, title) section per bookmark at 'level'; pages before the first go with it."""
+    marks = [(page - 1, title) for lvl, title, page in doc.get_toc(simple=True) if lvl == level and page >= 1]
+    if not marks:
+        raise ConversionError(f"The document has no level-{level} bookmarks to split on.")
+    marks.sort()
+    sections = []
+    for index, (page, title) in enumerate(marks):
+        first = 0 if index == 0 else page
+        last = marks[index + 1][0] - 1 if index + 1 < len(marks) else doc.page_count - 1
+        if last >= first:
+            sections.append((first, last, title))
+    return sections
+
+
+def split_plan(doc, split):
+    """'bookmarks', 'every:N' or a range list -> [(first, last, title or None)]."""
+    if split == "bookmarks":
+        return bookmark_ranges(doc)
+    if split.startswith("every:"):
+        try:
+            size = int(split.split(":", 1)[1])
+        except ValueError:
+            size = 0
+        if size < 1:
+            raise ConversionError(f"Bad split '{split}'. Use e.g. 'every:10'.")
+        return [(first, min(first + size, doc.page_count) - 1, None) for first in range(0, doc.page_count, size)]
+    return [(first, last, None) for first, last in parse_ranges(split, doc.page_count)]
+
+
+def _slug(title):
+    return re.sub(r"[^\w\-]+", "_", title).strip("_")[:60] or "section"
+
+
+def _section_toc(toc, first, last):
+    """Bookmarks that fall inside [first, last], re-based to the section's own page numbers."""
+    entries = [[lvl, title, page - first] for lvl, title, page in toc if first + 1 <= page <= last + 1]
+    if entries:
+        top = min(entry[0] for entry in entries)
+        for entry in entries:
+            entry[0] -= top - 1
+        # A section that starts mid-chapter opens on a sub-entry, but a TOC must start at level 1
+        entries[0][0] = 1
+        # A TOC must not jump levels (1 -> 3); clamp each entry to at most one deeper than the last
+        for previous, entry in zip(entries, entries[1:]):
+            entry[0] = min(entry[0], previous[0] + 1)
+    return entries
+
+
+# --- Operations ---
+
+def _merge_into(result, paths, timer, add_file_bookmarks, toc):
+    for path in paths:
+        with timer("open"):
+            src = _open_pdf(path)
+        with timer("copy"):
+            start = result.page_count
+            result.insert_pdf(src)
+            file_toc = [[lvl + (1 if add_file_bookmarks else 0), title, page + start]
+                        for lvl, title, page in src.get_toc(simple=True) if page >= 1]
+            if add_file_bookmarks:
+                toc.append([1, os.path.splitext(os.path.basename(path))[0], start + 1])
+            toc.extend(file_toc)
+        src.close()
+
+
+def merge_pdfs(input_paths, output_path, save_mode="fast", file_bookmarks=True):
+    """
+    Concatenates PDFs (in the given order) into 'output_path', keeping their bookmarks
+    (nested under one bookmark per file). Returns a summary with per-phase timings.
+    """
+    if save_mode not in SAVE_MODE_NAMES:
+        raise ConversionError(f"Unknown save mode '{save_mode}'. Choose from: {', '.join(SAVE_MODE_NAMES)}")
+    if not input_paths:
+        raise ConversionError("Nothing to merge.")
+    timer, started = PhaseTimer(), time.perf_counter()
+    if save_mode == "incremental":
+        pages = _merge_incremental(input_paths, output_path, timer, file_bookmarks)
+    else:
+        result, toc = fitz.open(), []
+        _merge_into(result, input_paths, timer, file_bookmarks, toc)
+        with timer("toc"):
+            result.set_toc(toc)
+        with timer("save"):
+            _save(result, output_path, save_mode)
+        pages = result.page_count
+        result.close()
+    return {"operation": "merge", "inputs": len(input_paths), "pages": pages, "save_mode": save_mode,
+            "phases": timer.phases, "elapsed": time.perf_counter() - started, "bytes": os.path.getsize(output_path)}
+
+
+def _merge_incremental(input_paths, output_path, timer, file_bookmarks):
+    """
+    Writes the output in batches of about INCREMENTAL_BATCH_PAGES pages: each batch
+    is appended to the file with saveIncr() and the document is reopened, so only
+    one batch of copied objects is held in memory at a time.
+    """
+    batches, batch, batch_pages = [], [], 0
+    for path in input_paths:
+        with timer("open"):
+            with _open_pdf(path) as doc:
+                count = doc.page_count
+        batch.append(path)
+        batch_pages += count
+        if batch_pages >= INCREMENTAL_BATCH_PAGES:
+            batches.append(batch)
+            batch, batch_pages = [], 0
+    if batch:
+        batches.append(batch)
+
+    toc = []
+    first = fitz.open()
+    _merge_into(first, batches[0], timer, file_bookmarks, toc)
+    with timer("save"):
+        _save(first, output_path, "fast")
+    first.close()
+    for batch in batches[1:]:
+        with timer("open"):
+            result = fitz.open(output_path)
+        _merge_into(result, batch, timer, file_bookmarks, toc)
+        with timer("save"):
+            result.saveIncr()
+        result.close()
+
+    with timer("toc"):
+        result = fitz.open(output_path)
+        result.set_toc(toc)
+        result.saveIncr()
+        pages = result.page_count
+        result.close()
+    return pages
+
+
+def _write_sections(input_path, sections, save_mode):
+    """Worker: writes each (first, last, output_path) section of one source PDF."""
+    written, phases = [], {}
+    with _open_pdf(input_path) as src:
+        toc = src.get_toc(simple=True)
+        for first, last, output_path in sections:
+            started = time.perf_counter()
+            with fitz.open() as piece:
+                piece.insert_pdf(src, from_page=first, to_page=last)
+                piece.set_toc(_section_toc(toc, first, last))
+                copied = time.perf_counter()
+                _save(piece, output_path, save_mode)
+            phases["copy"] = phases.get("copy", 0.0) + copied - started
+            phases["save"] = phases.get("save", 0.0) + time.perf_counter() - copied
+            written.append(output_path)
+    return written, phases
+
+
+def split_pdf(input_path, output_dir, split="bookmarks", save_mode="fast", workers=None):
+    """
+    Splits one PDF into several by bookmarks, fixed-size chunks ('every:N') or page
+    ranges ('1-3,4-'). Sections are written by up to 'workers' processes in parallel,
+    each with its own handle on the source. Returns a summary with per-phase timings.
+    """
+    if save_mode == "incremental":
+        save_mode = "fast"      # Sections are small; batching them buys nothing
+    timer, started = PhaseTimer(), time.perf_counter()
+    with timer("open"):
+        with _open_pdf(input_path) as doc:
+            plan = split_plan(doc, split)
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.splitext(os.path.basename(input_path))[0]
+    width = len(str(len(plan)))
+    sections = [(first, last, os.path.join(output_dir, f"{base}_{index:0{width}d}"
+                                           f"{'_' + _slug(title) if title else ''}.pdf"))
+                for index, (first, last, title) in enumerate(plan, 1)]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(sections)))
+    written = []
+    with timer("write"):
+        if workers == 1:
+            written, phases = _write_sections(input_path, sections, save_mode)
+            timer.phases.update(phases)
+        else:
+            groups = [sections[i::workers] for i in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for group_written, phases in pool.map(_write_sections, [input_path] * workers,
+                                                       groups, [save_mode] * workers):
+                    written += group_written
+                    for name, seconds in phases.items():
+                        # Summed across workers: CPU-seconds spent, not wall time
+                        timer.phases[f"{name} (all workers)"] = timer.phases.get(f"{name} (all workers)", 0.0) + seconds
+    return {"operation": "split", "sections": len(sections), "outputs": sorted(written), "workers": workers,
+            "save_mode": save_mode, "phases": timer.phases, "elapsed": time.perf_counter() - started,
+            "bytes": sum(os.path.getsize(path) for path in written)}
+
+
+def interleave_order(page_counts, reverse=()):
+    """
+    Page order that takes one page from each input in turn (A1 B1 A2 B2 ...), with
+    inputs listed in 'reverse' read back to front (the usual duplex-scan case).
+    Returns indices into the concatenation of all inputs.
+    """
+    offsets = [sum(page_counts[:i]) for i in range(len(page_counts))]
+    sequences = [list(range(offset, offset + count))[::-1 if i in reverse else 1]
+                 for i, (offset, count) in enumerate(zip(offsets, page_counts))]
+    order = []
+    for position in range(max(page_counts)):
+        order += [sequence[position] for sequence in sequences if position < len(sequence)]
+    return order
+
+
+def interleave_pdfs(input_paths, output_path, reverse=(), save_mode="fast"):
+    """
+    Alternates pages of several PDFs. Inputs are concatenated once (so shared fonts
+    and images are copied once per input, not once per page) and reordered in place.
+    """
+    if len(input_paths) < 2:
+        raise ConversionError("Interleaving needs at least two PDFs.")
+    timer, started = PhaseTimer(), time.perf_counter()
+    result, counts = fitz.open(), []
+    for path in input_paths:
+        with timer("open"):
+            src = _open_pdf(path)
+        with timer("copy"):
+            counts.append(src.page_count)
+            result.insert_pdf(src)
+        src.close()
+    with timer("reorder"):
+        result.select(interleave_order(counts, set(reverse)))
+    with timer("save"):
+        _save(result, output_path, "fast" if save_mode == "incremental" else save_mode)
+    pages = result.page_count
+    result.close()
+    return {"operation": "interleave", "inputs": len(input_paths), "pages": pages, "save_mode": save_mode,
+            "phases": timer.phases, "elapsed": time.perf_counter() - started, "bytes": os.path.getsize(output_path)}
+
+
+def display_summary(summary):
+    table = Table(title=f"[bold green]PDF {summary['operation']}[/]", border_style="cyan")
+    table.add_column("Phase", style="bold blue")
+    table.add_column("Time", justify="right")
+    for name, seconds in summary["phases"].items():
+        table.add_row(name, f"{seconds * 1000:.0f} ms")
+    table.add_row("[bold]Total[/]", f"[bold]{summary['elapsed'] * 1000:.0f} ms[/]")
+    console.print(table)
+    count = f"{summary['pages']} pages" if "pages" in summary else f"{summary['sections']} files"
+    console.print(f"[info]{count}, {summary['bytes'] / 1024 / 1024:.2f} MB, save mode '{summary['save_mode']}'[/]")
+
+
+# --- Self-check ---
+
+def check_split_tocs(output_dir):
+    """
+    Splits a 10-page chapter/section document every way 'split' allows and checks that
+    every piece keeps a valid TOC, including pieces that start mid-chapter.
+    Raises AssertionError (or ConversionError) on failure.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    source = os.path.join(output_dir, "toc_check.pdf")
+    toc = [[1, "Ch1", 1], [2, "Sub1", 2], [2, "Sub2", 4], [1, "Ch2", 5],
+           [2, "Sub3", 6], [3, "Detail", 7], [1, "Ch3", 9]]
+    with fitz.open() as doc:
+        for number in range(1, 11):
+            doc.new_page().insert_text((72, 72), f"Page {number}")
+        doc.set_toc(toc)
+        doc.save(source)
+    # Pages 4-6 open on a level-2 entry followed by a chapter; 7-10 on a level-3 one
+    assert _section_toc(toc, 3, 5) == [[1, "Sub2", 1], [1, "Ch2", 2], [2, "Sub3", 3]], _section_toc(toc, 3, 5)
+    assert _section_toc(toc, 6, 9) == [[1, "Detail", 1], [1, "Ch3", 3]], _section_toc(toc, 6, 9)
+
+    for split in ("bookmarks", "every:3", "2-4,5-7,8-"):
+        summary = split_pdf(source, os.path.join(output_dir, split.replace(":", "_").replace(",", "_")), split, workers=1)
+        for path in summary["outputs"]:
+            with fitz.open(path) as piece:
+                levels = [lvl for lvl, _, _ in piece.get_toc(simple=True)]
+            assert not levels or levels[0] == 1, f"{split}: {os.path.basename(path)} starts at level {levels[0]}"
+            assert all(b <= a + 1 for a, b in zip(levels, levels[1:])), f"{split}: {os.path.basename(path)} jumps levels"
+    return source
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Merge, split and interleave PDFs.")
+    parser.add_argument("--save-mode", choices=SAVE_MODE_NAMES, default="fast")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    merge_parser = subparsers.add_parser("merge", help="Concatenate PDFs in the given order.")
+    merge_parser.add_argument("inputs", nargs="+")
+    merge_parser.add_argument("--out", default="merged.pdf")
+    merge_parser.add_argument("--no-file-bookmarks", action="store_true", help="Don't add a bookmark per input file.")
+    split_parser = subparsers.add_parser("split", help="Split one PDF into several.")
+    split_parser.add_argument("input")
+    split_parser.add_argument("--by", default="bookmarks", help="'bookmarks', 'every:N' or ranges like '1-3,4-10,11-'.")
+    split_parser.add_argument("--out", help="Output folder (default: '<input>_split').")
+    split_parser.add_argument("--workers", type=int)
+    interleave_parser = subparsers.add_parser("interleave", help="Alternate pages of several PDFs.")
+    interleave_parser.add_argument("inputs", nargs="+")
+    interleave_parser.add_argument("--out", default="interleaved.pdf")
+    interleave_parser.add_argument("--reverse", type=int, action="append", default=[],
+                                   help="1-based index of an input to read back to front (e.g. even pages of a duplex scan).")
+    check_parser = subparsers.add_parser("check", help="Split a generated test document and verify the section TOCs.")
+    check_parser.add_argument("--out", help="Keep the generated files here (default: a temporary folder).")
+    args = parser.parse_args()
+
+    if args.command == "check":
+        import tempfile
+        check_split_tocs(args.out or tempfile.mkdtemp())
+        console.print("[success]Section TOCs are valid for bookmark, every:N and range splits.[/]")
+        sys.exit(0)
+
+    try:
+        if args.command == "merge":
+            summary = merge_pdfs(args.inputs, args.out, args.save_mode, not args.no_file_bookmarks)
+        elif args.command == "split":
+            out = args.out or f"{os.path.splitext(args.input)[0]}_split"
+            summary = split_pdf(args.input, out, args.by, args.save_mode, args.workers)
+        else:
+            summary = interleave_pdfs(args.inputs, args.out, [i - 1 for i in args.reverse], args.save_mode)
+    except ConversionError as e:
+        console.print(Panel(f"[danger]{e}[/]", title="[bold red]Error[/]", border_style="red"))
+        sys.exit(1)
+    display_summary(summary)
@@ -1,7 +1,6 @@
 import os
 import sys
 import shutil
-import subprocess
 
 # RICH: Import necessary components
 from rich.console import Console
@@ -11,6 +10,8 @@ from rich.prompt import Prompt, IntPrompt
 from rich.table import Table
 from rich.status import Status
 
+from conversion_api import Converter, ConversionJob, ConversionError
+
 # RICH: Define theme and console
 custom_theme = Theme({
     "info": "dim cyan",
@@ -90,9 +91,42 @@ def get_output_format():
     )
     return format_list[choice - 1][1]['id']
 
+# --- HEADLESS API ---
+class PresentationConverter(Converter):
+    category = "Presentation"
+    formats = {details['id']: details for details in SUPPORTED_FORMATS.values()}
+
+    def soffice_output_path(self, job):
+        """LibreOffice always names its output '<input name>.<format>' inside --outdir."""
+        out_dir = os.path.dirname(job.output_path) or "."
+        base_name = os.path.splitext(os.path.basename(job.input_path))[0]
+        return os.path.join(out_dir, f"{base_name}.{job.output_format}")
+
+    def default_output_path(self, input_path, output_format, options):
+        base_name = os.path.splitext(input_path)[0]
+        return f"{base_name}.{output_format}"
+
+    def build_command(self, job):
+        if not SOFFICE_PATH:
+            raise ConversionError("LibreOffice was not found on this system.")
+        return [
+            SOFFICE_PATH, '--headless', '--convert-to', job.output_format,
+            job.input_path, '--outdir', os.path.dirname(job.output_path) or "."
+        ]
+
+    def finish_command(self, job, returncode, stdout, stderr):
+        output_path, stderr, metadata = super().finish_command(job, returncode, stdout, stderr)
+        produced = self.soffice_output_path(job)
+        if os.path.abspath(produced) != os.path.abspath(output_path):
+            os.replace(produced, output_path)
+        return output_path, stderr, metadata
+
+
+CONVERTER = PresentationConverter()
+
+
 def convert_presentation(input_file_path, output_format):
     input_dir = os.path.dirname(input_file_path)
-    base_name = os.path.splitext(os.path.basename(input_file_path))[0]
     
     summary_panel = Panel(
         f"[info]Input File:[/info] [path]{os.path.basename(input_file_path)}[/]\n"
@@ -101,43 +135,37 @@ def convert_presentation(input_file_path, output_format):
     )
     console.print(summary_panel)
 
-    command = [
-        SOFFICE_PATH, '--headless', '--convert-to', output_format,
-        input_file_path, '--outdir', input_dir
-    ]
-    
     # RICH: Use console.status to provide feedback during the external process
     with console.status("[bold green]LibreOffice is processing your file in the background...", spinner="dots") as status:
         try:
-            # Run the command, capturing output and checking for errors
-            result = subprocess.run(command, capture_output=True, text=True, check=True)
+            result = CONVERTER.convert(ConversionJob(input_file_path, output_format))
             
             # Determine the correct output path for the success message
             if output_format == 'png':
                 final_path = f"Multiple PNG images in the folder: [path]{input_dir}[/]"
             else:
-                output_file_name = f"{base_name}.{output_format}"
-                final_path = os.path.join(input_dir, output_file_name)
+                final_path = result.output_path
             
             console.print(Panel(
-                f"🎉 [success]Success! Conversion complete.[/] 🎉\n[info]Output saved at:[/info] [path]{final_path}[/]",
+                f"🎉 [success]Success! Conversion complete.[/] 🎉\n[info]Output saved at:[/info] [path]{final_path}[/]\n"
+                f"[info]Time:[/info] {result.elapsed:.1f}s",
                 title="[bold green]Complete[/]", border_style="green"
             ))
-
-        except FileNotFoundError:
-            console.print(Panel("[danger]CRITICAL ERROR: Could not find the LibreOffice executable.[/]\n"
-                          "[warning]Please ensure LibreOffice is installed and its path is correct.[/]",
-                          title="[bold red]Error[/]", border_style="red"))
-        except subprocess.CalledProcessError as e:
+            return result
+
+        except ConversionError as e:
+            if isinstance(e.__cause__, FileNotFoundError):
+                console.print(Panel("[danger]CRITICAL ERROR: Could not find the LibreOffice executable.[/]\n"
+                              "[warning]Please ensure LibreOffice is installed and its path is correct.[/]",
+                              title="[bold red]Error[/]", border_style="red"))
+                return None
             console.print(Panel(
                 "[danger]LibreOffice failed to convert the file.[/]\n"
                 "[warning]The input file may be corrupted, password-protected, or unsupported.[/]\n\n"
-                f"[bold]Error Details from LibreOffice:[/]\n[dim]{e.stderr}[/dim]",
+                f"[bold]Error Details from LibreOffice:[/]\n[dim]{e.stderr or e}[/dim]",
                 title="[bold red]Conversion Failed[/]", border_style="red"
             ))
-        except Exception as e:
-            console.print(Panel(f"[danger]AN UNEXPECTED ERROR OCCURRED: {e}[/]",
-                          title="[bold red]Error[/]", border_style="red"))
+    return None
 
 
 def main(input_file_path=None):
@@ -0,0 +1,215 @@
+import os
+import glob
+import json
+import time
+import atexit
+import resource
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# --- Per-job resource accounting ---
+# Converters wrap their phases in stage("decode"), stage("encode"), ... Every stage
+# records wall time, CPU time (this process plus the tools it waited on), the change
+# in resident memory and the bytes read/written. The stages of a job end up in its
+# ConversionResult.metadata. With CONVERTER_TRACE=<path> set, every stage is also
+# written to a Chrome trace-event file (chrome://tracing, Perfetto) after each job.
+# The first process to enable tracing owns the file. Its subprocesses and pool workers
+# (which inherit CONVERTER_TRACE_ROOT) each write '<path>.<pid>.part' after every job,
+# since they may never run atexit hooks. The owner merges the parts into the file.
+
+TRACE_ENV = "CONVERTER_TRACE"
+TRACE_ROOT_ENV = "CONVERTER_TRACE_ROOT"     # "<owner pid>:<clock origin>:<path>", set by the owner
+PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024 if hasattr(os, "sysconf") else 4
+
+_kernel_copied = 0      # Bytes moved by copy_file_range/sendfile, which never touch a user buffer
+_job_stages = contextvars.ContextVar("job_stages", default=None)
+
+
+def note_kernel_copy(nbytes):
+    global _kernel_copied
+    _kernel_copied += nbytes
+
+
+def process_io_counters():
+    """
+    Bytes read and written through syscalls by this process and the tools it has
+    waited on (Linux folds reaped children into /proc/self/io), else None. Kernel
+    copies reported through note_kernel_copy() are left out.
+    """
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return {"read": int(fields["rchar"]) - _kernel_copied, "written": int(fields["wchar"]) - _kernel_copied}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def current_rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_KB
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss     # Peak, not current, off Linux
+
+
+def snapshot():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    io = process_io_counters() or {"read": 0, "written": 0}
+    return {"wall": time.perf_counter(), "cpu": own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime,
+            "rss_kb": current_rss_kb(), "read": io["read"], "written": io["written"]}
+
+
+def _difference(before, after):
+    # CPU and I/O counters are process-wide: concurrent jobs in other threads show up too
+    return {"wall": after["wall"] - before["wall"], "cpu": after["cpu"] - before["cpu"],
+            "rss_delta_kb": after["rss_kb"] - before["rss_kb"],
+            "bytes_read": after["read"] - before["read"], "bytes_written": after["written"] - before["written"]}
+
+
+# --- Chrome trace output ---
+
+class Tracer:
+    """Collects complete ('X') trace events and writes them in the Chrome trace-event JSON format."""
+    def __init__(self, path, owner_pid=None, origin=None):
+        self.path = path
+        self.owner_pid = owner_pid or os.getpid()
+        self.events = []
+        self.lock = threading.Lock()
+        # perf_counter is a system-wide monotonic clock on Linux and macOS, so a shared
+        # origin puts every process's events on one timeline
+        self.origin = time.perf_counter() if origin is None else origin
+
+    def add(self, name, category, started, usage, args):
+        event = {
+            "name": name, "cat": category, "ph": "X", "pid": os.getpid(), "tid": threading.get_native_id(),
+            "ts": round((started - self.origin) * 1e6, 1), "dur": round(usage["wall"] * 1e6, 1),
+            "args": {**args, "cpu_ms": round(usage["cpu"] * 1000, 2), "rss_delta_kb": usage["rss_delta_kb"],
+                     "bytes_read": usage["bytes_read"], "bytes_written": usage["bytes_written"]},
+        }
+        with self.lock:
+            self.events.append(event)
+
+    @property
+    def is_owner(self):
+        return os.getpid() == self.owner_pid
+
+    def part_paths(self):
+        return glob.glob(f"{glob.escape(self.path)}.*.part")
+
+    def _write(self, path, events):
+        # Written aside and renamed, so a reader never sees a half-written file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        os.replace(temp_path, path)
+
+    def flush(self):
+        """
+        Writes everything collected so far. The owner writes 'path' with every part
+        merged in; any other process writes its own part. Returns the path written.
+        """
+        with self.lock:
+            events = list(self.events)
+        if not self.is_owner:
+            path = f"{self.path}.{os.getpid()}.part"
+            self._write(path, events)
+            return path
+        for part in self.part_paths():
+            try:
+                with open(part) as f:
+                    events += json.load(f)["traceEvents"]
+            except (OSError, ValueError, KeyError):
+                continue
+        self._write(self.path, events)
+        return self.path
+
+    def save(self):
+        """Final flush; the owner also removes the parts it has merged."""
+        path = self.flush()
+        if self.is_owner:
+            for part in self.part_paths():
+                os.remove(part)
+        return path
+
+    def _after_fork(self):
+        # A forked worker starts with its parent's events, which the parent writes itself
+        self.events = []
+        self.lock = threading.Lock()
+
+
+_tracer = None
+
+
+def _save_at_exit():
+    if _tracer is not None and (_tracer.events or (_tracer.is_owner and _tracer.part_paths())):
+        _tracer.save()
+
+
+def enable_tracing(path):
+    """Starts collecting trace events into 'path'. Another process's trace of the same
+    path (per CONVERTER_TRACE_ROOT) is joined rather than overwritten."""
+    global _tracer
+    path = os.path.abspath(path)
+    owner = os.environ.get(TRACE_ROOT_ENV, "").split(":", 2)
+    if len(owner) == 3 and owner[2] == path and owner[0] != str(os.getpid()):
+        owner_args = (int(owner[0]), float(owner[1]))
+    else:
+        owner_args = (os.getpid(), time.perf_counter())
+        os.environ[TRACE_ROOT_ENV] = f"{owner_args[0]}:{owner_args[1]}:{path}"
+        for stale in glob.glob(f"{glob.escape(path)}.*.part"):
+            os.remove(stale)
+    if _tracer is None:
+        atexit.register(_save_at_exit)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=lambda: _tracer and _tracer._after_fork())
+    _tracer = Tracer(path, *owner_args)
+    return _tracer
+
+
+if os.environ.get(TRACE_ENV):
+    enable_tracing(os.environ[TRACE_ENV])
+
+
+# --- Instrumentation points ---
+
+@contextmanager
+def stage(name, **args):
+    """Measures the enclosed block as one stage of the current job."""
+    before = snapshot()
+    try:
+        yield
+    finally:
+        usage = _difference(before, snapshot())
+        stages = _job_stages.get()
+        if stages is not None:
+            stages.append({"stage": name, **usage})
+        if _tracer is not None:
+            _tracer.add(name, "stage", before["wall"], usage, args)
+
+
+class JobAccounting:
+    def __init__(self):
+        self.stages = []
+        self.total = None
+
+    def as_metadata(self):
+        return {"resources": self.total, "stages": self.stages}
+
+
+@contextmanager
+def job_accounting(name, **args):
+    """Collects the stages run inside the block (in this thread or context) for one job."""
+    accounting = JobAccounting()
+    token = _job_stages.set(accounting.stages)
+    before = snapshot()
+    try:
+        yield accounting
+    finally:
+        _job_stages.reset(token)
+        accounting.total = _difference(before, snapshot())
+        if _tracer is not None:
+            _tracer.add(name, "job", before["wall"], accounting.total, args)
+            # Per job, not only at exit: pool workers are killed without running atexit hooks
+            _tracer.flush()
@@ -1,8 +1,18 @@
 import os
+import re
 import sys
+import time
+import shutil
+import resource
+import argparse
+import tempfile
+import subprocess
+from dataclasses import dataclass, replace
 import ffmpeg  # This requires 'pip install ffmpeg-python'
 import imageio_ffmpeg
 
+from conversion_api import Converter, ConversionJob, ConversionError
+
 # RICH: Import the necessary components from the rich library
 from rich.console import Console
 from rich.theme import Theme
@@ -20,6 +30,8 @@ if not hasattr(ffmpeg, 'input'):
     sys.exit(1)
 
 FFMPEG_PATH = imageio_ffmpeg.get_ffmpeg_exe()
+# Every video container the converter accepts; main.py routes these to it
+VIDEO_EXTENSIONS = {".mp4", ".mkv", ".mov", ".avi", ".wmv", ".flv", ".webm", ".m4v", ".ts"}
 
 # RICH: Define a custom theme
 custom_theme = Theme({
@@ -39,17 +51,38 @@ VIDEO_OUTPUT_FORMATS = {
 }
 
 # UPDATED: Added specific 'codec' keys so ffmpeg knows exactly what to do
+# 'copy_from' lists source codecs that can be stream-copied into the container without re-encoding.
+# Only the codec 'codec' itself writes: copying ALAC into .m4a or Opus into .ogg would hand back
+# a different codec than the one picked.
 AUDIO_OUTPUT_FORMATS = {
-    "MP3": {"id": "mp3", "codec": "libmp3lame", "bitrate": "192k", "desc": "Universal compatibility."},
-    "WAV": {"id": "wav", "codec": "pcm_s16le", "bitrate": None, "desc": "Uncompressed CD quality."},
-    "AAC": {"id": "aac", "codec": "aac", "bitrate": "192k", "desc": "Standard for MP4/Apple."},
-    "OGG": {"id": "ogg", "codec": "libvorbis", "bitrate": "192k", "desc": "Open source audio."},
+    "MP3": {"id": "mp3", "codec": "libmp3lame", "bitrate": "192k", "copy_from": ["mp3"], "desc": "Universal compatibility."},
+    "WAV": {"id": "wav", "codec": "pcm_s16le", "bitrate": None, "copy_from": ["pcm_s16le"], "desc": "Uncompressed CD quality."},
+    "AAC": {"id": "aac", "codec": "aac", "bitrate": "192k", "copy_from": ["aac"], "desc": "Standard for MP4/Apple."},
+    "M4A": {"id": "m4a", "codec": "aac", "bitrate": "192k", "copy_from": ["aac"], "desc": "AAC in an Apple/MP4 audio container."},
+    "OGG": {"id": "ogg", "codec": "libvorbis", "bitrate": "192k", "copy_from": ["vorbis"], "desc": "Open source audio."},
 }
 
 GIF_OUTPUT_FORMATS = {
     "GIF": {"id": "gif", "desc": "Animated GIF image."},
 }
 
+THUMBNAIL_OUTPUT_FORMATS = {
+    "Thumbnails": {"id": "thumbnails", "desc": "Poster frame, sprite sheet and WebVTT scrubbing index."},
+}
+
+HLS_OUTPUT_FORMATS = {
+    "HLS Ladder": {"id": "hls", "desc": "Adaptive bitrate ladder: HLS segments + master playlist."},
+}
+
+# Bitrate ladder rungs, tallest first. Rungs taller than the source are skipped (no upscaling).
+HLS_LADDER = {
+    "1080p": {"height": 1080, "bitrate": "5000k", "maxrate": "5350k", "bufsize": "7500k"},
+    "720p": {"height": 720, "bitrate": "2800k", "maxrate": "2996k", "bufsize": "4200k"},
+    "480p": {"height": 480, "bitrate": "1400k", "maxrate": "1498k", "bufsize": "2100k"},
+    "360p": {"height": 360, "bitrate": "800k", "maxrate": "856k", "bufsize": "1200k"},
+}
+HLS_MASTER_PLAYLIST = "master.m3u8"
+
 QUALITY_LEVELS = {
     "1": {"crf": "18", "preset": "slow", "label": "Excellent", "desc": "High quality, larger file."},
     "2": {"crf": "23", "preset": "medium", "label": "Good (Recommended)", "desc": "Balanced quality/size."},
@@ -84,10 +117,12 @@ def get_conversion_type():
     table.add_row("1", "Convert Video", "Change format (MP4, MKV, etc.)")
     table.add_row("2", "Extract Audio", "Save audio only (MP3, WAV, etc.)")
     table.add_row("3", "Create GIF", "Make a silent animation")
+    table.add_row("4", "Stream Ladder", "HLS renditions (1080p-360p) in one pass")
+    table.add_row("5", "Thumbnails", "Poster + sprite sheet from keyframes")
 
     console.print(table)
-    choice = IntPrompt.ask("[prompt]➡️  Choice[/prompt]", choices=["1", "2", "3"])
-    mapping = {1: "video", 2: "audio", 3: "gif"}
+    choice = IntPrompt.ask("[prompt]➡️  Choice[/prompt]", choices=["1", "2", "3", "4", "5"])
+    mapping = {1: "video", 2: "audio", 3: "gif", 4: "hls", 5: "thumbnails"}
     return mapping[choice]
 
 def get_output_format(format_dict):
@@ -104,6 +139,20 @@ def get_output_format(format_dict):
     choice = IntPrompt.ask("[prompt]➡️  Choice[/prompt]", choices=[str(i) for i in range(1, len(format_list) + 1)])
     return format_list[choice - 1][1]
 
+def get_ladder_rungs(input_path):
+    source = probe_media(input_path)
+    rungs = ladder_for_source(source.get("height"))
+    table = Table(title="[bold green]HLS Ladder[/]", border_style="cyan")
+    table.add_column("Rendition", style="bold blue")
+    table.add_column("Height", justify="right")
+    table.add_column("Video Bitrate", justify="right", style="dim cyan")
+    for name in rungs:
+        table.add_row(name, str(hls_rung(name)["height"]), hls_rung(name)["bitrate"])
+    console.print(table)
+    if source.get("height"):
+        console.print(f"[info]Source is {source['width']}x{source['height']}; taller rungs are skipped.[/]")
+    return rungs
+
 def get_quality_setting():
     table = Table(title="[bold green]Select Quality[/]", border_style="cyan")
     table.add_column("No.", "Level", "Description", style="bold yellow")
@@ -113,26 +162,261 @@ def get_quality_setting():
     choice = Prompt.ask("[prompt]➡️  Choice (default: 2)[/prompt]", choices=QUALITY_LEVELS.keys(), default="2")
     return QUALITY_LEVELS[choice]
 
-def run_conversion(ffmpeg_stream, output_path, summary_panel):
+# --- MEDIA PROBING ---
+# imageio-ffmpeg ships ffmpeg but not ffprobe, so we read the stream summary
+# that 'ffmpeg -i' prints to stderr.
+DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+VIDEO_STREAM_PATTERN = re.compile(r"Stream #\d+:\d+.*?: Video: (\w+).*?, (\d{2,5})x(\d{2,5})")
+AUDIO_STREAM_PATTERN = re.compile(r"Stream #\d+:\d+.*?: Audio: (\w+)(?:.*?(\d+) Hz)?")
+FPS_PATTERN = re.compile(r"(\d+(?:\.\d+)?) fps")
+CHANNELS_PATTERN = re.compile(r"Hz, ([\w.]+(?: channels)?)")
+SAMPLE_FORMAT_PATTERN = re.compile(r"Hz, [^,]+, (u8|s16|s32|s64|flt|dbl)p?(?: \((\d+) bit\))?")
+SAMPLE_FORMAT_BITS = {"u8": 8, "s16": 16, "s32": 32, "s64": 64, "flt": 32, "dbl": 64}
+CHANNEL_LAYOUTS = {"mono": 1, "stereo": 2, "2.1": 3, "quad": 4, "4.0": 4, "5.0": 5, "5.1": 6, "6.1": 7, "7.1": 8}
+
+
+def probe_media(input_path):
+    """Returns duration, first video stream size/codec/fps and first audio stream codec/rate/channels/sample format."""
+    process = subprocess.run([FFMPEG_PATH, "-hide_banner", "-i", input_path], capture_output=True)
+    stderr = process.stderr.decode("utf-8", errors="replace")
+    info = {"duration": None, "width": None, "height": None, "fps": None,
+            "video_codec": None, "audio_codec": None, "sample_rate": None, "channels": None,
+            "sample_format": None, "bits_per_sample": None, "has_audio": False}
+    match = DURATION_PATTERN.search(stderr)
+    if match:
+        hours, minutes, seconds = match.groups()
+        info["duration"] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    for line in stderr.splitlines():
+        video = VIDEO_STREAM_PATTERN.search(line)
+        if video and info["video_codec"] is None:
+            info["video_codec"], info["width"], info["height"] = video.group(1), int(video.group(2)), int(video.group(3))
+            fps = FPS_PATTERN.search(line)
+            info["fps"] = float(fps.group(1)) if fps else None
+        audio = AUDIO_STREAM_PATTERN.search(line)
+        if audio and info["audio_codec"] is None:
+            info["audio_codec"], info["has_audio"] = audio.group(1), True
+            info["sample_rate"] = int(audio.group(2)) if audio.group(2) else None
+            layout = CHANNELS_PATTERN.search(line)
+            if layout:
+                name = layout.group(1)
+                info["channels"] = int(name.split()[0]) if name.endswith("channels") else CHANNEL_LAYOUTS.get(name, 2)
+            sample_format = SAMPLE_FORMAT_PATTERN.search(line)
+            if sample_format:
+                # 's32 (24 bit)': 24-bit samples decoded into 32-bit words
+                info["sample_format"] = sample_format.group(1)
+                info["bits_per_sample"] = int(sample_format.group(2) or SAMPLE_FORMAT_BITS[sample_format.group(1)])
+    return info
+
+
+def hls_rung(name):
+    """
+    Encoder settings for a rung: a HLS_LADDER entry, or '<height>p' below the ladder
+    (what ladder_for_source() emits for small sources), with the smallest rung's
+    bitrates scaled by pixel count.
+    """
+    if name in HLS_LADDER:
+        return HLS_LADDER[name]
+    match = re.fullmatch(r"(\d+)p", name)
+    smallest = min(HLS_LADDER.values(), key=lambda rung: rung["height"])
+    if not match or not 0 < int(match.group(1)) < smallest["height"]:
+        raise ConversionError(f"Unknown ladder rung: {name}. Choose from: {', '.join(HLS_LADDER)}")
+    height = int(match.group(1))
+    scale = (height / smallest["height"]) ** 2
+    return {"height": height, **{key: f"{max(1, round(int(smallest[key][:-1]) * scale))}k"
+                                 for key in ("bitrate", "maxrate", "bufsize")}}
+
+
+def ladder_for_source(source_height, rungs=None):
+    """
+    The requested rungs (default: all), minus those taller than the source. Never empty:
+    a source shorter than every rung gets a single rung at its own height (no upscaling).
+    """
+    rungs = list(rungs or HLS_LADDER)
+    for name in rungs:
+        hls_rung(name)      # Rejects unknown names
+    if source_height:
+        fitting = [name for name in rungs if hls_rung(name)["height"] <= source_height]
+        rungs = fitting or [f"{source_height - source_height % 2}p"]     # libx264 4:2:0 needs an even height
+    return rungs
+
+
+# --- HEADLESS API ---
+@dataclass
+class VideoOptions:
+    crf: str = QUALITY_LEVELS["2"]["crf"]        # Video route only
+    preset: str = QUALITY_LEVELS["2"]["preset"]  # Video and HLS routes
+    audio_bitrate: str = None                    # Audio and HLS routes; None = the format's default
+    ladder: list = None                          # HLS route only: rung names, None = every rung that fits
+    segment_seconds: int = 6                     # HLS route only
+    include_audio: bool = None                   # HLS route only; None = when the source has audio
+    thumbnail_count: int = 16                    # Thumbnails route only
+    thumbnail_mode: str = "keyframes"            # Thumbnails route only: keyframes, scene or interval
+    thumbnail_width: int = 160                   # Thumbnails route only: tile width in pixels
+
+
+# The output format decides the route: video container, audio-only, GIF, HLS ladder or thumbnails
+ROUTE_SUFFIXES = {"video": "converted", "audio": "audio", "gif": "anim", "hls": "hls", "thumbnails": "thumbs"}
+FOLDER_ROUTES = {"hls", "thumbnails"}
+ROUTES = {
+    **{details['id']: "video" for details in VIDEO_OUTPUT_FORMATS.values()},
+    **{details['id']: "audio" for details in AUDIO_OUTPUT_FORMATS.values()},
+    **{details['id']: "gif" for details in GIF_OUTPUT_FORMATS.values()},
+    **{details['id']: "hls" for details in HLS_OUTPUT_FORMATS.values()},
+    **{details['id']: "thumbnails" for details in THUMBNAIL_OUTPUT_FORMATS.values()},
+}
+
+
+def build_ladder_command(input_path, output_dir, rungs, has_audio, preset="veryfast",
+                         audio_bitrate="128k", segment_seconds=6):
+    """
+    One ffmpeg run for the whole ladder: the source is decoded once, 'split' fans the
+    frames out to a scaler + libx264 encoder per rung, and the audio is encoded once
+    as a shared rendition group. Keyframes are forced on segment boundaries so every
+    rendition switches cleanly.
+    """
+    count = len(rungs)
+    split = f"[0:v]split={count}" + "".join(f"[s{i}]" for i in range(count))
+    scales = [f"[s{i}]scale=-2:{hls_rung(name)['height']}[v{i}]" for i, name in enumerate(rungs)]
+    command = [FFMPEG_PATH, "-y", "-hide_banner", "-i", input_path,
+               "-filter_complex", ";".join([split] + scales)]
+
+    for i, name in enumerate(rungs):
+        rung = hls_rung(name)
+        command += ["-map", f"[v{i}]", f"-c:v:{i}", "libx264", f"-b:v:{i}", rung["bitrate"],
+                    f"-maxrate:v:{i}", rung["maxrate"], f"-bufsize:v:{i}", rung["bufsize"]]
+    command += ["-preset", preset, "-pix_fmt", "yuv420p", "-sc_threshold", "0",
+                "-force_key_frames", f"expr:gte(t,n_forced*{segment_seconds})"]
+
+    variants = [f"v:{i},name:{name}" for i, name in enumerate(rungs)]
+    if has_audio:
+        command += ["-map", "0:a:0", "-c:a", "aac", "-b:a", audio_bitrate, "-ac", "2"]
+        variants = ["a:0,agroup:audio,name:audio"] + [f"{v},agroup:audio" for v in variants]
+
+    command += [
+        "-f", "hls", "-hls_time", str(segment_seconds), "-hls_playlist_type", "vod",
+        "-hls_flags", "independent_segments", "-hls_segment_type", "mpegts",
+        "-hls_segment_filename", os.path.join(output_dir, "%v", "segment_%05d.ts"),
+        "-master_pl_name", HLS_MASTER_PLAYLIST,
+        "-var_stream_map", " ".join(variants),
+        os.path.join(output_dir, "%v", "index.m3u8"),
+    ]
+    return command
+
+
+class VideoConverter(Converter):
+    category = "Video"
+    formats = {details['id']: details
+               for table in (VIDEO_OUTPUT_FORMATS, AUDIO_OUTPUT_FORMATS, GIF_OUTPUT_FORMATS, HLS_OUTPUT_FORMATS,
+                             THUMBNAIL_OUTPUT_FORMATS)
+               for details in table.values()}
+    options_class = VideoOptions
+
+    def default_output_path(self, input_path, output_format, options):
+        base_name = os.path.splitext(input_path)[0]
+        if ROUTES[output_format] in FOLDER_ROUTES:
+            return f"{base_name}_{ROUTE_SUFFIXES[ROUTES[output_format]]}"     # A folder of outputs
+        return f"{base_name}_{ROUTE_SUFFIXES[ROUTES[output_format]]}.{output_format}"
+
+    def coerce_options(self, options):
+        options = super().coerce_options(options)
+        for name in ("thumbnail_count", "thumbnail_width", "segment_seconds"):
+            value = getattr(options, name)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                raise ConversionError(f"'{name}' must be a whole number of at least 1 (got {value!r}).")
+        return options
+
+    def prepare(self, job):
+        job = super().prepare(job)
+        if ROUTES[job.output_format] != "hls":
+            return job
+        # Resolve the ladder against the source now, so build_command() stays a pure argv builder
+        source = probe_media(job.input_path)
+        if source["video_codec"] is None:
+            raise ConversionError("The input has no video stream to build a ladder from.")
+        include_audio = source["has_audio"] if job.options.include_audio is None else job.options.include_audio
+        if include_audio and not source["has_audio"]:
+            raise ConversionError("The input has no audio stream.")
+        options = replace(job.options, ladder=ladder_for_source(source["height"], job.options.ladder),
+                          include_audio=include_audio)
+        return replace(job, options=options)
+
+    def build_stream(self, job):
+        stream = ffmpeg.input(job.input_path)
+        route = ROUTES[job.output_format]
+        if route == "video":
+            # We pass 'stream' (the whole container) instead of stream.video/stream.audio
+            # This prevents errors if the input file has no audio.
+            return ffmpeg.output(stream, job.output_path, vcodec='libx264', acodec='aac',
+                                 crf=job.options.crf, preset=job.options.preset)
+        if route == "audio":
+            fmt = self.formats[job.output_format]
+            kwargs = {'acodec': fmt['codec']}
+            bitrate = job.options.audio_bitrate or fmt['bitrate']
+            if bitrate:
+                kwargs['audio_bitrate'] = bitrate
+            return ffmpeg.output(stream.audio, job.output_path, **kwargs)
+        # Basic GIF creation.
+        # For better results in production, one would usually add palettegen/paletteuse filters,
+        # but this keeps it simple and functional.
+        return ffmpeg.output(stream.video, job.output_path)
+
+    def build_command(self, job):
+        if ROUTES[job.output_format] == "thumbnails":
+            return None     # Several short ffmpeg runs plus Pillow work, see execute()
+        if ROUTES[job.output_format] == "hls":
+            return build_ladder_command(
+                job.input_path, job.output_path, job.options.ladder, job.options.include_audio,
+                preset=job.options.preset, audio_bitrate=job.options.audio_bitrate or "128k",
+                segment_seconds=job.options.segment_seconds)
+        # We must pass the manual executable path from imageio
+        return ffmpeg.compile(self.build_stream(job), cmd=FFMPEG_PATH, overwrite_output=True)
+
+    def execute(self, job):
+        if ROUTES[job.output_format] == "thumbnails":
+            from video_thumbnails import create_thumbnails
+            summary = create_thumbnails(job.input_path, job.output_path, job.options.thumbnail_count,
+                                        job.options.thumbnail_mode, job.options.thumbnail_width)
+            return job.output_path, "", summary
+        if ROUTES[job.output_format] == "hls":
+            os.makedirs(job.output_path, exist_ok=True)
+        return super().execute(job)
+
+    def finish_command(self, job, returncode, stdout, stderr):
+        output_path, stderr, metadata = super().finish_command(job, returncode, stdout, stderr)
+        if ROUTES[job.output_format] == "hls":
+            master = os.path.join(job.output_path, HLS_MASTER_PLAYLIST)
+            if not os.path.exists(master):
+                raise ConversionError("ffmpeg finished but wrote no master playlist.", stderr)
+            metadata = {"master_playlist": master, "renditions": list(job.options.ladder)}
+        return output_path, stderr, metadata
+
+
+CONVERTER = VideoConverter()
+
+
+def run_conversion(job, summary_panel):
     console.print(summary_panel)
     
     with Status("[bold green]Processing... (This usually takes time)[/]", spinner="dots"):
         try:
-            # We must pass the manual executable path from imageio
-            ffmpeg.run(ffmpeg_stream, overwrite_output=True, quiet=True, cmd=FFMPEG_PATH)
+            result = CONVERTER.convert(job)
             
+            saved = result.metadata.get("master_playlist", result.output_path)
             console.print(Panel(
-                f"🎉 [success]Success![/] File saved:\n[path]{output_path}[/]",
+                f"🎉 [success]Success![/] File saved:\n[path]{saved}[/]\n"
+                f"[info]Size:[/info] {result.bytes_written / 1024 / 1024:.2f} MB  [info]Time:[/info] {result.elapsed:.1f}s",
                 title="[bold green]Done[/]", border_style="green"
             ))
-        except ffmpeg.Error as e:
-            error_msg = e.stderr.decode('utf-8', errors='ignore') if e.stderr else "Unknown FFmpeg error"
+            return result
+        except ConversionError as e:
+            error_msg = e.stderr or str(e) or "Unknown FFmpeg error"
             console.print(Panel(
                 f"[danger]Conversion Failed[/]\n[dim]{error_msg}[/]",
                 title="[bold red]Error[/]", border_style="red"
             ))
         except Exception as e:
             console.print(Panel(f"[danger]Unexpected Error: {e}[/]", title="[bold red]Exception[/]"))
+    return None
 
 def main(input_file_path=None):
     display_intro()
@@ -142,55 +426,99 @@ def main(input_file_path=None):
         console.print(Panel(f"Input: [path]{input_file_path}[/]", title="[bold green]File Loaded[/]"))
 
     conversion_type = get_conversion_type()
-    base_name = os.path.splitext(input_file_path)[0]
-    
-    # Initialize the input stream
-    stream = ffmpeg.input(input_file_path)
 
     # --- ROUTE 1: Video -> Video ---
     if conversion_type == "video":
         fmt = get_output_format(VIDEO_OUTPUT_FORMATS)
         qual = get_quality_setting()
-        output_path = f"{base_name}_converted.{fmt['id']}"
-        
+        job = ConversionJob(input_file_path, fmt['id'], VideoOptions(crf=qual['crf'], preset=qual['preset']))
         summary = Panel(f"[info]Mode:[/info] Video Conversion\n[info]Target:[/info] {fmt['id'].upper()}\n[info]Quality:[/info] {qual['label']}", title="Summary")
-        
-        # We pass 'stream' (the whole container) instead of stream.video/stream.audio
-        # This prevents errors if the input file has no audio.
-        ffmpeg_stream = ffmpeg.output(stream, output_path,
-                                      vcodec='libx264', acodec='aac',
-                                      crf=qual['crf'], preset=qual['preset'])
-        
-        run_conversion(ffmpeg_stream, output_path, summary)
+        run_conversion(job, summary)
 
     # --- ROUTE 2: Video -> Audio ---
     elif conversion_type == "audio":
         fmt = get_output_format(AUDIO_OUTPUT_FORMATS)
-        output_path = f"{base_name}_audio.{fmt['id']}"
-        
+        job = ConversionJob(input_file_path, fmt['id'])
         summary = Panel(f"[info]Mode:[/info] Audio Extraction\n[info]Target:[/info] {fmt['id'].upper()}", title="Summary")
-        
-        # Build arguments based on format requirements
-        kwargs = {'acodec': fmt['codec']}
-        if fmt['bitrate']:
-            kwargs['audio_bitrate'] = fmt['bitrate']
-            
-        ffmpeg_stream = ffmpeg.output(stream.audio, output_path, **kwargs)
-        run_conversion(ffmpeg_stream, output_path, summary)
+        run_conversion(job, summary)
         
     # --- ROUTE 3: Video -> GIF ---
     elif conversion_type == "gif":
         fmt = get_output_format(GIF_OUTPUT_FORMATS)
-        output_path = f"{base_name}_anim.{fmt['id']}"
-        
+        job = ConversionJob(input_file_path, fmt['id'])
         summary = Panel(f"[info]Mode:[/info] GIF Creation", title="Summary")
-        
-        # Basic GIF creation. 
-        # For better results in production, one would usually add palettegen/paletteuse filters,
-        # but this keeps it simple and functional.
-        ffmpeg_stream = ffmpeg.output(stream.video, output_path)
-        run_conversion(ffmpeg_stream, output_path, summary)
+        run_conversion(job, summary)
+
+    # --- ROUTE 4: Video -> HLS ladder ---
+    elif conversion_type == "hls":
+        rungs = get_ladder_rungs(input_file_path)
+        job = ConversionJob(input_file_path, "hls", VideoOptions(preset="veryfast", ladder=rungs))
+        summary = Panel(f"[info]Mode:[/info] HLS Ladder\n[info]Renditions:[/info] {', '.join(rungs)}", title="Summary")
+        run_conversion(job, summary)
+
+    # --- ROUTE 5: Video -> Thumbnails ---
+    elif conversion_type == "thumbnails":
+        count = IntPrompt.ask("[prompt]➡️  How many thumbnails?[/prompt]", default=16)
+        job = ConversionJob(input_file_path, "thumbnails", VideoOptions(thumbnail_count=count))
+        summary = Panel(f"[info]Mode:[/info] Thumbnails\n[info]Frames:[/info] {count} (keyframes)", title="Summary")
+        result = run_conversion(job, summary)
+        if result:
+            console.print(f"[info]{result.metadata['ms_per_frame']:.1f} ms per frame[/]")
+
+
+# --- LADDER BENCHMARK ---
+def _timed_run(command):
+    """Runs ffmpeg and returns (wall seconds, CPU seconds) for it."""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    process = subprocess.run(command, capture_output=True)
+    wall = time.perf_counter() - started
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    if process.returncode != 0:
+        raise ConversionError("ffmpeg failed during the benchmark.", process.stderr.decode("utf-8", errors="replace"))
+    return wall, (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+
+
+def benchmark_ladder(input_path, runs=1, preset="veryfast", rungs=None):
+    """Times the single-decode ladder against one ffmpeg run (and decode) per rung."""
+    source = probe_media(input_path)
+    rungs = ladder_for_source(source["height"], rungs)
+    has_audio = source["has_audio"]
+    single, separate = [], []
+    work_dir = tempfile.mkdtemp(prefix="hls_bench_")
+    try:
+        for run in range(runs):
+            out = os.path.join(work_dir, f"single_{run}")
+            single.append(_timed_run(build_ladder_command(input_path, out, rungs, has_audio, preset=preset)))
+            totals = [0.0, 0.0]
+            for name in rungs:
+                out = os.path.join(work_dir, f"separate_{run}_{name}")
+                wall, cpu = _timed_run(build_ladder_command(input_path, out, [name], has_audio, preset=preset))
+                totals[0] += wall
+                totals[1] += cpu
+            separate.append(tuple(totals))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    best_single, best_separate = min(single), min(separate)
+    table = Table(title=f"[bold green]HLS Ladder: {len(rungs)} renditions ({', '.join(rungs)})[/]", border_style="cyan")
+    table.add_column("Strategy", style="bold blue")
+    table.add_column("Wall (s)", justify="right")
+    table.add_column("CPU (s)", justify="right")
+    table.add_row("Single decode + split", f"{best_single[0]:.2f}", f"{best_single[1]:.2f}")
+    table.add_row(f"{len(rungs)} separate runs", f"{best_separate[0]:.2f}", f"{best_separate[1]:.2f}")
+    console.print(table)
+    console.print(f"[success]Single pass saves {1 - best_single[0] / best_separate[0]:.0%} wall time "
+                  f"and {1 - best_single[1] / best_separate[1]:.0%} CPU time.[/]")
+    return {"rungs": rungs, "single": best_single, "separate": best_separate}
 
 if __name__ == '__main__':
-    # If run directly
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Convert videos, extract audio, make GIFs or HLS ladders.")
+    parser.add_argument("--bench-ladder", metavar="VIDEO", help="Benchmark the single-pass HLS ladder against separate runs.")
+    parser.add_argument("--runs", type=int, default=1, help="Benchmark repetitions (best run is reported).")
+    parser.add_argument("--preset", default="veryfast", help="x264 preset used for the benchmark.")
+    args = parser.parse_args()
+    if args.bench_ladder:
+        benchmark_ladder(args.bench_ladder, args.runs, args.preset)
+    else:
+        main()
@@ -0,0 +1,249 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from conversion_api import ConversionError
+from video_conversion import FFMPEG_PATH, probe_media
+
+# RICH: Import necessary components
+from rich.console import Console
+from rich.theme import Theme
+from rich.panel import Panel
+from rich.table import Table
+
+# RICH: Define theme and console
+custom_theme = Theme({
+    "info": "dim cyan", "warning": "magenta", "danger": "bold red",
+    "success": "bold green", "prompt": "bold yellow", "path": "bold cyan",
+    "format": "bold blue",
+})
+console = Console(theme=custom_theme)
+
+# --- THUMBNAIL CONFIG ---
+# keyframes: decode only keyframes to find candidates (fast, default)
+# scene:     decode every (downscaled) frame and keep scene changes (slower, better picks)
+# interval:  evenly spaced timestamps, no analysis pass
+THUMBNAIL_MODES = ["keyframes", "scene", "interval"]
+DEFAULT_COUNT = 16
+DEFAULT_WIDTH = 160
+DEFAULT_COLUMNS = 5
+SCENE_THRESHOLD = 0.3
+SCENE_ANALYSIS_WIDTH = 320      # Scene scores barely change at lower resolution, but decoding does
+SPRITE_NAME, VTT_NAME, POSTER_NAME = "sprite.jpg", "thumbnails.vtt", "poster.jpg"
+JPEG_QUALITY = 85
+
+PTS_TIME_PATTERN = re.compile(r"pts_time:\s*(-?\d+(?:\.\d+)?)")
+
+
+# --- Finding candidate timestamps ---
+
+def _showinfo_times(command):
+    """Runs an ffmpeg analysis pass ending in 'showinfo' and returns the frame timestamps it printed."""
+    process = subprocess.run(command, capture_output=True)
+    stderr = process.stderr.decode("utf-8", errors="replace")
+    if process.returncode != 0:
+        raise ConversionError("ffmpeg could not analyse the video.", stderr)
+    return [float(t) for t in PTS_TIME_PATTERN.findall(stderr)]
+
+
+def keyframe_times(input_path):
+    """Keyframe timestamps. '-skip_frame nokey' makes the decoder drop every other frame."""
+    return _showinfo_times([
+        FFMPEG_PATH, "-hide_banner", "-skip_frame", "nokey", "-i", input_path,
+        "-map", "0:v:0", "-an", "-vf", "showinfo", "-f", "null", "-",
+    ])
+
+
+def scene_change_times(input_path, threshold=SCENE_THRESHOLD):
+    """Timestamps where the scene score exceeds 'threshold', plus the first frame."""
+    times = _showinfo_times([
+        FFMPEG_PATH, "-hide_banner", "-i", input_path, "-map", "0:v:0", "-an",
+        "-vf", f"scale={SCENE_ANALYSIS_WIDTH}:-2,select='gt(scene,{threshold})',showinfo", "-f", "null", "-",
+    ])
+    return [0.0] + [t for t in times if t > 0]
+
+
+def pick_evenly(candidates, count):
+    """'count' candidates spread evenly over the sorted list (all of them if there are fewer)."""
+    candidates = sorted(set(round(t, 3) for t in candidates))
+    if len(candidates) <= count:
+        return candidates
+    indices = np.unique(np.linspace(0, len(candidates) - 1, count).round().astype(int))
+    return [candidates[i] for i in indices]
+
+
+def interval_times(duration, count):
+    step = duration / count
+    return [round(step * i + step / 2, 3) for i in range(count)]
+
+
+def select_times(input_path, count, mode, duration):
+    if mode == "interval" or not duration:
+        return interval_times(duration or count, count)
+    candidates = keyframe_times(input_path) if mode == "keyframes" else scene_change_times(input_path)
+    times = pick_evenly(candidates, count)
+    if len(times) < count and duration:
+        # Too few keyframes/scene changes (e.g. a static shot): top up with even spacing
+        times = sorted(set(times) | set(interval_times(duration, count - len(times))))
+    return times
+
+
+# --- Grabbing frames ---
+
+def grab_frame(input_path, timestamp, width, height):
+    """
+    Decodes one frame at 'timestamp' as an RGB array. '-ss' before '-i' seeks the
+    demuxer to the nearest keyframe, so a keyframe timestamp costs a single decode.
+    """
+    command = [
+        FFMPEG_PATH, "-v", "error", "-ss", f"{timestamp:.3f}", "-i", input_path,
+        "-map", "0:v:0", "-frames:v", "1", "-vf", f"scale={width}:{height}",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1",
+    ]
+    process = subprocess.run(command, capture_output=True)
+    frame_bytes = width * height * 3
+    if process.returncode != 0 or len(process.stdout) < frame_bytes:
+        return None
+    return np.frombuffer(process.stdout[:frame_bytes], dtype=np.uint8).reshape(height, width, 3)
+
+
+def thumbnail_size(source, width):
+    if not source.get("width") or not source.get("height"):
+        return width, round(width * 9 / 16 / 2) * 2
+    return width, max(2, round(width * source["height"] / source["width"] / 2) * 2)
+
+
+# --- Sprite sheet and WebVTT index ---
+
+def tile_sprite(frames, columns):
+    """Packs equally sized frames into one row-major grid."""
+    height, width = frames[0].shape[:2]
+    rows = math.ceil(len(frames) / columns)
+    sheet = np.zeros((rows * height, columns * width, 3), dtype=np.uint8)
+    for index, frame in enumerate(frames):
+        row, col = divmod(index, columns)
+        sheet[row * height:(row + 1) * height, col * width:(col + 1) * width] = frame
+    return sheet
+
+
+def _vtt_timestamp(seconds):
+    # Round to whole milliseconds first, so 59.9996 s becomes 00:01:00.000, not 00:00:60.000
+    hours, remainder = divmod(round(seconds * 1000), 3600_000)
+    minutes, millis = divmod(remainder, 60_000)
+    return f"{hours:02d}:{minutes:02d}:{millis // 1000:02d}.{millis % 1000:03d}"
+
+
+def build_webvtt(times, duration, width, height, columns, sprite_name=SPRITE_NAME):
+    """One cue per tile, lasting until the next thumbnail, pointing at its region of the sprite."""
+    lines = ["WEBVTT", ""]
+    for index, start in enumerate(times):
+        start = 0.0 if index == 0 else start     # Cover the timeline from the very beginning
+        end = times[index + 1] if index + 1 < len(times) else max(duration or 0, start + 1)
+        row, col = divmod(index, columns)
+        lines += [f"{_vtt_timestamp(start)} --> {_vtt_timestamp(end)}",
+                  f"{sprite_name}#xywh={col * width},{row * height},{width},{height}", ""]
+    return "\n".join(lines)
+
+
+def pick_poster(frames):
+    """The most detailed frame (highest luma contrast), which skips black and fade frames."""
+    return max(range(len(frames)), key=lambda i: frames[i].mean(axis=2).std())
+
+
+def create_thumbnails(input_path, output_dir, count=DEFAULT_COUNT, mode="keyframes",
+                      width=DEFAULT_WIDTH, columns=DEFAULT_COLUMNS, max_workers=None):
+    """
+    Writes sprite.jpg, thumbnails.vtt and poster.jpg into 'output_dir' and returns a
+    summary dict with the chosen timestamps and per-phase timings.
+    """
+    if mode not in THUMBNAIL_MODES:
+        raise ConversionError(f"Unknown thumbnail mode '{mode}'. Choose from: {', '.join(THUMBNAIL_MODES)}")
+    if count < 1 or width < 1:
+        raise ConversionError("Thumbnail count and width must be at least 1.")
+    source = probe_media(input_path)
+    if source["video_codec"] is None:
+        raise ConversionError("The input has no video stream.")
+    width, height = thumbnail_size(source, width)
+
+    started = time.perf_counter()
+    times = select_times(input_path, count, mode, source["duration"])
+    analysed = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, os.cpu_count() or 2)) as pool:
+        grabbed = list(pool.map(lambda t: grab_frame(input_path, t, width, height), times))
+    pairs = [(t, frame) for t, frame in zip(times, grabbed) if frame is not None]
+    if not pairs:
+        raise ConversionError("No frames could be decoded from the video.")
+    times, frames = [t for t, _ in pairs], [frame for _, frame in pairs]
+    decoded = time.perf_counter()
+
+    os.makedirs(output_dir, exist_ok=True)
+    columns = min(columns, len(frames))
+    Image.fromarray(tile_sprite(frames, columns)).save(os.path.join(output_dir, SPRITE_NAME), quality=JPEG_QUALITY)
+    with open(os.path.join(output_dir, VTT_NAME), "w", encoding="utf-8") as f:
+        f.write(build_webvtt(times, source["duration"], width, height, columns))
+    poster_index = pick_poster(frames)
+    poster_time = times[poster_index]
+    # The poster is re-grabbed at the source's own size rather than upscaled from a tile
+    poster = grab_frame(input_path, poster_time, *thumbnail_size(source, source.get("width") or width))
+    Image.fromarray(poster if poster is not None else frames[poster_index]).save(
+        os.path.join(output_dir, POSTER_NAME), quality=JPEG_QUALITY)
+    finished = time.perf_counter()
+
+    return {
+        "mode": mode, "frames": len(frames), "tile": [width, height], "columns": columns,
+        "times": times, "poster_time": poster_time,
+        "analysis_seconds": analysed - started, "decode_seconds": decoded - analysed,
+        "ms_per_frame": (decoded - analysed) * 1000 / len(frames),
+        "total_seconds": finished - started,
+    }
+
+
+def display_summary(summary, output_dir):
+    table = Table(title="[bold green]Thumbnails[/]", border_style="cyan")
+    table.add_column("Metric", style="bold blue")
+    table.add_column("Value", justify="right")
+    table.add_row("Mode", summary["mode"])
+    table.add_row("Frames", str(summary["frames"]))
+    table.add_row("Tile size", f"{summary['tile'][0]}x{summary['tile'][1]}")
+    table.add_row("Analysis pass", f"{summary['analysis_seconds'] * 1000:.0f} ms")
+    table.add_row("Frame grabs", f"{summary['ms_per_frame']:.1f} ms/frame")
+    table.add_row("Total", f"{summary['total_seconds']:.2f} s")
+    console.print(table)
+    console.print(Panel(
+        f"[path]{os.path.join(output_dir, SPRITE_NAME)}[/]\n[path]{os.path.join(output_dir, VTT_NAME)}[/]\n"
+        f"[path]{os.path.join(output_dir, POSTER_NAME)}[/]",
+        title="[bold green]Saved[/]", border_style="green"
+    ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Poster frame, sprite sheet and WebVTT scrubbing index for a video.")
+    parser.add_argument("video")
+    parser.add_argument("--out", help="Output folder (default: '<video>_thumbs').")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT)
+    parser.add_argument("--mode", choices=THUMBNAIL_MODES, default="keyframes")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH, help="Tile width in pixels.")
+    parser.add_argument("--columns", type=int, default=DEFAULT_COLUMNS)
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+    args = parser.parse_args()
+
+    output_dir = args.out or f"{os.path.splitext(args.video)[0]}_thumbs"
+    try:
+        summary = create_thumbnails(args.video, output_dir, args.count, args.mode, args.width, args.columns)
+    except ConversionError as e:
+        console.print(Panel(f"[danger]{e}[/]\n[dim]{e.stderr}[/]", title="[bold red]Error[/]", border_style="red"))
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        display_summary(summary, output_dir)
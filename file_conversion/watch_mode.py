@@ -0,0 +1,413 @@
+import os
+import sys
+import json
+import time
+import errno
+import fnmatch
+import select
+import sqlite3
+import struct
+import ctypes
+import ctypes.util
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from conversion_api import ConversionError
+
+# RICH: Import necessary components
+from rich.console import Console
+from rich.theme import Theme
+from rich.panel import Panel
+
+# RICH: Define theme and console
+custom_theme = Theme({
+    "info": "dim cyan", "warning": "magenta", "danger": "bold red",
+    "success": "bold green", "prompt": "bold yellow", "path": "bold cyan",
+    "format": "bold blue",
+})
+console = Console(theme=custom_theme)
+
+# --- WATCH CONFIG ---
+RULES_FILE = ".convert.json"        # Per-folder rules, re-read whenever it changes
+STATE_DB = ".convert_state.db"      # Per-folder record of what has been processed
+DEFAULT_OUTPUT_DIR = "converted"
+DEFAULT_SETTLE_SECONDS = 2.0        # A file is ready once size and mtime stop changing for this long
+POLL_INTERVAL = 1.0
+# Partial downloads and editor/office lock files are never converted
+IGNORED_PATTERNS = [".*", "~$*", "*.part", "*.partial", "*.crdownload", "*.tmp", "*.download"]
+
+# Example .convert.json:
+# {
+#   "output_dir": "converted",
+#   "rules": [
+#     {"match": "*.wav", "format": "mp3", "options": {"bitrate": "192k"}},
+#     {"type": "Image", "format": "webp", "options": {"quality": 80}}
+#   ]
+# }
+
+
+# --- inotify (Linux) with a polling fallback ---
+IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE = 0x2, 0x8, 0x80, 0x100
+IN_DELETE_SELF, IN_ISDIR, IN_NONBLOCK = 0x400, 0x40000000, 0x800
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Minimal ctypes binding: reports paths that were created, written or moved in."""
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+
+    def add(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+        self.directories[wd] = directory
+
+    def read(self, timeout):
+        """Changed paths (files and new directories) within 'timeout' seconds."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changed, offset = [], 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            if mask & IN_DELETE_SELF:
+                self.directories.pop(wd, None)
+            elif name and wd in self.directories:
+                changed.append(os.path.join(self.directories[wd], os.fsdecode(name)))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback for platforms without inotify: every path is re-checked each interval."""
+    def __init__(self):
+        self.directories = {}
+
+    def add(self, directory):
+        self.directories[directory] = directory
+
+    def read(self, timeout):
+        time.sleep(timeout)
+        return [entry.path for directory in list(self.directories) if os.path.isdir(directory)
+                for entry in os.scandir(directory)]
+
+    def close(self):
+        pass
+
+
+def make_watcher(force_polling=False):
+    if not force_polling:
+        try:
+            return InotifyWatcher()
+        except OSError as e:
+            console.print(f"[warning]inotify unavailable ({e.strerror}); falling back to polling.[/]")
+    return PollingWatcher()
+
+
+# --- Per-folder rules and state ---
+
+def validate_rules(config, source):
+    """Checks the shape of a rules config (see the example above); raises ConversionError naming 'source'."""
+    def invalid(problem):
+        return ConversionError(f"Invalid rules in {source}: {problem}")
+
+    if not isinstance(config, dict):
+        raise invalid("expected a JSON object")
+    if not isinstance(config.get("output_dir", ""), str):
+        raise invalid("'output_dir' must be a string")
+    ignore = config.get("ignore", [])
+    if not isinstance(ignore, list) or not all(isinstance(pattern, str) for pattern in ignore):
+        raise invalid("'ignore' must be a list of glob strings")
+    rules = config.get("rules", [])
+    if not isinstance(rules, list):
+        raise invalid("'rules' must be a list")
+    for number, rule in enumerate(rules, 1):
+        if not isinstance(rule, dict):
+            raise invalid(f"rule {number} is not an object")
+        if not isinstance(rule.get("format"), str) or not rule["format"]:
+            raise invalid(f"rule {number} has no 'format'")
+        for key in ("match", "type"):
+            if not isinstance(rule.get(key, ""), str):
+                raise invalid(f"rule {number}: '{key}' must be a string")
+        if not isinstance(rule.get("options", {}), dict):
+            raise invalid(f"rule {number}: 'options' must be an object")
+    return config
+
+
+class FolderRules:
+    """Rules for one watched folder, reloaded when its .convert.json changes."""
+    def __init__(self, root, default_rules=None):
+        self.root = root
+        self.default_rules = validate_rules(default_rules or {}, "the default rules")
+        self._loaded_mtime = None
+        self.config = dict(self.default_rules)
+
+    def refresh(self):
+        path = os.path.join(self.root, RULES_FILE)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        if mtime == self._loaded_mtime:
+            return
+        self._loaded_mtime = mtime
+        self.config = dict(self.default_rules)
+        if mtime is not None:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.config.update(validate_rules(json.load(f), path))
+                console.print(f"[info]Loaded rules from[/] [path]{path}[/]")
+            except (OSError, ValueError) as e:
+                console.print(f"[danger]Ignoring {path}: {e}[/]")
+            except ConversionError as e:
+                console.print(f"[danger]{e}; ignoring it.[/]")
+
+    @property
+    def output_dir(self):
+        return os.path.join(self.root, self.config.get("output_dir", DEFAULT_OUTPUT_DIR))
+
+    def rule_for(self, path, file_type):
+        """The first rule whose 'match' glob and/or 'type' fits the file, or None."""
+        name = os.path.basename(path)
+        for rule in self.config.get("rules", []):
+            if "match" in rule and not fnmatch.fnmatch(name.lower(), rule["match"].lower()):
+                continue
+            if "type" in rule and rule["type"] != file_type:
+                continue
+            return rule
+        return None
+
+
+def rule_key(rule):
+    return json.dumps(rule, sort_keys=True)
+
+
+class StateDB:
+    """
+    Remembers (size, mtime, rule) of every processed file, so restarts skip old work
+    while files that change, or whose rule changes, are converted again.
+    """
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, size INTEGER, mtime REAL, rule TEXT, status TEXT,
+                output TEXT, error TEXT, processed_at REAL
+            )""")
+
+    def is_done(self, path, stat, rule):
+        # Failed files are retried on restart; only a finished conversion counts
+        row = self.db.execute("SELECT size, mtime, rule FROM files WHERE path = ? AND status = 'done'",
+                              (path,)).fetchone()
+        return row is not None and row == (stat.st_size, stat.st_mtime, rule_key(rule))
+
+    def record(self, path, stat, rule, status, output=None, error=None):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (path, stat.st_size, stat.st_mtime, rule_key(rule), status, output, error, time.time()))
+
+    def close(self):
+        self.db.close()
+
+
+# --- The watch loop ---
+
+class HotFolderWatcher:
+    """
+    Watches folders, waits for files to settle, then converts them with the
+    headless converters according to each folder's rules.
+    """
+    def __init__(self, folders, default_rules=None, settle=DEFAULT_SETTLE_SECONDS,
+                 workers=1, force_polling=False, recursive=True):
+        from main import FILE_TYPE_MAPPING, get_converter, convert_file
+        self.file_type_mapping, self.get_converter, self.convert_file = FILE_TYPE_MAPPING, get_converter, convert_file
+        self.settle, self.recursive = settle, recursive
+        self.folders = {os.path.abspath(folder): FolderRules(os.path.abspath(folder), default_rules)
+                        for folder in folders}
+        for rules in self.folders.values():
+            rules.refresh()
+        self.states = {root: StateDB(os.path.join(root, STATE_DB)) for root in self.folders}
+        self.watcher = make_watcher(force_polling)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.pending = {}       # path -> (size, mtime, time the pair was first seen)
+        self.running = {}       # future -> (root, path, stat, rule)
+        self.failed = {}        # path -> (size, mtime, rule) of a failed attempt; retried once any changes
+
+    def _root_for(self, path):
+        return max((root for root in self.folders if path.startswith(root + os.sep)), key=len, default=None)
+
+    def _ignored(self, path, rules):
+        name = os.path.basename(path)
+        if any(fnmatch.fnmatch(name, pattern) for pattern in IGNORED_PATTERNS + rules.config.get("ignore", [])):
+            return True
+        output_dir = rules.output_dir
+        return path == output_dir or path.startswith(output_dir + os.sep)
+
+    def _watch_tree(self, directory, rules):
+        self.watcher.add(directory)
+        if self.recursive:
+            for entry in os.scandir(directory):
+                if entry.is_dir(follow_symlinks=False) and not self._ignored(entry.path, rules):
+                    self._watch_tree(entry.path, rules)
+
+    def _initial_scan(self, root):
+        for directory, subdirs, names in os.walk(root):
+            rules = self.folders[root]
+            subdirs[:] = [d for d in subdirs if self.recursive and not self._ignored(os.path.join(directory, d), rules)]
+            for name in names:
+                self.notice(os.path.join(directory, name))
+
+    def notice(self, path):
+        """Marks a path as possibly new or changed; it is checked for stability on the next tick."""
+        root = self._root_for(path)
+        if root is None or self._ignored(path, self.folders[root]):
+            return
+        if os.path.isdir(path):
+            if self.recursive and path not in self.watcher.directories.values():
+                self._watch_tree(path, self.folders[root])
+                # A folder moved in with files already inside produces no per-file events
+                for name in os.listdir(path):
+                    self.notice(os.path.join(path, name))
+            return
+        self.pending.setdefault(path, None)
+
+    def _settled(self, now):
+        """Pending paths whose size and mtime have not changed for 'settle' seconds."""
+        ready = []
+        for path, seen in list(self.pending.items()):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                del self.pending[path]
+                continue
+            signature = (stat.st_size, stat.st_mtime)
+            if seen is None or seen[:2] != signature:
+                self.pending[path] = (*signature, now)
+            elif now - seen[2] >= self.settle:
+                del self.pending[path]
+                ready.append((path, stat))
+        return ready
+
+    def _submit(self, path, stat):
+        root = self._root_for(path)
+        rules, state = self.folders[root], self.states[root]
+        file_type = self.file_type_mapping.get(os.path.splitext(path)[1].lower(), (None,))[0]
+        rule = rules.rule_for(path, file_type) if file_type else None
+        if rule is None:
+            return      # Not recorded, so a rule added later still picks the file up
+        if state.is_done(path, stat, rule) or any(running[1] == path for running in self.running.values()):
+            return
+        if self.failed.get(path) == (stat.st_size, stat.st_mtime, rule_key(rule)):
+            return      # The polling backend re-notices every file each interval
+        relative = os.path.splitext(os.path.relpath(path, root))[0]
+        extension = self.get_converter(path).output_extension(rule["format"])
+        output_path = os.path.join(rules.output_dir, f"{relative}.{extension}")
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        console.print(f"[info]→[/] [path]{os.path.relpath(path, root)}[/] [info]to[/] [format]{rule['format']}[/]")
+        future = self.pool.submit(self.convert_file, path, rule["format"], rule.get("options"), output_path)
+        self.running[future] = (root, path, stat, rule)
+
+    def _collect(self):
+        for future in [f for f in self.running if f.done()]:
+            root, path, stat, rule = self.running.pop(future)
+            try:
+                result = future.result()
+                self.states[root].record(path, stat, rule, "done", result.output_path)
+                console.print(f"[success]✓[/] [path]{os.path.relpath(result.output_path, root)}[/] "
+                              f"[info]({result.elapsed:.1f}s)[/]")
+            except Exception as e:
+                # Any one file's failure (a converter bug, a permissions error...) must not stop the watcher
+                error = str(e) if isinstance(e, ConversionError) else f"{type(e).__name__}: {e}"
+                self.states[root].record(path, stat, rule, "failed", error=error)
+                self.failed[path] = (stat.st_size, stat.st_mtime, rule_key(rule))
+                console.print(f"[danger]✗ {os.path.relpath(path, root)}: {error}[/]")
+
+    def tick(self, timeout=POLL_INTERVAL):
+        for rules in self.folders.values():
+            rules.refresh()
+        for path in self.watcher.read(timeout):
+            self.notice(path)
+        for path, stat in self._settled(time.monotonic()):
+            self._submit(path, stat)
+        self._collect()
+
+    def run(self, stop_after=None):
+        """Watches until interrupted (or for 'stop_after' seconds), then waits for running jobs."""
+        for root, rules in self.folders.items():
+            os.makedirs(rules.output_dir, exist_ok=True)
+            self._watch_tree(root, rules)
+            self._initial_scan(root)
+        started = time.monotonic()
+        try:
+            while stop_after is None or time.monotonic() - started < stop_after:
+                self.tick()
+        except KeyboardInterrupt:
+            console.print("\n[warning]Stopping; waiting for running conversions...[/]")
+        finally:
+            self.pool.shutdown(wait=True)
+            self._collect()
+            self.watcher.close()
+            for state in self.states.values():
+                state.close()
+
+
+def watch(folders, default_rules=None, settle=DEFAULT_SETTLE_SECONDS, workers=1, force_polling=False, stop_after=None):
+    missing = [folder for folder in folders if not os.path.isdir(folder)]
+    if missing:
+        raise ConversionError(f"Not a folder: {', '.join(missing)}")
+    watcher = HotFolderWatcher(folders, default_rules, settle, workers, force_polling)
+    console.print(Panel(
+        "\n".join(f"[path]{root}[/] → [path]{rules.output_dir}[/] ({len(rules.config.get('rules', []))} rule(s))"
+                  for root, rules in watcher.folders.items()) +
+        f"\n[info]Backend:[/] {type(watcher.watcher).__name__}  [info]Settle:[/] {settle}s  [info]Workers:[/] {workers}",
+        title="[bold yellow]Watching[/]", border_style="green"
+    ))
+    watcher.run(stop_after)
+
+
+def parse_rule(text):
+    """'*.wav=mp3' or 'Image=webp' from the command line."""
+    selector, _, output_format = text.partition("=")
+    if not output_format:
+        raise argparse.ArgumentTypeError(f"Expected SELECTOR=FORMAT, got '{text}'")
+    key = "match" if any(ch in selector for ch in "*?[.") else "type"
+    return {key: selector, "format": output_format}
+
+
+def add_watch_arguments(parser):
+    parser.add_argument("--rule", action="append", type=parse_rule, default=[], metavar="SELECTOR=FORMAT",
+                        help="Default rule, e.g. '*.wav=mp3' or 'Image=webp' (a folder's .convert.json takes precedence).")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS,
+                        help="Seconds a file's size/mtime must stay unchanged before it is converted.")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--poll", action="store_true", help="Use polling instead of inotify.")
+
+
+def run_from_args(folders, args):
+    try:
+        watch(folders, {"rules": args.rule} if args.rule else None, args.settle, args.workers, args.poll)
+    except ConversionError as e:
+        console.print(Panel(f"[danger]{e}[/]", title="[bold red]Error[/]", border_style="red"))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert files dropped into hot folders.")
+    parser.add_argument("folders", nargs="+")
+    add_watch_arguments(parser)
+    args = parser.parse_args()
+    run_from_args(args.folders, args)
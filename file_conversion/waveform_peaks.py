@@ -0,0 +1,225 @@
+import os
+import sys
+import time
+import struct
+import tempfile
+import argparse
+import subprocess
+
+import numpy as np
+
+from conversion_api import ConversionError
+
+# RICH: Import necessary components
+from rich.console import Console
+from rich.theme import Theme
+from rich.panel import Panel
+from rich.table import Table
+
+# RICH: Define theme and console
+custom_theme = Theme({
+    "info": "dim cyan", "warning": "magenta", "danger": "bold red",
+    "success": "bold green", "prompt": "bold yellow", "path": "bold cyan",
+    "format": "bold blue",
+})
+console = Console(theme=custom_theme)
+
+# --- Peaks file format (little-endian) ---
+# header:  magic "PEAK", version u16, channels u16, sample_rate u32, frames u64, level count u16
+# levels:  per level: samples_per_bucket u32, bucket count u64, data offset u64
+# data:    per level: int16 [bucket][channel][min, max], each level 8-byte aligned
+# Every level is a plain int16 array at a known offset, so a player can np.memmap (or
+# fetch with an HTTP range request) exactly the zoom level it needs.
+MAGIC = b"PEAK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQH")
+LEVEL_ENTRY = struct.Struct("<IQQ")
+PEAKS_EXTENSION = ".peaks"
+BASE_BUCKET = 256           # Samples per bucket at the finest level (~6 ms at 44.1 kHz)
+LEVEL_COUNT = 8             # Each level halves the previous one: 256 ... 32768 samples per bucket
+READ_BLOCK_FRAMES = 1 << 16
+
+
+def _reduce(mins, maxs, factor):
+    """Merges every 'factor' neighbouring buckets; a short tail becomes one last bucket."""
+    full = len(mins) // factor * factor
+    channels = mins.shape[1]
+    new_mins = mins[:full].reshape(-1, factor, channels).min(axis=1)
+    new_maxs = maxs[:full].reshape(-1, factor, channels).max(axis=1)
+    if full < len(mins):
+        new_mins = np.vstack([new_mins, mins[full:].min(axis=0, keepdims=True)])
+        new_maxs = np.vstack([new_maxs, maxs[full:].max(axis=0, keepdims=True)])
+    return new_mins, new_maxs
+
+
+class PeakBuilder:
+    """
+    Accumulates min/max buckets from decoded samples fed in any block size, so it can
+    ride along with whatever decode the conversion is already doing.
+    """
+    def __init__(self, channels, sample_rate, base_bucket=BASE_BUCKET, levels=LEVEL_COUNT):
+        self.channels, self.sample_rate = channels, sample_rate
+        self.base_bucket, self.levels = base_bucket, levels
+        self.frames = 0
+        self._carry = np.empty((0, channels), dtype=np.int16)
+        self._mins, self._maxs = [], []
+
+    def feed(self, samples, full_scale=32768):
+        """'samples' is (frames, channels) of integers in [-full_scale, full_scale) or floats in [-1, 1]."""
+        samples = np.asarray(samples).reshape(-1, self.channels)
+        if samples.dtype.kind == "f":
+            samples = np.clip(samples * 32767, -32768, 32767).astype(np.int16)
+        elif full_scale != 32768:
+            samples = (samples.astype(np.int64) * 32768 // full_scale).astype(np.int16)
+        else:
+            samples = samples.astype(np.int16, copy=False)
+        self.frames += len(samples)
+        if len(self._carry):
+            samples = np.vstack([self._carry, samples])
+        full = len(samples) // self.base_bucket * self.base_bucket
+        if full:
+            buckets = samples[:full].reshape(-1, self.base_bucket, self.channels)
+            self._mins.append(buckets.min(axis=1))
+            self._maxs.append(buckets.max(axis=1))
+        self._carry = samples[full:].copy()
+
+    def finish(self):
+        """Returns [(samples_per_bucket, int16 array of shape (buckets, channels, 2)), ...], finest first."""
+        if len(self._carry):
+            self._mins.append(self._carry.min(axis=0, keepdims=True))
+            self._maxs.append(self._carry.max(axis=0, keepdims=True))
+            self._carry = self._carry[:0]
+        if not self._mins:
+            raise ConversionError("No audio samples were decoded.")
+        mins, maxs = np.vstack(self._mins), np.vstack(self._maxs)
+        levels, samples_per_bucket = [], self.base_bucket
+        for index in range(self.levels):
+            if index:
+                mins, maxs = _reduce(mins, maxs, 2)
+                samples_per_bucket *= 2
+            levels.append((samples_per_bucket, np.stack([mins, maxs], axis=2)))
+            if len(mins) == 1:
+                break
+        return levels
+
+
+def write_peaks(path, levels, channels, sample_rate, frames):
+    offset = HEADER.size + LEVEL_ENTRY.size * len(levels)
+    entries = []
+    for samples_per_bucket, data in levels:
+        offset = (offset + 7) // 8 * 8
+        entries.append((samples_per_bucket, len(data), offset))
+        offset += data.nbytes
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, channels, sample_rate, frames, len(levels)))
+        for entry in entries:
+            f.write(LEVEL_ENTRY.pack(*entry))
+        for (_, _, data_offset), (_, data) in zip(entries, levels):
+            f.write(b"\0" * (data_offset - f.tell()))
+            f.write(data.astype("<i2").tobytes())
+    return path
+
+
+def open_peaks(path):
+    """
+    Reads the header and memory-maps every level without loading any peak data.
+    Returns a dict; levels[i]["data"] is an int16 memmap of shape (buckets, channels, 2).
+    """
+    with open(path, "rb") as f:
+        magic, version, channels, sample_rate, frames, level_count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ConversionError(f"{os.path.basename(path)} is not a version {VERSION} peaks file.")
+        entries = [LEVEL_ENTRY.unpack(f.read(LEVEL_ENTRY.size)) for _ in range(level_count)]
+    levels = [{"samples_per_bucket": samples_per_bucket,
+               "data": np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(buckets, channels, 2))}
+              for samples_per_bucket, buckets, offset in entries]
+    return {"channels": channels, "sample_rate": sample_rate, "frames": frames, "levels": levels}
+
+
+def level_for_zoom(peaks, samples_per_pixel):
+    """The coarsest level that still has at least one bucket per pixel."""
+    fitting = [level for level in peaks["levels"] if level["samples_per_bucket"] <= samples_per_pixel]
+    return fitting[-1] if fitting else peaks["levels"][0]
+
+
+def peaks_path_for(output_path):
+    return os.path.splitext(output_path)[0] + PEAKS_EXTENSION
+
+
+# --- Building from a file or an already decoded segment ---
+
+def peaks_from_segment(segment, output_path):
+    """Peaks for a pydub AudioSegment that has already been decoded for conversion."""
+    builder = PeakBuilder(segment.channels, segment.frame_rate)
+    samples = np.frombuffer(segment.raw_data, dtype={1: np.uint8, 2: "<i2", 4: "<i4"}[segment.sample_width])
+    if segment.sample_width == 1:
+        samples = samples.astype(np.int16) - 128      # 8-bit PCM is unsigned
+    builder.feed(samples, full_scale=1 << (8 * segment.sample_width - 1))
+    write_peaks(output_path, builder.finish(), segment.channels, segment.frame_rate, builder.frames)
+    return output_path
+
+
+def peaks_from_file(input_path, output_path):
+    """Decodes the first audio stream with ffmpeg in fixed blocks, so memory stays flat for any length."""
+    from video_conversion import FFMPEG_PATH, probe_media
+    source = probe_media(input_path)
+    if not source["has_audio"]:
+        raise ConversionError("The input has no audio stream.")
+    channels, sample_rate = source["channels"] or 2, source["sample_rate"] or 44100
+    command = [FFMPEG_PATH, "-v", "error", "-i", input_path, "-map", "0:a:0",
+               "-ac", str(channels), "-ar", str(sample_rate), "-f", "s16le", "pipe:1"]
+    builder = PeakBuilder(channels, sample_rate)
+    frame_bytes = 2 * channels
+    pending = b""
+    # stderr goes to a file: a piped stderr that nobody reads while stdout is drained
+    # blocks ffmpeg once it fills, on a file that logs a warning per corrupt packet
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors)
+        while True:
+            block = process.stdout.read(READ_BLOCK_FRAMES * frame_bytes)
+            if not block:
+                break
+            block = pending + block
+            usable = len(block) // frame_bytes * frame_bytes
+            builder.feed(np.frombuffer(block[:usable], dtype="<i2"))
+            pending = block[usable:]
+        process.stdout.close()
+        if process.wait() != 0:
+            errors.seek(0)
+            raise ConversionError("ffmpeg could not decode the audio.", errors.read().decode("utf-8", errors="replace"))
+    write_peaks(output_path, builder.finish(), channels, sample_rate, builder.frames)
+    return output_path
+
+
+def display_peaks(path):
+    peaks = open_peaks(path)
+    table = Table(title=f"[bold green]{os.path.basename(path)}[/]", border_style="cyan")
+    table.add_column("Level", style="bold yellow", justify="center")
+    table.add_column("Samples/bucket", justify="right")
+    table.add_column("Buckets", justify="right")
+    table.add_column("ms/bucket", justify="right", style="dim cyan")
+    for index, level in enumerate(peaks["levels"]):
+        table.add_row(str(index), str(level["samples_per_bucket"]), str(len(level["data"])),
+                      f"{level['samples_per_bucket'] * 1000 / peaks['sample_rate']:.1f}")
+    console.print(table)
+    console.print(f"[info]{peaks['channels']} channel(s), {peaks['sample_rate']} Hz, "
+                  f"{peaks['frames'] / peaks['sample_rate']:.1f}s, {os.path.getsize(path) / 1024:.1f} KB[/]")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Multi-resolution waveform peaks (min/max per bucket) for web players.")
+    parser.add_argument("input", help="Audio/video file, or a .peaks file with --info.")
+    parser.add_argument("--out", help="Output path (default: '<input>.peaks').")
+    parser.add_argument("--info", action="store_true", help="Describe an existing peaks file.")
+    args = parser.parse_args()
+    try:
+        if args.info:
+            display_peaks(args.input)
+        else:
+            started = time.perf_counter()
+            output_path = peaks_from_file(args.input, args.out or peaks_path_for(args.input))
+            console.print(f"[success]Saved[/] [path]{output_path}[/] in {time.perf_counter() - started:.2f}s")
+            display_peaks(output_path)
+    except ConversionError as e:
+        console.print(Panel(f"[danger]{e}[/]", title="[bold red]Error[/]", border_style="red"))
+        sys.exit(1)
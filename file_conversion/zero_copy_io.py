@@ -0,0 +1,285 @@
+import os
+import sys
+import mmap
+import json
+import time
+import tempfile
+import tarfile
+import zipfile
+import argparse
+import posixpath
+from contextlib import contextmanager
+
+from conversion_api import ConversionError
+from profiling import note_kernel_copy
+
+# RICH: Import necessary components
+from rich.console import Console
+from rich.theme import Theme
+from rich.table import Table
+
+# RICH: Define theme and console
+custom_theme = Theme({
+    "info": "dim cyan", "warning": "magenta", "danger": "bold red",
+    "success": "bold green", "prompt": "bold yellow", "path": "bold cyan",
+    "format": "bold blue",
+})
+console = Console(theme=custom_theme)
+
+# --- I/O CONFIG ---
+# CONVERTER_STREAM_IO=0 switches converters back to their original read-everything
+# paths, which is how the measurement harness below gets a baseline.
+STREAMING = os.environ.get("CONVERTER_STREAM_IO", "1") != "0"
+COPY_CHUNK = 1 << 20
+
+# Archive targets (ArchiveConverter ids) -> (container, tarfile write mode)
+ARCHIVE_TARGETS = {"zip": ("zip", None), "tar": ("tar", "w"), "gztar": ("tar", "w:gz"),
+                   "bztar": ("tar", "w:bz2"), "xztar": ("tar", "w:xz")}
+TAR_MAGIC = [(b"\x1f\x8b", "gztar"), (b"BZh", "bztar"), (b"\xfd7zXZ\x00", "xztar")]
+
+
+# --- Shared primitives ---
+
+@contextmanager
+def map_file(path):
+    """
+    A read-only memoryview of the whole file backed by mmap. Slicing it copies
+    nothing; pages are faulted in by the kernel as they are touched.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b"")
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def _real_fd(stream):
+    # Archive member streams (ZipExtFile, tarfile's ExFileObject) have no descriptor of their own
+    try:
+        return stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def copy_stream(src, dst, length=None):
+    """
+    Copies 'length' bytes (default: to EOF) from 'src' to 'dst' and returns the count.
+    Between two regular files the kernel moves the data (copy_file_range/sendfile);
+    otherwise one reused buffer is filled with readinto(), so nothing is reallocated.
+    """
+    src_fd, dst_fd = _real_fd(src), _real_fd(dst)
+    copied = 0
+    if src_fd is not None and dst_fd is not None:
+        dst.flush()
+        kernel_copy = getattr(os, "copy_file_range", None) or (lambda i, o, n: os.sendfile(o, i, None, n))
+        try:
+            while length is None or copied < length:
+                step = COPY_CHUNK * 64 if length is None else min(COPY_CHUNK * 64, length - copied)
+                sent = kernel_copy(src_fd, dst_fd, step)
+                if sent == 0:
+                    break
+                copied += sent
+                note_kernel_copy(sent)
+            return copied
+        except OSError:
+            if copied:
+                raise
+            # Cross-device or unsupported file type: fall through to the userspace loop
+
+    buffer = bytearray(COPY_CHUNK)
+    view = memoryview(buffer)
+    while length is None or copied < length:
+        wanted = COPY_CHUNK if length is None else min(COPY_CHUNK, length - copied)
+        read = src.readinto(view[:wanted])
+        if not read:
+            break
+        dst.write(view[:read])
+        copied += read
+    return copied
+
+
+# --- Streaming archive repack ---
+
+def archive_kind(path):
+    """'zip', 'tar', 'gztar', 'bztar' or 'xztar' from the file's magic bytes, or None."""
+    if zipfile.is_zipfile(path):
+        return "zip"
+    with open(path, "rb") as f:
+        head = f.read(6)
+    for magic, kind in TAR_MAGIC:
+        if head.startswith(magic):
+            return kind if tarfile.is_tarfile(path) else None
+    return "tar" if tarfile.is_tarfile(path) else None
+
+
+def _safe_name(name):
+    """The member name as a relative path, or None if it would escape the archive root."""
+    name = posixpath.normpath(name.replace("\\", "/")).lstrip("/")
+    if name in ("", ".") or name == ".." or name.startswith("../"):
+        return None
+    return name
+
+
+def _iter_zip(archive):
+    for info in archive.infolist():
+        name = _safe_name(info.filename)
+        if name is None:
+            continue
+        mode = (info.external_attr >> 16) & 0o7777 or (0o755 if info.is_dir() else 0o644)
+        yield name, info.is_dir(), info.file_size, mode, info.date_time, \
+            (lambda info=info: archive.open(info))
+
+
+def _iter_tar(archive):
+    for member in archive:
+        name = _safe_name(member.name)
+        if name is None or not (member.isdir() or member.isfile() or member.islnk() or member.issym()):
+            continue
+        opener = (lambda member=member: archive.extractfile(member))
+        if member.issym() or member.islnk():
+            # Links become copies of their target, like an unpack + make_archive round trip
+            try:
+                target = archive.getmember(posixpath.normpath(posixpath.join(posixpath.dirname(member.name),
+                                                                           member.linkname))
+                                           if member.issym() else member.linkname)
+            except KeyError:
+                continue
+            if not target.isfile():
+                continue
+            member_size, opener = target.size, (lambda target=target: archive.extractfile(target))
+        else:
+            member_size = member.size
+        date_time = time.localtime(max(member.mtime, 315532800))[:6]     # Zip can't go before 1980
+        yield name, member.isdir(), member_size, member.mode & 0o7777, date_time, opener
+
+
+def repack_archive(input_path, output_path, output_format):
+    """
+    Re-packs 'input_path' as 'output_format' by streaming each member straight from
+    the source archive into the new one, with no temporary extraction. An archive
+    already in the target container is copied by the kernel. Raises ValueError for
+    inputs it can't stream (7z, rar, ...), so callers can fall back.
+    """
+    source = archive_kind(input_path)
+    if source is None or output_format not in ARCHIVE_TARGETS:
+        raise ValueError(f"Can't stream {os.path.basename(input_path)} to {output_format}")
+    if source == output_format:
+        with open(input_path, "rb") as src, open(output_path, "wb") as dst:
+            copy_stream(src, dst)
+        return output_path
+
+    source_archive = zipfile.ZipFile(input_path) if source == "zip" else tarfile.open(input_path, "r:*")
+    members = _iter_zip(source_archive) if source == "zip" else _iter_tar(source_archive)
+    container, tar_mode = ARCHIVE_TARGETS[output_format]
+    try:
+        if container == "zip":
+            with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as target:
+                for name, is_dir, _, mode, date_time, opener in members:
+                    info = zipfile.ZipInfo(name + "/" if is_dir else name, date_time=date_time)
+                    info.external_attr = (mode | (0o040000 if is_dir else 0o100000)) << 16
+                    if is_dir:
+                        target.writestr(info, b"")
+                        continue
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    with opener() as src, target.open(info, "w", force_zip64=True) as dst:
+                        copy_stream(src, dst)
+        else:
+            with tarfile.open(output_path, tar_mode) as target:
+                for name, is_dir, size, mode, date_time, opener in members:
+                    info = tarfile.TarInfo(name)
+                    info.mode, info.mtime = mode, _mtime(date_time)
+                    if is_dir:
+                        info.type = tarfile.DIRTYPE
+                        target.addfile(info)
+                        continue
+                    info.size = size
+                    with opener() as src:
+                        target.addfile(info, src)
+    finally:
+        source_archive.close()
+    return output_path
+
+
+def _mtime(date_time):
+    return time.mktime(tuple(date_time) + (0, 0, -1))
+
+
+# --- Measurement harness ---
+
+def measure(inputs, only_formats=None, repeat=1):
+    """
+    Converts each input with streaming off, then on, each in a fresh process, and
+    returns rows with the bytes the Python process read+wrote and its peak RSS.
+    """
+    from benchmark_suite import TARGETS, _run_in_subprocess
+    from main import FILE_TYPE_MAPPING
+    rows = []
+    for input_path in inputs:
+        extension = os.path.splitext(input_path)[1].lower()
+        file_type = FILE_TYPE_MAPPING.get(extension, (None,))[0]
+        if file_type is None:
+            raise ConversionError(f"Unknown file type: '{extension}'")
+        kind = {".pdf": "pdf", ".docx": "docx", ".epub": "epub"}.get(extension, file_type.lower())
+        targets = [(fmt, None) for fmt in only_formats] if only_formats else TARGETS.get(kind, [])
+        for output_format, options in targets:
+            row = {"input": os.path.basename(input_path), "format": output_format}
+            for label, flag in (("before", "0"), ("after", "1")):
+                best = None
+                for _ in range(repeat):
+                    with tempfile.TemporaryDirectory() as output_dir:
+                        spec = {"category": file_type, "input_path": os.path.abspath(input_path),
+                                "output_format": output_format, "options": options, "output_dir": output_dir}
+                        result = _run_in_subprocess(spec, env={**os.environ, "CONVERTER_STREAM_IO": flag})
+                    if result["status"] != "ok":
+                        best = result
+                        break
+                    best = result if best is None or result["wall"] < best["wall"] else best
+                row[label] = best
+            rows.append(row)
+    return rows
+
+
+def display_measurements(rows):
+    table = Table(title="[bold green]I/O per conversion, before → after[/]", border_style="cyan",
+                  caption="Bytes read+written by the converter process and the tools it runs")
+    table.add_column("Input", style="cyan")
+    table.add_column("Format", style="bold blue")
+    table.add_column("Bytes copied", justify="right")
+    table.add_column("Peak RSS", justify="right")
+    table.add_column("Wall", justify="right")
+    mib = lambda value: f"{value / 1024 / 1024:.1f} MiB"
+    for row in rows:
+        before, after = row["before"], row["after"]
+        if before["status"] != "ok" or after["status"] != "ok":
+            table.add_row(row["input"], row["format"], f"[warning]{(after if before['status'] == 'ok' else before)['error']}[/]", "", "")
+            continue
+        io_cell = (f"{mib(before['io_bytes'])} → {mib(after['io_bytes'])}"
+                   if before.get("io_bytes") is not None else "n/a")
+        table.add_row(row["input"], row["format"], io_cell,
+                      f"{before['peak_rss_kb'] / 1024:.0f} → {after['peak_rss_kb'] / 1024:.0f} MiB",
+                      f"{before['wall']:.2f} → {after['wall']:.2f}s")
+    console.print(table)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the bytes each converter copies and its peak RSS, "
+                                                 "with streaming I/O off (before) and on (after).")
+    parser.add_argument("inputs", nargs="+")
+    parser.add_argument("--format", action="append", help="Target format(s); default: the benchmark targets.")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    try:
+        rows = measure(args.inputs, args.format, args.repeat)
+    except ConversionError as e:
+        console.print(f"[danger]{e}[/]")
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        display_measurements(rows)